@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from sparams import port_z0, s_block
+
+ESTIMATE_MAX_POINTS = 128
+_CHUNK_POINTS = 32
+_PS = 1e12
+
+
+@dataclass
+class SourceGroup:
+    """Ports driven together by one TX, with source voltages per unit pulse amplitude."""
+
+    port_indices: Tuple[int, ...]
+    amplitudes: Tuple[float, ...]
+
+
+def pulse_spectrum(frequency, vhigh: float, t_rise: float, ui: float) -> np.ndarray:
+    """Magnitude spectrum (V*s) of the TX PULSE: a trapezoid with flat top ``ui``."""
+    frequency = np.asarray(frequency, dtype=float)
+    return vhigh * (ui + t_rise) * np.abs(np.sinc(frequency * (ui + t_rise)) * np.sinc(frequency * t_rise))
+
+
+def estimate_frequency_index(frequency, max_points: int = ESTIMATE_MAX_POINTS) -> np.ndarray:
+    count = len(frequency)
+    if count <= max_points:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, max_points).round().astype(int))
+
+
+def source_transfer(
+    network,
+    frequency_index,
+    admittance: np.ndarray,
+    source_resistance: float,
+    sources: Sequence[SourceGroup],
+    observe_ports: Sequence[int],
+) -> np.ndarray:
+    """Node voltages at ``observe_ports`` per volt of source for every TX, shape (F, P, T).
+
+    Port waves give V = Zh (I+S) a and I = Zh^-1 (I-S) a with Zh = sqrt(z0). With every
+    port loaded by ``admittance`` (passive TX, RX and open ports), KCL reads
+    M0 a = J, M0 = Zh^-1 (I-S) + Y Zh (I+S). Driving a TX swaps its load for the source
+    resistance, a rank-k change of M0 handled with the Woodbury identity, so M0 is
+    factored once per frequency for all TXs.
+    """
+    frequency_index = np.asarray(frequency_index)
+    nports = admittance.shape[1]
+    ports = np.arange(nports)
+    zh = np.sqrt(np.real(port_z0(network, ports)))
+    observe_ports = np.asarray(observe_ports, dtype=int)
+    source_ports = sorted({index for group in sources for index in group.port_indices})
+    column = {index: position for position, index in enumerate(source_ports)}
+    drive = np.zeros((nports, len(source_ports)))
+    drive[source_ports, np.arange(len(source_ports))] = 1.0
+
+    result = np.empty((frequency_index.size, observe_ports.size, len(sources)), dtype=complex)
+    for start in range(0, frequency_index.size, _CHUNK_POINTS):
+        chunk = frequency_index[start:start + _CHUNK_POINTS]
+        local = slice(start, start + chunk.size)
+        s = s_block(network, ports, ports, chunk)
+        y = admittance[local]
+        # M0 = S diag-scaled by (Y Zh - 1/Zh) plus the diagonal (1/Zh + Y Zh), built in place.
+        m0 = s * (y * zh - 1.0 / zh)[:, :, None]
+        m0[:, ports, ports] += y * zh + 1.0 / zh
+        c = np.linalg.solve(m0, np.broadcast_to(drive, (chunk.size,) + drive.shape))
+        observed = c[:, observe_ports, :] + s[:, observe_ports, :] @ c
+        coupled = c[:, source_ports, :] + s[:, source_ports, :] @ c
+
+        # Single-port sources reduce to a scalar Sherman-Morrison update, done for all at once.
+        single = [position for position, group in enumerate(sources) if len(group.port_indices) == 1]
+        if single:
+            cols = [column[sources[position].port_indices[0]] for position in single]
+            indices = [source_ports[col] for col in cols]
+            delta = (1.0 / source_resistance - y[:, indices]) * zh[indices]
+            g = coupled[:, cols, cols]
+            excitation = np.array([sources[position].amplitudes[0] for position in single]) / source_resistance
+            x_obs = observed[:, :, cols] / (1.0 + g * delta)[:, None, :]
+            result[local, :, single] = zh[observe_ports][None, :, None] * x_obs * excitation
+        for position, group in enumerate(sources):
+            if len(group.port_indices) == 1:
+                continue
+            cols = [column[index] for index in group.port_indices]
+            k = len(cols)
+            delta = (1.0 / source_resistance - y[:, list(group.port_indices)]) * zh[list(group.port_indices)]
+            g = coupled[:, cols][:, :, cols]
+            correction = np.linalg.solve(np.eye(k) + g * delta[:, None, :], g)
+            x_obs = observed[:, :, cols] - (observed[:, :, cols] * delta[:, None, :]) @ correction
+            excitation = np.asarray(group.amplitudes) / source_resistance
+            result[local, :, position] = zh[observe_ports] * (x_obs @ excitation)
+    return result
+
+
+def _trapezoid(values: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+    width = np.diff(frequency)
+    return np.tensordot(width, 0.5 * (values[1:] + values[:-1]), axes=(0, 0))
+
+
+def waveform_bounds(frequency, spectrum: np.ndarray, ui: float, window: float) -> Dict[str, np.ndarray]:
+    """Bounds (V*ps) on waveform integrals from magnitude spectra, one column per waveform.
+
+    ``spectrum`` is |Y(f)| in V*s on a one-sided grid. Assuming the response settles
+    inside the ``window`` the transient observes:
+      * sup_f |Y| <= integral |y| <= sqrt(window * energy),
+      * the best ``ui``-wide integral g = y * rect_ui is at most 2 * int |Y| |ui sinc(f ui)| df
+        and at most sqrt(ui * energy); it is at least ||g||_2^2 / ||g||_1 with
+        ||g||_1 <= ui * sqrt(window * energy), and at least sup_f |G| / (window + ui).
+    The lower bounds on g hold for its largest magnitude, i.e. for a non-inverting path.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    magnitude = np.abs(spectrum)
+    gate = ui * np.abs(np.sinc(frequency * ui))[:, None]
+    energy = 2.0 * _trapezoid(magnitude ** 2, frequency)
+    l1_upper = np.sqrt(window * energy)
+    gated_energy = 2.0 * _trapezoid((magnitude * gate) ** 2, frequency)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        energy_ratio = np.where(l1_upper > 0, gated_energy / (ui * l1_upper), 0.0)
+    return {
+        "abs_lower": _PS * magnitude.max(axis=0),
+        "abs_upper": _PS * l1_upper,
+        "window_lower": _PS * np.maximum((magnitude * gate).max(axis=0) / (window + ui), energy_ratio),
+        "window_upper": _PS * np.minimum.reduce([
+            2.0 * _trapezoid(magnitude * gate, frequency),
+            np.sqrt(ui * energy),
+            l1_upper,
+        ]),
+        "window_abs_upper": _PS * np.minimum(np.sqrt(ui * energy), l1_upper),
+    }
+
+
+def metric_bounds(primary: Dict[str, float], aggressors: List[Dict[str, float]]) -> Dict[str, Tuple[float, float]]:
+    """Combine per-waveform bounds into (lower, upper) for the CCT metrics."""
+    sig = (primary["window_lower"], primary["window_upper"])
+    isi = (
+        max(0.0, primary["abs_lower"] - primary["window_abs_upper"]),
+        max(0.0, primary["abs_upper"] - sig[0]),
+    )
+    xtalk = (
+        sum(item["abs_lower"] for item in aggressors),
+        sum(item["abs_upper"] for item in aggressors),
+    )
+    pseudo_eye = (sig[0] - isi[1] - xtalk[1], sig[1] - isi[0] - xtalk[0])
+    worst_denom = isi[1] + xtalk[1]
+    best_denom = isi[0] + xtalk[0]
+    power_ratio = (
+        sig[0] / worst_denom if worst_denom else float('inf'),
+        sig[1] / best_denom if best_denom else float('inf'),
+    )
+    return {"sig": sig, "isi": isi, "xtalk": xtalk, "pseudo_eye": pseudo_eye, "power_ratio": power_ratio}
@@ -1,11 +1,20 @@
+import contextvars
+import copy
+import gzip
+import hashlib
 import json
 import logging
 import math
+import os
 import re
+import threading
+import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from queue import Full, Queue
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 try:  # pragma: no cover - optional dependency
     from ansys.aedt.core import Circuit
@@ -21,10 +30,72 @@ except ImportError:  # pragma: no cover - pruning falls back to no-op
 
 import numpy as np
 
+from bounds import (
+    SourceGroup,
+    estimate_frequency_index,
+    metric_bounds,
+    pulse_spectrum,
+    source_transfer,
+    waveform_bounds,
+)
+from eye import (
+    DEFAULT_BER_LEVELS,
+    cursor_matrices,
+    interference_cursors,
+    peak_distortion,
+    statistical_eye,
+)
+from optimize import (
+    DEFAULT_KEEP,
+    DEFAULT_LEVELS,
+    DEFAULT_OPTIMIZE_WORKERS,
+    DEFAULT_ROUNDS,
+    OPTIMIZE_CACHE_DIRNAME,
+    ChannelGroup,
+    OptimizeProblem,
+    run_optimization,
+    write_optimization_table,
+)
+from passivity import (
+    DEFAULT_CAUSALITY_TOL,
+    DEFAULT_PASSIVITY_MARGIN,
+    check_network,
+    write_passive_network,
+)
+from prescreen import (
+    Endpoint,
+    endpoint_reference_impedance,
+    endpoint_reflection,
+    endpoint_transfer,
+    power_to_db,
+    tdr_profiles,
+    to_db,
+)
+from progress import RunProgress
+from results_archive import ARCHIVE_SUFFIX, metric_columns, metrics_array, write_archive, write_metrics_csv
+from sim_backend import SimulatorBackend, file_digest
+from sparams import (
+    CompactNetwork,
+    load_admittance,
+    load_trim_report,
+    parse_spice_value,
+    port_z0,
+    s_block,
+    s_trace,
+    write_reduced_touchstone,
+)
+from vector_fit import load_macromodel_report, write_macromodel
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 NETLIST_DEBUG_DIR = ROOT_DIR / "data" / "netlist"
+NETLIST_INCLUDE_DIRNAME = "netlist_blocks"
 TRIMMED_TOUCHSTONE_DIRNAME = "trimmed_touchstone"
 DEFAULT_CIRCUIT_VERSION = "2025.1"
+DEFAULT_TRIM_WORKERS = min(4, os.cpu_count() or 1)
+CHANNEL_INTERPOLATION = "LINEAR"
+CHANNEL_INTDATTYP = "MA"
+DEFAULT_TOP_AGGRESSORS = 5
+RUN_QUEUE_DEPTH = 2
 
 def integrate_nonuniform(x_list, y_list):
     integral = 0.0
@@ -90,6 +161,17 @@ def get_sig_isi(time_list, voltage_list, unit_interval):
     return sig, isi
 
 
+def _put_unless_stopped(queue: Queue, item: object, stop: threading.Event, poll: float = 0.1) -> bool:
+    """Blocking put that gives up once ``stop`` is set; returns whether the item was queued."""
+    while True:
+        try:
+            queue.put(item, timeout=poll)
+            return True
+        except Full:
+            if stop.is_set():
+                return False
+
+
 @dataclass
 class PortMetadata:
     sequence: int
@@ -111,6 +193,8 @@ class PruneResult:
     rxs: List[object]
     tx_lookup: Dict[Tuple[str, str], object]
     stats: Dict[str, object]
+    macromodel_path: Optional[Path] = None
+    include_path: Optional[Path] = None
 
 
 def _normalize_role(value: Optional[str]) -> str:
@@ -202,15 +286,14 @@ class Tx:
         self.pid = meta.sequence
         self.sequence = meta.sequence
         self.label = meta.name
-        self.active = [
+        self.source = [
             f"V{self.pid} netb_{self.pid} 0 PULSE(0 {vhigh} 1e-10 {t_rise} {t_rise} {ui} 1.5e+100)",
-            f"R{self.pid} netb_{self.pid} net_{self.pid} {res_tx}",
-            f"C{self.pid} netb_{self.pid} 0 {cap_tx}",
         ]
         self.passive = [
             f"R{self.pid} netb_{self.pid} net_{self.pid} {res_tx}",
             f"C{self.pid} netb_{self.pid} 0 {cap_tx}",
         ]
+        self.active = self.source + self.passive
         self.kind = 'single'
         self.key = meta.net
 
@@ -235,13 +318,9 @@ class Tx_diff:
         self.pid_neg = negative.sequence
         self.sequence = min(positive.sequence, negative.sequence)
         self.label = positive.pair or f"{positive.name}/{negative.name}"
-        self.active = [
+        self.source = [
             f"V{self.pid_pos} netb_{self.pid_pos} 0 PULSE(0 0.5*{vhigh} 1e-10 {t_rise} {t_rise} {ui} 1.5e+100)",
-            f"R{self.pid_pos} netb_{self.pid_pos} net_{self.pid_pos} {res_tx}",
-            f"C{self.pid_pos} netb_{self.pid_pos} 0 {cap_tx}",
             f"V{self.pid_neg} netb_{self.pid_neg} 0 PULSE(0 -0.5*{vhigh} 1e-10 {t_rise} {t_rise} {ui} 1.5e+100)",
-            f"R{self.pid_neg} netb_{self.pid_neg} net_{self.pid_neg} {res_tx}",
-            f"C{self.pid_neg} netb_{self.pid_neg} 0 {cap_tx}",
         ]
         self.passive = [
             f"R{self.pid_pos} netb_{self.pid_pos} net_{self.pid_pos} {res_tx}",
@@ -249,6 +328,7 @@ class Tx_diff:
             f"R{self.pid_neg} netb_{self.pid_neg} net_{self.pid_neg} {res_tx}",
             f"C{self.pid_neg} netb_{self.pid_neg} 0 {cap_tx}",
         ]
+        self.active = self.source + self.passive
         self.kind = 'diff'
         self.key = tuple(sorted([positive.net, negative.net]))
 
@@ -324,14 +404,21 @@ class Design:
         self.setup.props['TransientData'] = [tstep, tstop]
         self.circuit.save_project()
 
+    def set_transient(self, tstep, tstop):
+        self.setup.props['TransientData'] = [tstep, tstop]
+        self.setup.update()
+        self.circuit.save_project()
+
     def run(self, netlist):
         with open(self.netlist_path, 'w') as f:
             f.write(netlist)
 
+        started = time.perf_counter()
         self.circuit.odesign.InvalidateSolution('myTransient')
         self.circuit.save_project()
         self.circuit.analyze('myTransient')
         self.circuit.save_project()
+        analyzed = time.perf_counter()
 
         result = {}
         for v in self.circuit.post.available_report_quantities():
@@ -342,8 +429,117 @@ class Design:
             if m:
                 number = int(m.group(1))
                 result[number] = (x, y)
+        self.phase_seconds = {'analyze': analyzed - started, 'extract': time.perf_counter() - analyzed}
         return result
 
+class AedtBackend:
+    """Simulator backend running Nexxim transients through an AEDT Circuit design.
+
+    The design is created on the first ``prepare`` and reused afterwards.
+    """
+
+    def __init__(self, workdir: str | Path, version: Optional[str] = None):
+        self.workdir = Path(workdir)
+        self.version = version
+        self.design: Optional[Design] = None
+
+    def prepare(self, tstep: str, tstop: str) -> None:
+        if self.design is None:
+            self.design = Design(self.workdir, tstep, tstop, version=self.version)
+        else:
+            self.design.set_transient(tstep, tstop)
+
+    def run(self, netlist: str) -> Dict[int, Tuple[List[float], List[float]]]:
+        if self.design is None:
+            raise RuntimeError("prepare must be called before run")
+        return self.design.run(netlist)
+
+    @property
+    def phase_seconds(self) -> Optional[Dict[str, float]]:
+        """Analyze/extract split of the last ``run``."""
+        return getattr(self.design, 'phase_seconds', None)
+
+    def close(self) -> None:
+        if self.design is not None:
+            self.design.circuit.release_desktop(close_projects=True, close_desktop=True)
+            self.design = None
+
+
+def _json_number(value: object) -> Optional[float]:
+    number = float(value)
+    return number if math.isfinite(number) else None
+
+
+class VictimUpdates:
+    """Per-victim metric events while a run stores waveforms.
+
+    A victim is reported ``partial`` once its primary TX is stored and each time a
+    coupled aggressor arrives, and ``final`` once every TX of the run whose kept
+    ports include it is stored. Partial rows carry no eye metrics, and their
+    crosstalk only grows, so a partial pseudo-eye is an upper bound.
+    """
+
+    def __init__(self, cct: 'CCT', txs: Sequence[object], emit: Callable[[Dict[str, object]], None]):
+        self.cct = cct
+        self.emit = emit
+        self.ui = float(cct.ui.replace('ps', ''))
+        self.remaining: Dict[object, int] = {rx: 0 for rx in cct.rxs}
+        for tx in txs:
+            kept = set(cct._kept_network_sequences(tx))
+            for rx in cct.rxs:
+                if kept.issuperset(cct._rx_sequences(rx)):
+                    self.remaining[rx] += 1
+        self.sig_isi: Dict[object, Tuple[float, float]] = {}
+        self.xtalk: Dict[object, float] = {}
+        self.contributions: Dict[object, Dict[object, float]] = {}
+
+    def stored(self, tx: object) -> None:
+        kept = set(self.cct._kept_network_sequences(tx))
+        for rx in self.cct.rxs:
+            if rx not in self.remaining:
+                continue
+            reaches = kept.issuperset(self.cct._rx_sequences(rx))
+            if reaches:
+                self.remaining[rx] -= 1
+            waveform = rx.waveforms.get(tx)
+            if waveform is not None:
+                if tx is rx.expected_tx:
+                    self.sig_isi[rx] = get_sig_isi(waveform[0], waveform[1], self.ui)
+                else:
+                    contribution = integrate_nonuniform(waveform[0], [abs(v) for v in waveform[1]])
+                    self.contributions.setdefault(rx, {})[tx] = contribution
+                    self.xtalk[rx] = self.xtalk.get(rx, 0.0) + contribution
+            if rx not in self.sig_isi or not (reaches or waveform is not None):
+                continue
+            if self.remaining[rx] <= 0:
+                del self.remaining[rx]
+                # The final row reuses the streamed sums; only the eye metrics are new.
+                sig, isi = self.sig_isi[rx]
+                integrals = (sig, isi, self.xtalk.get(rx, 0.0), self.contributions.get(rx, {}))
+                row = self.cct._victim_metrics(rx, self.ui, integrals=integrals)[0]
+                state = 'final'
+            else:
+                sig, isi = self.sig_isi[rx]
+                xtalk = self.xtalk.get(rx, 0.0)
+                row = {
+                    "tx_name": self.cct._object_label(rx.expected_tx),
+                    "rx_name": self.cct._object_label(rx),
+                    "sig": sig,
+                    "isi": isi,
+                    "xtalk": xtalk,
+                    "pseudo_eye": sig - isi - xtalk,
+                    "power_ratio": sig / (isi + xtalk) if isi + xtalk else float('inf'),
+                }
+                state = 'partial'
+            self.emit({
+                "event": "victim",
+                "state": state,
+                "tx": row.pop("tx_name"),
+                "rx": row.pop("rx_name"),
+                "metrics": {field: _json_number(value) for field, value in row.items()},
+            })
+
+
 class CCT:
     def __init__(
         self,
@@ -352,6 +548,18 @@ class CCT:
         workdir: Optional[str | Path] = None,
         threshold_db: Optional[float] = None,
         circuit_version: Optional[str] = None,
+        compact_network: bool = False,
+        trim_workers: Optional[int] = None,
+        decimate_tol: Optional[float] = None,
+        macromodel: bool = False,
+        macromodel_poles: Optional[int] = None,
+        fold_terminations: bool = False,
+        ber_levels: Optional[Iterable[float]] = None,
+        stat_eye_contours: bool = False,
+        top_aggressors: int = DEFAULT_TOP_AGGRESSORS,
+        debug_netlists: bool = False,
+        backend: Optional[SimulatorBackend] = None,
+        progress: Optional[Callable[[Dict[str, object]], None]] = None,
     ):
         self.snp_path = str(snp_path)
         self.port_metadata, self.metadata_info = load_port_metadata(port_metadata_path)
@@ -366,13 +574,19 @@ class CCT:
         self.workdir.mkdir(parents=True, exist_ok=True)
 
         self.output_dir = metadata_dir
-        NETLIST_DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+        self.debug_netlists = debug_netlists
+        self.backend = backend
+        self.progress = progress
+        if debug_netlists:
+            NETLIST_DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+        self._include_dir = self.workdir / NETLIST_INCLUDE_DIRNAME
 
         self.threshold_db = threshold_db
         version_candidate = circuit_version if circuit_version is not None else self.metadata_info.get("circuit_version")
         version_str = (str(version_candidate).strip() if version_candidate is not None else '') or DEFAULT_CIRCUIT_VERSION
         self.circuit_version = version_str
         self._prune_cache: Dict[Tuple[str, str], PruneResult] = {}
+        self._kept_cache: Dict[Tuple[str, str], List[int]] = {}
         self._prerun_summaries: List[Dict[str, object]] = []
         self._prune_warning_emitted = False
 
@@ -397,23 +611,63 @@ class CCT:
             f'S1 {nets} FQMODEL="Channel"',
         ]
 
-        self._network = None
+        self.compact_network = compact_network
+        self._network = self._load_network()
+        self.preflight_report: Optional[Dict[str, object]] = None
+
+        self._trim_dir = self.workdir / TRIMMED_TOUCHSTONE_DIRNAME
+        self.trim_workers = max(1, int(trim_workers)) if trim_workers is not None else DEFAULT_TRIM_WORKERS
+        self._pending_network_files: Dict[Path, Tuple[object, List[int], Dict[str, object]]] = {}
+        self.decimate_tol = decimate_tol
+        interpolation = self._model_interpolation(self.netlist[0])
+        if decimate_tol is not None and interpolation != "LINEAR":
+            # The decimation error bound holds only for linear interpolation between kept points.
+            print(f"[decimate] Channel model uses {interpolation} interpolation; frequency decimation disabled")
+            self.decimate_tol = None
+        self.macromodel = macromodel
+        self.macromodel_poles = macromodel_poles
+        self.fold_terminations = fold_terminations
+        self.ber_levels = [float(level) for level in ber_levels] if ber_levels else list(DEFAULT_BER_LEVELS)
+        self.stat_eye_contours = stat_eye_contours
+        self.top_aggressors = max(1, int(top_aggressors))
+
+    def _load_network(self):
+        network = None
         if rf is not None:
             try:
-                self._network = rf.Network(self.snp_path)
+                network = rf.Network(self.snp_path)
             except Exception:
-                self._network = None
+                network = None
+        if network is not None and self.compact_network:
+            network = self._compact(network)
+        return network
 
-        self._trim_dir = self.workdir / TRIMMED_TOUCHSTONE_DIRNAME
+    @staticmethod
+    def _compact(network):
+        compact = CompactNetwork.from_network(network)
+        if compact is None:
+            print('[network] S-matrix is not reciprocal; keeping full-precision storage')
+            return network
+        full_bytes = network.s.nbytes
+        print(
+            f"[network] Compact storage: {compact.nbytes / 2**20:.1f} MiB "
+            f"(full matrix {full_bytes / 2**20:.1f} MiB)"
+        )
+        return compact
 
     @staticmethod
     def _channel_model_line(tstone_path: str | Path) -> str:
         return (
             f'.model "Channel" S TSTONEFILE="{tstone_path}" '
-            'INTERPOLATION=LINEAR INTDATTYP=MA HIGHPASS=10 LOWPASS=10 '
+            f'INTERPOLATION={CHANNEL_INTERPOLATION} INTDATTYP={CHANNEL_INTDATTYP} HIGHPASS=10 LOWPASS=10 '
             'convolution=1 enforce_passivity=0 Noisemodel=External'
         )
 
+    @staticmethod
+    def _model_interpolation(model_line: str) -> str:
+        match = re.search(r'\bINTERPOLATION=(\w+)', model_line, re.IGNORECASE)
+        return match.group(1).upper() if match else ""
+
     def _classify_port_groups(self, entries: Iterable[PortMetadata]):
         entries = list(entries)
         tx_single_entries = [
@@ -533,6 +787,7 @@ class CCT:
 
     def set_threshold(self, threshold_db: Optional[float]) -> None:
         self.threshold_db = threshold_db
+        self._kept_cache.clear()
         self._prune_cache.clear()
         self._prerun_summaries.clear()
 
@@ -601,22 +856,21 @@ class CCT:
             return ("single", rx.meta.net)
         raise TypeError(f"Unsupported RX type: {type(rx)!r}")
 
-    def _ensure_prune_result(self, tx: object) -> PruneResult:
+    def _ensure_prune_result(self, tx: object, materialize: bool = True) -> PruneResult:
         key = self._tx_to_key(tx)
         cached = self._prune_cache.get(key)
-        if cached is not None:
-            return cached
-        prune_result = self._compute_prune_result(tx)
-        self._prune_cache[key] = prune_result
-        return prune_result
+        if cached is None:
+            cached = self._compute_prune_result(tx)
+            self._prune_cache[key] = cached
+        if materialize:
+            self._materialize_network_files([cached])
+        return cached
 
     def _compute_prune_result(self, tx: object) -> PruneResult:
         if self.tx_config is None or self.rx_config is None:
             raise RuntimeError("set_txs and set_rxs must be called before running pruning")
 
         total_port_count = len(self.port_metadata)
-        kept_sequences = set(self._controller_sequences)
-
         if isinstance(tx, Tx_diff):
             tx_sequences = [tx.pid_pos, tx.pid_neg]
         elif isinstance(tx, Tx):
@@ -624,55 +878,15 @@ class CCT:
         else:
             raise TypeError(f"Unsupported TX type: {type(tx)!r}")
 
-        if self.threshold_db is not None and self._network is None and not self._prune_warning_emitted:
-            print('[prune] scikit-rf not available; pruning disabled for this run')
-            self._prune_warning_emitted = True
-        if self.threshold_db is None or self._network is None:
-            kept_sequences.update(range(1, total_port_count + 1))
-        else:
-            tx_indices = [seq - 1 for seq in tx_sequences]
-            threshold = float(self.threshold_db)
-
-            for entry in self.rx_single_entries:
-                base_rx = self.rx_single_map.get(entry.net)
-                keep = False
-                if base_rx is not None and base_rx.expected_tx is tx:
-                    keep = True
-                else:
-                    rx_idx = entry.sequence - 1
-                    peak = 0.0
-                    for tx_idx in tx_indices:
-                        data = np.abs(self._network.s[:, rx_idx, tx_idx])
-                        if data.size:
-                            peak = max(peak, float(np.max(data)))
-                    peak_db = 20 * math.log10(peak) if peak > 0 else float('-inf')
-                    keep = peak_db >= threshold
-                if keep:
-                    kept_sequences.add(entry.sequence)
-
-            for pos_entry, neg_entry in self.rx_diff_entries:
-                identifier = self._diff_identifier(pos_entry, neg_entry)
-                base_rx = self.rx_diff_map.get(identifier)
-                keep = False
-                if base_rx is not None and base_rx.expected_tx is tx:
-                    keep = True
-                else:
-                    rx_indices = [pos_entry.sequence - 1, neg_entry.sequence - 1]
-                    peak = 0.0
-                    for rx_idx in rx_indices:
-                        for tx_idx in tx_indices:
-                            data = np.abs(self._network.s[:, rx_idx, tx_idx])
-                            if data.size:
-                                peak = max(peak, float(np.max(data)))
-                    peak_db = 20 * math.log10(peak) if peak > 0 else float('-inf')
-                    keep = peak_db >= threshold
-                if keep:
-                    kept_sequences.update([pos_entry.sequence, neg_entry.sequence])
-
-            if not kept_sequences.issuperset(self._controller_sequences):
-                kept_sequences.update(self._controller_sequences)
-
-        kept_sequences_sorted = sorted(kept_sequences)
+        network_sequences = self._kept_network_sequences(tx)
+        folded_sequences: List[int] = []
+        terminations = None
+        if self.fold_terminations and self._network is not None:
+            # Passive TXs are plain R/C loads, so fold them into the S-block and expose
+            # only the active TX and the observed RX ports to the simulator.
+            folded_sequences = [seq for seq in self._controller_sequences if seq not in tx_sequences]
+            terminations = self._tx_load_terminations(network_sequences, folded_sequences)
+        kept_sequences_sorted = [seq for seq in network_sequences if seq not in set(folded_sequences)]
         trimmed_metadata: List[PortMetadata] = []
         for new_sequence, original_sequence in enumerate(kept_sequences_sorted, 1):
             original_entry = self._metadata_by_sequence[original_sequence]
@@ -704,22 +918,47 @@ class CCT:
         kept_rx_group_count = len(rx_single_entries) + len(rx_diff_entries)
         kept_rx_port_count = len(rx_single_entries) + 2 * len(rx_diff_entries)
 
+        fold_variant = ''
+        if folded_sequences:
+            fold_variant = (
+                f"fold={','.join(str(seq) for seq in folded_sequences)}"
+                f":{self.tx_config['res_tx']}:{self.tx_config['cap_tx']}"
+            )
+
         touchstone_path = Path(self.snp_path)
-        if self.threshold_db is not None and self._network is not None and kept_rx_group_count < self._rx_total_groups:
-            self._trim_dir.mkdir(parents=True, exist_ok=True)
-            port_indices = [seq - 1 for seq in kept_sequences_sorted]
-            trimmed_network = self._network.subnetwork(port_indices)
-            base_label = getattr(tx, 'label', 'tx')
-            label = self._sanitize_label(base_label)
-            port_count = len(kept_sequences_sorted)
-            filename = f"{Path(self.snp_path).stem}_{label}_{port_count}p"
-            trimmed_network.write_touchstone(filename=filename, dir=str(self._trim_dir))
-            touchstone_path = self._trim_dir / f"{filename}.s{port_count}p"
+        pruned = self.threshold_db is not None and kept_rx_group_count < self._rx_total_groups
+        if self._network is not None and (pruned or folded_sequences or self.decimate_tol is not None):
+            touchstone_path = self._network_file_path(
+                network_sequences,
+                f"decimate={self.decimate_tol}|{fold_variant}",
+                suffix=f".s{len(kept_sequences_sorted)}p",
+                port_count=len(kept_sequences_sorted),
+            )
+            self._queue_network_file(
+                touchstone_path, write_reduced_touchstone, network_sequences,
+                decimate_tol=self.decimate_tol, data_type=CHANNEL_INTDATTYP, terminations=terminations,
+            )
+
+        macromodel_path = None
+        if self.macromodel and self._network is not None:
+            macromodel_path = self._network_file_path(
+                network_sequences,
+                f"vf={self.macromodel_poles}|{fold_variant}",
+                suffix="_vf.sp",
+                port_count=len(kept_sequences_sorted),
+            )
+            self._queue_network_file(
+                macromodel_path, write_macromodel, network_sequences,
+                name=self._macromodel_name(macromodel_path),
+                pole_count=self.macromodel_poles,
+                terminations=terminations,
+            )
 
         stats = {
             "tx_label": getattr(tx, 'label', 'tx'),
             "threshold_db": self.threshold_db,
             "kept_port_count": len(kept_sequences_sorted),
+            "folded_port_count": len(folded_sequences),
             "total_port_count": total_port_count,
             "kept_rx_port_count": kept_rx_port_count,
             "total_rx_port_count": self._rx_total_ports,
@@ -736,22 +975,200 @@ class CCT:
             rxs=rxs,
             tx_lookup=tx_lookup,
             stats=stats,
+            macromodel_path=macromodel_path,
         )
         return prune_result
 
+    def _kept_network_sequences(self, tx: object) -> List[int]:
+        """Sequences of the ports kept for ``tx`` by the coupling threshold.
+
+        Cached apart from the prune results because it depends only on the network
+        and threshold, so termination and drive changes can reuse it.
+        """
+        key = self._tx_to_key(tx)
+        cached = self._kept_cache.get(key)
+        if cached is not None:
+            return cached
+
+        total_port_count = len(self.port_metadata)
+        kept_sequences = set(self._controller_sequences)
+
+        if isinstance(tx, Tx_diff):
+            tx_sequences = [tx.pid_pos, tx.pid_neg]
+        elif isinstance(tx, Tx):
+            tx_sequences = [tx.pid]
+        else:
+            raise TypeError(f"Unsupported TX type: {type(tx)!r}")
+
+        if self.threshold_db is not None and self._network is None and not self._prune_warning_emitted:
+            print('[prune] scikit-rf not available; pruning disabled for this run')
+            self._prune_warning_emitted = True
+        if self.threshold_db is None or self._network is None:
+            kept_sequences.update(range(1, total_port_count + 1))
+        else:
+            tx_indices = [seq - 1 for seq in tx_sequences]
+            threshold = float(self.threshold_db)
+
+            for entry in self.rx_single_entries:
+                base_rx = self.rx_single_map.get(entry.net)
+                keep = False
+                if base_rx is not None and base_rx.expected_tx is tx:
+                    keep = True
+                else:
+                    rx_idx = entry.sequence - 1
+                    peak = 0.0
+                    for tx_idx in tx_indices:
+                        data = np.abs(s_trace(self._network, rx_idx, tx_idx))
+                        if data.size:
+                            peak = max(peak, float(np.max(data)))
+                    peak_db = 20 * math.log10(peak) if peak > 0 else float('-inf')
+                    keep = peak_db >= threshold
+                if keep:
+                    kept_sequences.add(entry.sequence)
+
+            for pos_entry, neg_entry in self.rx_diff_entries:
+                identifier = self._diff_identifier(pos_entry, neg_entry)
+                base_rx = self.rx_diff_map.get(identifier)
+                keep = False
+                if base_rx is not None and base_rx.expected_tx is tx:
+                    keep = True
+                else:
+                    rx_indices = [pos_entry.sequence - 1, neg_entry.sequence - 1]
+                    peak = 0.0
+                    for rx_idx in rx_indices:
+                        for tx_idx in tx_indices:
+                            data = np.abs(s_trace(self._network, rx_idx, tx_idx))
+                            if data.size:
+                                peak = max(peak, float(np.max(data)))
+                    peak_db = 20 * math.log10(peak) if peak > 0 else float('-inf')
+                    keep = peak_db >= threshold
+                if keep:
+                    kept_sequences.update([pos_entry.sequence, neg_entry.sequence])
+
+            if not kept_sequences.issuperset(self._controller_sequences):
+                kept_sequences.update(self._controller_sequences)
+
+        cached = sorted(kept_sequences)
+        self._kept_cache[key] = cached
+        return cached
+
+    def _source_signature(self) -> str:
+        """Content digest of the Touchstone source, so copied, moved or touched files keep their names."""
+        try:
+            return file_digest(self.snp_path)
+        except OSError:
+            return Path(self.snp_path).name
+
+    def _tx_load_terminations(self, network_sequences: List[int], folded_sequences: List[int]):
+        resistance = parse_spice_value(self.tx_config["res_tx"])
+        capacitance = parse_spice_value(self.tx_config["cap_tx"])
+        local_index = {seq: index for index, seq in enumerate(network_sequences)}
+        return [(local_index[seq], 'series', resistance, capacitance) for seq in folded_sequences]
+
+    def _network_file_path(self, kept_sequences: List[int], variant: str, suffix: str, port_count: int) -> Path:
+        # Named by content so identical kept sets are shared across TXs, thresholds and runs.
+        payload = '|'.join([
+            self._source_signature(),
+            'c64' if self.compact_network else 'c128',
+            variant,
+            ','.join(str(seq) for seq in kept_sequences),
+        ])
+        digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+        return self._trim_dir / f"{Path(self.snp_path).stem}_{digest}_{port_count}p{suffix}"
+
+    @staticmethod
+    def _macromodel_name(path: Path) -> str:
+        stem = path.name[:-len('.sp')] if path.name.endswith('.sp') else path.stem
+        return 'Channel_' + re.sub(r'[^A-Za-z0-9_]+', '_', stem)
+
+    def _queue_network_file(self, path: Path, writer, kept_sequences: List[int], **options) -> None:
+        if not path.exists() and not self._macromodel_rejected(path):
+            self._pending_network_files[path] = (writer, kept_sequences, options)
+
+    @staticmethod
+    def _macromodel_rejected(path: Path) -> bool:
+        """True when an earlier fit for ``path`` could not be made passive and was not written."""
+        report = load_macromodel_report(path)
+        return bool(report) and report.get("passive") is False
+
+    def _materialize_network_files(self, prune_results: Iterable[PruneResult]) -> None:
+        prune_results = list(prune_results)
+        paths = []
+        for prune_result in prune_results:
+            paths.append(prune_result.touchstone_path)
+            if prune_result.macromodel_path is not None:
+                paths.append(prune_result.macromodel_path)
+        self._write_network_files(paths)
+        for prune_result in prune_results:
+            self._attach_reports(prune_result)
+
+    def _write_network_files(self, paths: Iterable[Path]) -> None:
+        jobs = []
+        for path in dict.fromkeys(paths):
+            job = self._pending_network_files.pop(path, None)
+            if job is None or path.exists():
+                continue
+            writer, kept_sequences, options = job
+            jobs.append((path, writer, [seq - 1 for seq in kept_sequences], options))
+        if not jobs:
+            return
+
+        self._trim_dir.mkdir(parents=True, exist_ok=True)
+        frequency = np.asarray(self._network.f, dtype=float)
+        workers = min(self.trim_workers, len(jobs))
+        if workers <= 1:
+            for path, writer, port_indices, options in jobs:
+                block = s_block(self._network, port_indices, port_indices)
+                writer(path, frequency, block, port_z0(self._network, port_indices), **options)
+            return
+
+        # Bound the number of expanded blocks in flight to keep peak memory predictable.
+        pending = set()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, writer, port_indices, options in jobs:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                block = s_block(self._network, port_indices, port_indices)
+                pending.add(pool.submit(
+                    writer, path, frequency, block, port_z0(self._network, port_indices), **options
+                ))
+            for future in pending:
+                future.result()
+
     @staticmethod
-    def _sanitize_label(label: str) -> str:
-        sanitized = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_')
-        return sanitized or 'tx'
+    def _attach_reports(prune_result: PruneResult) -> None:
+        report = load_trim_report(prune_result.touchstone_path)
+        if report:
+            for key in ("frequency_points", "removed_frequency_points", "max_interpolation_error"):
+                if key in report:
+                    prune_result.stats[key] = report[key]
+        if prune_result.macromodel_path is not None:
+            report = load_macromodel_report(prune_result.macromodel_path)
+            if report and report.get("passive") is False:
+                print(
+                    f"[macromodel] {prune_result.macromodel_path.name} is not passive "
+                    f"(peak gain {float(report.get('peak_gain', 0.0)):.4f}); using the tabulated network"
+                )
+                prune_result.stats["macromodel_rejected"] = True
+                prune_result.macromodel_path = None
+                return
+            prune_result.stats["macromodel_path"] = str(prune_result.macromodel_path)
+            if report:
+                for key in ("pole_count", "rms_error", "max_error", "passivity_iterations", "peak_gain"):
+                    if key in report:
+                        prune_result.stats[f"macromodel_{key}"] = report[key]
 
     def pre_run(self, threshold_db: Optional[float] = None) -> List[Dict[str, object]]:
         if threshold_db is not None:
             self.set_threshold(threshold_db)
         if not self.txs or not self.rxs:
             raise RuntimeError("set_txs and set_rxs must be called before pre_run")
+        prune_results = [self._ensure_prune_result(tx, materialize=False) for tx in self.txs]
+        self._materialize_network_files(prune_results)
         summaries: List[Dict[str, object]] = []
-        for tx in self.txs:
-            prune_result = self._ensure_prune_result(tx)
+        for prune_result in prune_results:
             stats = dict(prune_result.stats)
             self._log_prune_stats(stats)
             summaries.append(stats)
@@ -778,45 +1195,603 @@ class CCT:
             f"[prune] Tx {stats.get('tx_label', 'tx')}: "
             f"ports {kept}/{total} ({kept_ratio:.1%})"
         )
+        folded = stats.get("folded_port_count", 0)
+        if folded:
+            msg += f", {folded} passive TX ports folded"
         if rx_total:
             msg += f", rx ports {rx_kept}/{rx_total} ({rx_ratio:.1%})"
         if threshold is not None:
             msg += f", threshold {threshold} dB"
+        removed = stats.get("removed_frequency_points")
+        if removed:
+            msg += (
+                f", freq points -{removed}/{stats.get('frequency_points')}"
+                f" (max err {float(stats.get('max_interpolation_error', 0.0)):.2e})"
+            )
+        if "macromodel_rms_error" in stats:
+            msg += (
+                f", macromodel {stats.get('macromodel_pole_count')} poles"
+                f" (rms err {float(stats['macromodel_rms_error']):.2e},"
+                f" max err {float(stats.get('macromodel_max_error', 0.0)):.2e})"
+            )
         print(msg)
 
-    def run(self, tstep='100ps', tstop='3ns'):
+    def preflight(
+        self,
+        enforce: bool = False,
+        margin: float = DEFAULT_PASSIVITY_MARGIN,
+        causality_tol: float = DEFAULT_CAUSALITY_TOL,
+    ) -> Dict[str, object]:
+        """Check passivity and causality of the loaded network before any simulation.
+
+        With ``enforce`` a non-passive network is corrected by singular value clipping,
+        written next to the work files and used for everything that follows.
+        """
+        if self._network is None:
+            raise RuntimeError("scikit-rf is required for the network pre-flight check")
+        report = check_network(self._network, causality_tol)
+        peaks = report.pop("singular_value_peaks")
+        print(
+            f"[preflight] max singular value {report['max_singular_value']:.6f} at "
+            f"{report['worst_passivity_frequency'] / 1e9:.3f} GHz, "
+            f"{report['passivity_violations']}/{report['frequency_points']} non-passive points; "
+            f"max non-causal energy ratio {report['max_causality_ratio']:.3f} "
+            f"(S{report['worst_causality_entry'][0]},{report['worst_causality_entry'][1]}), "
+            f"{report['causality_violations']} entries above {causality_tol}"
+        )
+        if enforce and report["max_singular_value"] > 1.0 - margin:
+            source = Path(self.snp_path)
+            path, count = write_passive_network(
+                self._network, self.workdir / f"{source.stem}_passive{source.suffix}", peaks, margin
+            )
+            self._use_network_file(path)
+            report["enforced_path"] = str(path)
+            report["enforced_points"] = count
+            print(f"[preflight] Passivity enforced at {count} points; using {path}")
+        self.preflight_report = report
+        return report
+
+    def _use_network_file(self, path: Path) -> None:
+        self.snp_path = str(path)
+        self._network = self._load_network()
+        nets = ' '.join([f'net_{entry.sequence}' for entry in self.port_metadata])
+        self.netlist = [
+            self._channel_model_line(self.snp_path),
+            f'S1 {nets} FQMODEL="Channel"',
+        ]
+        self._kept_cache.clear()
+        self._prune_cache.clear()
+        self._prerun_summaries.clear()
+
+    @staticmethod
+    def _endpoint(obj: object) -> Endpoint:
+        if isinstance(obj, (Tx_diff, Rx_diff)):
+            return Endpoint.differential(obj.label, obj.pid_pos - 1, obj.pid_neg - 1)
+        return Endpoint.single(obj.label, obj.pid - 1)
+
+    def prescreen(self, output_path, tdr_path=None) -> List[Dict[str, object]]:
+        """Frequency-domain IL/RL/NEXT/FEXT summary and TDR extremes per TX/RX pairing."""
         if not self.txs or not self.rxs:
-            raise RuntimeError("set_txs and set_rxs must be called before run")
+            raise RuntimeError("set_txs and set_rxs must be called before prescreen")
+        if self._network is None:
+            raise RuntimeError("scikit-rf is required for the channel pre-screen")
+
+        frequency = np.asarray(self._network.f, dtype=float)
+        nyquist = 0.5 / parse_spice_value(self.ui)
+        band = np.flatnonzero(frequency <= nyquist)
+        if band.size == 0:
+            band = np.array([0])
+        nyquist_pos = int(np.argmin(np.abs(frequency[band] - nyquist)))
+
+        tx_endpoints = [self._endpoint(tx) for tx in self.txs]
+        rx_endpoints = [self._endpoint(rx) for rx in self.rxs]
+        tx_position = {tx: column for column, tx in enumerate(self.txs)}
+
+        far = np.abs(endpoint_transfer(self._network, rx_endpoints, tx_endpoints, band)) ** 2
+        near = np.abs(endpoint_transfer(self._network, tx_endpoints, tx_endpoints, band)) ** 2
+        endpoints = tx_endpoints + rx_endpoints
+        gamma = endpoint_reflection(self._network, endpoints)
+        return_loss = -to_db(np.max(np.abs(gamma[band]), axis=0))
+        time, impedance = tdr_profiles(
+            frequency, gamma, endpoint_reference_impedance(self._network, endpoints),
+            parse_spice_value(self.tx_config["t_rise"]),
+        )
+        z_min = impedance.min(axis=0)
+        z_max = impedance.max(axis=0)
+
+        rows: List[Dict[str, object]] = []
+        for rx_column, rx in enumerate(self.rxs):
+            tx_column = tx_position.get(getattr(rx, 'expected_tx', None))
+            if tx_column is None:
+                continue
+            fext = far[:, rx_column, :].copy()
+            fext[:, tx_column] = 0.0
+            next_ = near[:, tx_column, :].copy()
+            next_[:, tx_column] = 0.0
+            fext_psum = fext.sum(axis=1)
+            next_psum = next_.sum(axis=1)
+            aggressor_peak = fext.max(axis=0)
+            worst = int(np.argmax(aggressor_peak)) if len(self.txs) > 1 else None
+            rx_index = len(tx_endpoints) + rx_column
+            rows.append({
+                "tx_name": self.txs[tx_column].label,
+                "rx_name": rx.label,
+                "il_nyq_db": float(power_to_db(far[nyquist_pos, rx_column, tx_column])),
+                "rl_tx_db": float(return_loss[tx_column]),
+                "rl_rx_db": float(return_loss[rx_index]),
+                "fext_psum_nyq_db": float(power_to_db(fext_psum[nyquist_pos])),
+                "fext_psum_peak_db": float(power_to_db(fext_psum.max())),
+                "next_psum_nyq_db": float(power_to_db(next_psum[nyquist_pos])),
+                "next_psum_peak_db": float(power_to_db(next_psum.max())),
+                "worst_fext_aggressor": self.txs[worst].label if worst is not None else '',
+                "worst_fext_db": float(power_to_db(aggressor_peak[worst])) if worst is not None else float('-inf'),
+                "tdr_tx_min_ohm": float(z_min[tx_column]),
+                "tdr_tx_max_ohm": float(z_max[tx_column]),
+                "tdr_rx_min_ohm": float(z_min[rx_index]),
+                "tdr_rx_max_ohm": float(z_max[rx_index]),
+            })
+
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with output_file.open('w') as f:
+            f.write(
+                'tx_name, rx_name, il_nyq(dB), rl_tx(dB), rl_rx(dB), fext_psum_nyq(dB), fext_psum_peak(dB), '
+                'next_psum_nyq(dB), next_psum_peak(dB), worst_fext_aggressor, worst_fext(dB), '
+                'tdr_tx_min(ohm), tdr_tx_max(ohm), tdr_rx_min(ohm), tdr_rx_max(ohm)\n'
+            )
+            f.write('\n'.join(
+                ', '.join(
+                    value if isinstance(value, str) else f'{value:.3f}' for value in row.values()
+                ) for row in rows
+            ))
+
+        tdr_file = Path(tdr_path) if tdr_path is not None else output_file.with_suffix('.npz')
+        np.savez_compressed(
+            tdr_file,
+            time_ps=time * 1e12,
+            labels=np.array([endpoint.label for endpoint in endpoints]),
+            impedance=impedance.T.astype(np.float32),
+        )
+        print(
+            f"[prescreen] {len(rows)} pairings, {band.size} points up to Nyquist {nyquist / 1e9:.2f} GHz; "
+            f"TDR profiles saved to {tdr_file}"
+        )
+        return rows
+
+    def _port_admittance(self, frequency) -> np.ndarray:
+        """Load admittance of every port with all TXs passive: (F, N)."""
+        admittance = np.zeros((len(frequency), len(self.port_metadata)), dtype=complex)
+        tx_load = load_admittance(
+            frequency, parse_spice_value(self.tx_config["res_tx"]), parse_spice_value(self.tx_config["cap_tx"]), 'series'
+        )
+        rx_load = load_admittance(
+            frequency, parse_spice_value(self.rx_config["res_rx"]), parse_spice_value(self.rx_config["cap_rx"]), 'shunt'
+        )
+        for tx in self.txs:
+            for sequence in ([tx.pid_pos, tx.pid_neg] if isinstance(tx, Tx_diff) else [tx.pid]):
+                admittance[:, sequence - 1] = tx_load
+        for rx in self.rxs:
+            for sequence in ([rx.pid_pos, rx.pid_neg] if isinstance(rx, Rx_diff) else [rx.pid]):
+                admittance[:, sequence - 1] = rx_load
+        return admittance
+
+    def estimate(self, output_path, tstop='3ns') -> List[Dict[str, object]]:
+        """Lower/upper bounds on the ``calculate`` metrics without a transient solve.
 
-        design = Design(self.workdir, tstep, tstop, version=self.circuit_version)
+        Uses the magnitude of the terminated channel transfer times the TX pulse
+        spectrum; see ``bounds.waveform_bounds`` for the inequalities involved.
+        """
+        if not self.txs or not self.rxs:
+            raise RuntimeError("set_txs and set_rxs must be called before estimate")
+        if self._network is None:
+            raise RuntimeError("scikit-rf is required for the bound estimate")
+
+        frequency_all = np.asarray(self._network.f, dtype=float)
+        frequency_index = estimate_frequency_index(frequency_all)
+        frequency = frequency_all[frequency_index]
+        ui = parse_spice_value(self.ui)
+        window = parse_spice_value(tstop)
+
+        sources = [
+            SourceGroup((tx.pid_pos - 1, tx.pid_neg - 1), (0.5, -0.5)) if isinstance(tx, Tx_diff)
+            else SourceGroup((tx.pid - 1,), (1.0,))
+            for tx in self.txs
+        ]
+        observe_ports: List[int] = []
+        observe_weights = []
+        for rx in self.rxs:
+            if isinstance(rx, Rx_diff):
+                entries = [(rx.pid_pos - 1, 1.0), (rx.pid_neg - 1, -1.0)]
+            else:
+                entries = [(rx.pid - 1, 1.0)]
+            column = np.zeros(len(self.port_metadata))
+            for index, weight in entries:
+                column[index] = weight
+                observe_ports.append(index)
+            observe_weights.append(column)
+        observe_ports = sorted(set(observe_ports))
+        weights = np.array(observe_weights)[:, observe_ports]
+
+        transfer = source_transfer(
+            self._network, frequency_index, self._port_admittance(frequency),
+            parse_spice_value(self.tx_config["res_tx"]), sources, observe_ports,
+        )
+        rx_transfer = weights @ transfer
+        pulse = pulse_spectrum(
+            frequency, parse_spice_value(self.tx_config["vhigh"]), parse_spice_value(self.tx_config["t_rise"]), ui
+        )
+        spectrum = np.abs(rx_transfer) * pulse[:, None, None]
+        flat = waveform_bounds(frequency, spectrum.reshape(frequency.size, -1), ui, window)
+        per_waveform = {key: value.reshape(len(self.rxs), len(self.txs)) for key, value in flat.items()}
+
+        tx_position = {tx: column for column, tx in enumerate(self.txs)}
+        rows: List[Dict[str, object]] = []
+        for rx_row, rx in enumerate(self.rxs):
+            tx_column = tx_position.get(getattr(rx, 'expected_tx', None))
+            if tx_column is None:
+                continue
+            waveforms = [
+                {key: float(value[rx_row, column]) for key, value in per_waveform.items()}
+                for column in range(len(self.txs))
+            ]
+            primary = waveforms[tx_column]
+            aggressors = waveforms[:tx_column] + waveforms[tx_column + 1:]
+            metrics = metric_bounds(primary, aggressors)
+            for position, bound in enumerate(("lower", "upper")):
+                rows.append({
+                    "tx_name": self.txs[tx_column].label,
+                    "rx_name": rx.label,
+                    **{name: value[position] for name, value in metrics.items()},
+                    "bound": bound,
+                })
+
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with output_file.open('w') as f:
+            f.write('tx_name, rx_name, sig(V*ps), isi(V*ps), xtalk(V*ps), pseudo_eye(V*ps), power_ratio, bound\n')
+            f.write('\n'.join(
+                f"{row['tx_name']}, {row['rx_name']}, {row['sig']:.3f}, {row['isi']:.3f}, {row['xtalk']:.3f}, "
+                f"{row['pseudo_eye']:.3f}, {row['power_ratio']:.3f}, {row['bound']}"
+                for row in rows
+            ))
+        print(f"[estimate] {len(rows) // 2} victims bounded from {frequency.size} frequency points")
+        return rows
+
+    def _optimize_problem(self, tstop: float) -> OptimizeProblem:
+        """Channel blocks for the termination search, one per distinct kept-port set."""
+        frequency = np.asarray(self._network.f, dtype=float)
+        tx_sequences = [[tx.pid_pos, tx.pid_neg] if isinstance(tx, Tx_diff) else [tx.pid] for tx in self.txs]
+        tx_amplitudes = [(0.5, -0.5) if isinstance(tx, Tx_diff) else (1.0,) for tx in self.txs]
+        rx_sequences = [[rx.pid_pos, rx.pid_neg] if isinstance(rx, Rx_diff) else [rx.pid] for rx in self.rxs]
+        rx_weights = [(1.0, -1.0) if isinstance(rx, Rx_diff) else (1.0,) for rx in self.rxs]
+        tx_ports = {seq for sequences in tx_sequences for seq in sequences}
+        rx_ports = {seq for sequences in rx_sequences for seq in sequences}
+
+        columns_by_kept: Dict[Tuple[int, ...], List[int]] = {}
+        for column, tx in enumerate(self.txs):
+            columns_by_kept.setdefault(tuple(self._kept_network_sequences(tx)), []).append(column)
+        groups = []
+        for kept, columns in columns_by_kept.items():
+            local = {seq: index for index, seq in enumerate(kept)}
+            indices = [seq - 1 for seq in kept]
+            groups.append(ChannelGroup(
+                f=frequency,
+                s=s_block(self._network, indices, indices),
+                z0=port_z0(self._network, indices),
+                tx_ports=np.array([local[seq] for seq in kept if seq in tx_ports], dtype=int),
+                rx_ports=np.array([local[seq] for seq in kept if seq in rx_ports], dtype=int),
+                sources=[
+                    SourceGroup(tuple(local[seq] for seq in tx_sequences[column]), tx_amplitudes[column])
+                    for column in columns
+                ],
+                tx_columns=columns,
+                observe=[
+                    (row, tuple(local[seq] for seq in sequences), rx_weights[row])
+                    for row, sequences in enumerate(rx_sequences)
+                    if all(seq in local for seq in sequences)
+                ],
+            ))
+
+        tx_position = {tx: column for column, tx in enumerate(self.txs)}
+        signature = json.dumps({
+            "source": self._source_signature(),
+            "kept": [list(kept) for kept in columns_by_kept],
+            "drive": [self.tx_config[key] for key in ("vhigh", "t_rise", "ui")],
+            "tstop": tstop,
+        })
+        return OptimizeProblem(
+            frequency=frequency,
+            groups=groups,
+            rx_labels=[self._object_label(rx) for rx in self.rxs],
+            tx_labels=[self._object_label(tx) for tx in self.txs],
+            expected_tx=[tx_position.get(getattr(rx, 'expected_tx', None)) for rx in self.rxs],
+            vhigh=parse_spice_value(self.tx_config["vhigh"]),
+            t_rise=parse_spice_value(self.tx_config["t_rise"]),
+            ui=parse_spice_value(self.ui),
+            tstop=tstop,
+            base_values={
+                "res_tx": parse_spice_value(self.tx_config["res_tx"]),
+                "cap_tx": parse_spice_value(self.tx_config["cap_tx"]),
+                "res_rx": parse_spice_value(self.rx_config["res_rx"]),
+                "cap_rx": parse_spice_value(self.rx_config["cap_rx"]),
+            },
+            signature=hashlib.sha1(signature.encode('utf-8')).hexdigest(),
+        )
+
+    def optimize(
+        self,
+        output_path,
+        space: Dict[str, Tuple[object, object]],
+        tstop='3ns',
+        objective: str = 'pseudo_eye',
+        levels: int = DEFAULT_LEVELS,
+        rounds: int = DEFAULT_ROUNDS,
+        keep: int = DEFAULT_KEEP,
+        workers: Optional[int] = None,
+    ) -> List[Dict[str, object]]:
+        """Search termination values maximizing the worst victim's ``objective``.
+
+        ``space`` maps res_rx/cap_rx/res_tx/cap_tx to (low, high) bounds; values not in
+        it keep the current settings. Candidates are solved in the frequency domain on
+        the pruned port sets, so no simulator is needed; confirm the pick with ``run``.
+        """
+        if not self.txs or not self.rxs:
+            raise RuntimeError("set_txs and set_rxs must be called before optimize")
+        if self._network is None:
+            raise RuntimeError("scikit-rf is required for termination optimization")
+
+        problem = self._optimize_problem(parse_spice_value(tstop))
+        bounds = {name: (parse_spice_value(low), parse_spice_value(high)) for name, (low, high) in space.items()}
+        results = run_optimization(
+            problem, bounds, self.workdir / OPTIMIZE_CACHE_DIRNAME, objective, levels, rounds, keep,
+            workers if workers is not None else DEFAULT_OPTIMIZE_WORKERS,
+        )
+        write_optimization_table(output_path, results, list(bounds))
+        if results:
+            best = results[0]
+            chosen = ', '.join(f"{name}={best['values'][name]:.4g}" for name in bounds)
+            print(f"[optimize] Best worst-case {objective} {best[f'worst_{objective}']:.3f} at {chosen}")
+        return results
+
+    def run(self, tstep='100ps', tstop='3ns', tx_indices: Optional[Sequence[int]] = None):
+        """Simulate every TX, or only the ``txs`` positions in ``tx_indices``.
+
+        See ``_simulate`` for how the work is pipelined.
+        """
+        if not self.txs or not self.rxs:
+            raise RuntimeError("set_txs and set_rxs must be called before run")
         for rx in self.rxs:
             rx.waveforms.clear()
+        txs = self.txs if tx_indices is None else [self.txs[index] for index in tx_indices]
+        self._simulate([(self, tx) for tx in txs], tstep, tstop)
 
-        for tx in self.txs:
-            prune_result = self._ensure_prune_result(tx)
-            if not self._prerun_summaries:
-                self._log_prune_stats(prune_result.stats)
+    def responses_to(self, tx_index: int) -> Dict[str, Tuple[List[float], List[float]]]:
+        """Waveforms produced by ``txs[tx_index]``, keyed by RX label."""
+        tx = self.txs[tx_index]
+        return {self._object_label(rx): rx.waveforms[tx] for rx in self.rxs if tx in rx.waveforms}
 
-            netlist_lines = self._build_netlist(prune_result, tx)
-            netlist_text = '\n'.join(netlist_lines)
-            self._write_debug_netlist(tx, netlist_text)
-            result = design.run(netlist_text)
-            self._store_waveforms(prune_result, result, tx)
+    def add_responses(self, tx_index: int, responses: Dict[str, Tuple[List[float], List[float]]]) -> None:
+        """Attach waveforms from ``responses_to`` (possibly run elsewhere) for ``calculate``."""
+        tx = self.txs[tx_index]
+        for rx in self.rxs:
+            waveform = responses.get(self._object_label(rx))
+            if waveform is not None:
+                rx.waveforms[tx] = waveform
+
+    def _simulate(self, jobs: List[Tuple['CCT', object]], tstep: str, tstop: str) -> None:
+        """Run (owner, tx) jobs through one backend session with pipelined preparation.
+
+        Without a configured ``backend`` a Nexxim backend is opened for these jobs and
+        closed afterwards. The backend is driven from the calling thread only. A
+        producer thread prunes and renders the next netlists and a consumer thread
+        stores finished waveforms on each job's owner, both through queues of
+        ``RUN_QUEUE_DEPTH`` items so memory stays bounded. Per-TX phase timing, the
+        ETA and this CCT's victim updates go to ``progress`` when it is set.
+        """
+        backend = self.backend
+        if backend is None:
+            backend = AedtBackend(self.workdir, version=self.circuit_version)
+        backend.prepare(tstep, tstop)
+        tracker = RunProgress(len(jobs), self.progress)
+        victims = None
+        if self.progress is not None:
+            victims = VictimUpdates(self, [tx for owner, tx in jobs if owner is self], self.progress)
+        tracker.begin()
+
+        netlists: Queue = Queue(maxsize=RUN_QUEUE_DEPTH)
+        results: Queue = Queue(maxsize=RUN_QUEUE_DEPTH)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        def prepare() -> None:
+            try:
+                for index, (owner, tx) in enumerate(jobs):
+                    started = time.perf_counter()
+                    prune_result = owner._ensure_prune_result(tx)
+                    if not owner._prerun_summaries:
+                        owner._log_prune_stats(prune_result.stats)
+                    pruned = time.perf_counter()
+                    tracker.add(index, 'prune', pruned - started)
+                    netlist_text = '\n'.join(owner._build_netlist(prune_result, tx))
+                    if owner.debug_netlists:
+                        owner._write_debug_netlist(tx, '\n'.join(owner._build_netlist(prune_result, tx, expand=True)))
+                    tracker.add(index, 'netlist', time.perf_counter() - pruned)
+                    if not _put_unless_stopped(netlists, (index, owner, tx, prune_result, netlist_text), stop):
+                        return
+            except BaseException as exc:
+                errors.append(exc)
+            finally:
+                _put_unless_stopped(netlists, None, stop)
+
+        def store() -> None:
+            while True:
+                item = results.get()
+                if item is None:
+                    return
+                if errors:
+                    continue
+                index, owner, prune_result, result, tx = item
+                try:
+                    started = time.perf_counter()
+                    owner._store_waveforms(prune_result, result, tx)
+                    if victims is not None and owner is self:
+                        victims.stored(tx)
+                    tracker.add(index, 'store', time.perf_counter() - started)
+                    tracker.finish(index, owner._object_label(tx))
+                except BaseException as exc:
+                    errors.append(exc)
+                    stop.set()
+
+        # Run the stages in copies of the caller's context so context-bound state
+        # (such as a batch job's output routing) follows them.
+        producer = threading.Thread(target=contextvars.copy_context().run, args=(prepare,), name="cct-netlist", daemon=True)
+        consumer = threading.Thread(target=contextvars.copy_context().run, args=(store,), name="cct-waveforms", daemon=True)
+        producer.start()
+        consumer.start()
+        try:
+            while not stop.is_set():
+                item = netlists.get()
+                if item is None:
+                    break
+                index, owner, tx, prune_result, netlist_text = item
+                # Started here rather than in the producer, so queue wait is not counted.
+                tracker.start(index, owner._object_label(tx))
+                started = time.perf_counter()
+                result = backend.run(netlist_text)
+                split = getattr(backend, 'phase_seconds', None)
+                if split:
+                    for phase, seconds in split.items():
+                        tracker.add(index, phase, seconds)
+                else:
+                    tracker.add(index, 'analyze', time.perf_counter() - started)
+                results.put((index, owner, prune_result, result, tx))
+        finally:
+            stop.set()
+            results.put(None)
+            consumer.join()
+            producer.join()
+            if self.backend is None:
+                backend.close()
+        if errors:
+            raise errors[0]
+        tracker.end()
+
+    def _corner(self, overrides: Dict[str, object]) -> 'CCT':
+        """Copy of this CCT with TX/RX settings overridden, sharing the parsed network and prune.
+
+        Raises ValueError for a key that is not a TX/RX setting or ``name``.
+        """
+        allowed = set(self.tx_config) | set(self.rx_config) | {'name'}
+        unknown = sorted(str(key) for key in overrides if key not in allowed)
+        if unknown:
+            raise ValueError(
+                f"Unknown corner setting {unknown[0]!r}; expected one of {', '.join(sorted(allowed))}"
+            )
+        corner = copy.copy(self)
+        corner._prune_cache = {}
+        corner._prerun_summaries = []
+        corner.set_txs(**{key: overrides.get(key, value) for key, value in self.tx_config.items()})
+        corner.set_rxs(**{key: overrides.get(key, value) for key, value in self.rx_config.items()})
+        return corner
+
+    def sweep(self, corners: List[Dict[str, object]], output_path, tstep='100ps', tstop='3ns') -> List[np.recarray]:
+        """Run every corner x TX simulation through one queue and tabulate all corners.
+
+        Each corner overrides any of vhigh/t_rise/ui/res_tx/cap_tx/res_rx/cap_rx and may
+        carry a ``name``. Touchstone parsing and port pruning are shared by all corners.
+        Writes the consolidated table to ``output_path`` and the worst victim of each
+        corner to ``<stem>_worst.csv``; returns the metrics of each corner.
+        """
+        if self.tx_config is None or self.rx_config is None:
+            raise RuntimeError("set_txs and set_rxs must be called before sweep")
+        contexts = [self._corner(corner) for corner in corners]
+        names = [str(corner.get('name') or f"corner_{index}") for index, corner in enumerate(corners)]
+        self._simulate([(context, tx) for context in contexts for tx in context.txs], tstep, tstop)
+        tables = [context.calculate() for context in contexts]
+
+        settings = list(self.tx_config) + [key for key in self.rx_config]
+        columns = [column for column in metric_columns(self.ber_levels) if tables and column[0] in tables[0].dtype.names]
+        lines, worst_lines = [], []
+        for name, context, table in zip(names, contexts, tables):
+            values = [name] + [str(context.tx_config.get(key, context.rx_config.get(key))) for key in settings]
+            for record in table:
+                lines.append(', '.join(
+                    values + [str(record['tx_name']), str(record['rx_name'])]
+                    + [format(float(record[field]), spec) for field, _, spec in columns]
+                ))
+            if len(table):
+                eye = int(np.argmin(table['pseudo_eye']))
+                height = int(np.argmin(table['eye_height']))
+                worst_lines.append(', '.join(values + [
+                    f"{table['pseudo_eye'][eye]:.3f}", str(table['rx_name'][eye]),
+                    f"{table['eye_height'][height]:.4f}", str(table['rx_name'][height]),
+                    f"{np.min(table['power_ratio']):.3f}",
+                ]))
 
-    def _build_netlist(self, prune_result: PruneResult, active_tx: object) -> List[str]:
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with output_file.open('w') as f:
+            f.write(', '.join(['corner'] + settings + ['tx_name', 'rx_name'] + [header for _, header, _ in columns]) + '\n')
+            f.write('\n'.join(lines))
+        worst_file = output_file.with_name(f"{output_file.stem}_worst.csv")
+        with worst_file.open('w') as f:
+            f.write(', '.join(['corner'] + settings + [
+                'worst_pseudo_eye(V*ps)', 'pseudo_eye_victim', 'worst_eye_height(V)', 'eye_height_victim',
+                'min_power_ratio',
+            ]) + '\n')
+            f.write('\n'.join(worst_lines))
+        print(f"[sweep] {len(contexts)} corners x {len(self.txs)} TXs; table {output_file}, worst cases {worst_file}")
+        return tables
+
+    def _channel_lines(self, prune_result: PruneResult) -> List[str]:
         nets = ' '.join([f'net_{entry.sequence}' for entry in prune_result.trimmed_metadata])
-        netlist = [
+        if prune_result.macromodel_path is not None:
+            return [
+                f'.include "{prune_result.macromodel_path}"',
+                f'X1 {nets} {self._macromodel_name(prune_result.macromodel_path)}',
+            ]
+        return [
             self._channel_model_line(prune_result.touchstone_path),
             f'S1 {nets} FQMODEL="Channel"',
         ]
-        active_key = self._tx_to_key(active_tx)
-        trimmed_active_tx = prune_result.tx_lookup.get(active_key)
+
+    def _shared_netlist_lines(self, prune_result: PruneResult) -> List[str]:
+        """Channel, passive TX loads and RX terminations: everything but the active sources."""
+        netlist = self._channel_lines(prune_result)
         for tx in prune_result.txs:
-            netlist.extend(tx.get_netlist(tx is trimmed_active_tx))
+            netlist.extend(tx.passive)
         for rx in prune_result.rxs:
             netlist.extend(rx.get_netlist())
         return netlist
 
+    def _include_file(self, prune_result: PruneResult) -> Path:
+        """Write the shared netlist block of ``prune_result`` once, named by its content hash."""
+        if prune_result.include_path is None:
+            text = '\n'.join(self._shared_netlist_lines(prune_result)) + '\n'
+            digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+            path = self._include_dir / f"shared_{digest}.inc"
+            if not path.exists():
+                self._include_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(text, encoding='utf-8')
+                os.replace(tmp_path, path)
+            prune_result.include_path = path
+        return prune_result.include_path
+
+    def _build_netlist(self, prune_result: PruneResult, active_tx: object, expand: bool = False) -> List[str]:
+        """Per-TX netlist: the shared block of ``prune_result`` plus the active TX sources.
+
+        With ``expand`` the shared block is inlined instead of included.
+        """
+        if expand:
+            netlist = self._shared_netlist_lines(prune_result)
+        else:
+            netlist = [f'.include "{self._include_file(prune_result)}"']
+        trimmed_active_tx = prune_result.tx_lookup.get(self._tx_to_key(active_tx))
+        if trimmed_active_tx is not None:
+            netlist.extend(trimmed_active_tx.source)
+        return netlist
+
     def _store_waveforms(self, prune_result: PruneResult, result: Dict[int, Tuple[List[float], List[float]]], base_tx: object) -> None:
         for rx in prune_result.rxs:
             base_rx = self._rx_lookup.get(self._rx_to_key(rx))
@@ -835,22 +1810,106 @@ class CCT:
                     )
                     base_rx.waveforms[base_tx] = new_result
 
-    def calculate(self, output_path):
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+    def calculate(self, output_path: Optional[str | Path] = None) -> np.recarray:
+        """Per-victim metrics as a record array with full-precision fields.
+
+        With ``output_path`` the results archive, CSV and crosstalk files are also
+        written next to it; without it nothing touches the disk.
+        """
+        output_file = Path(output_path) if output_path is not None else None
+        if output_file is not None:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
 
         ui = float(self.ui.replace('ps', ''))
 
-        result = []
+        rows: List[Dict[str, object]] = []
+        labels: List[str] = []
+        cursor_sets = []
+        tx_column = {tx: column for column, tx in enumerate(self.txs)}
+        xtalk_rows: List[np.ndarray] = []
         for rx in self.rxs:
-            if not getattr(rx, 'waveforms', None):
-                continue
-            primary_tx = getattr(rx, 'expected_tx', None)
-            if primary_tx is None:
-                continue
-            waveform_primary = rx.waveforms.get(primary_tx)
-            if waveform_primary is None:
+            victim_result = self._victim_metrics(rx, ui, tx_column)
+            if victim_result is None:
                 continue
+            row, contributions, cursors = victim_result
+            rows.append(row)
+            xtalk_rows.append(contributions)
+            cursor_sets.append(cursors)
+            labels.append(row["rx_name"])
+
+        columns = metric_columns()
+        if cursor_sets:
+            columns = metric_columns(self.ber_levels)
+            stat = statistical_eye(cursor_sets, ui, self.ber_levels, contours=self.stat_eye_contours)
+            for row, heights, widths in zip(rows, stat["eye_height"], stat["eye_width"]):
+                for ber, height, width in zip(self.ber_levels, heights, widths):
+                    row[f"stat_eye_height@{ber:g}"] = height
+                    row[f"stat_eye_width@{ber:g}"] = width
+            if self.stat_eye_contours and output_file is not None:
+                contour_path = output_file.with_name(f"{output_file.stem}_stateye.npz")
+                np.savez_compressed(
+                    contour_path,
+                    rx_labels=np.array(labels),
+                    ber_levels=stat["ber_levels"],
+                    phase_ps=(np.arange(stat["ber"].shape[1]) / stat["ber"].shape[1] - 0.5) * ui,
+                    voltage=stat["voltage"],
+                    ber=stat["ber"],
+                )
+                print(f"[stateye] BER contours saved to {contour_path}")
+
+        metrics = metrics_array(rows, columns)
+        if output_file is None:
+            return metrics.view(np.recarray)
+
+        archive_path = write_archive(
+            output_file.with_suffix(ARCHIVE_SUFFIX),
+            metrics,
+            columns,
+            self._run_settings(),
+            [result.stats for result in self._prune_cache.values()],
+            {
+                (self._object_label(rx), self._object_label(tx)): waveform
+                for rx in self.rxs
+                for tx, waveform in getattr(rx, 'waveforms', {}).items()
+            },
+        )
+        print(f"[archive] Results archive saved to {archive_path}")
+        write_metrics_csv(output_file, metrics, columns)
+
+        if xtalk_rows:
+            self._write_xtalk_matrix(output_file, labels, np.vstack(xtalk_rows))
+        return metrics.view(np.recarray)
+
+    def _victim_metrics(
+        self,
+        rx: object,
+        ui: float,
+        tx_column: Optional[Dict[object, int]] = None,
+        integrals: Optional[Tuple[float, float, float, Dict[object, float]]] = None,
+    ) -> Optional[Tuple[Dict[str, object], np.ndarray, object]]:
+        """Metrics row, per-TX crosstalk contributions and interference cursors of one victim.
+
+        ``integrals`` is (sig, isi, xtalk, {aggressor tx: contribution}) already
+        accumulated by the caller; without it they are integrated from the waveforms.
+        None until the victim's primary TX waveform is stored.
+        """
+        if not getattr(rx, 'waveforms', None):
+            return None
+        primary_tx = getattr(rx, 'expected_tx', None)
+        if primary_tx is None:
+            return None
+        waveform_primary = rx.waveforms.get(primary_tx)
+        if waveform_primary is None:
+            return None
+        if tx_column is None:
+            tx_column = {tx: column for column, tx in enumerate(self.txs)}
+        contributions = np.full(len(self.txs), np.nan)
+        if integrals is not None:
+            sig, isi, xtalk, per_tx = integrals
+            for tx, contribution in per_tx.items():
+                if tx in tx_column:
+                    contributions[tx_column[tx]] = contribution
+        else:
             sig = isi = 0.0
             xtalk = 0.0
             for tx, waveform in rx.waveforms.items():
@@ -858,20 +1917,84 @@ class CCT:
                 if tx == primary_tx:
                     sig, isi = get_sig_isi(time, voltage, ui)
                 else:
-                    xtalk += integrate_nonuniform(time, [abs(v) for v in voltage])
-            pseudo_eye = sig - isi - xtalk
-            denom = isi + xtalk
-            p_ratio = sig / denom if denom else float('inf')
-
-            tx_label = getattr(primary_tx, 'label', getattr(primary_tx, 'pid', 'unknown'))
-            rx_label = getattr(rx, 'label', str(getattr(rx, 'pid', 'unknown')))
-            result.append(
-                f'{tx_label}, {rx_label}, {sig:.3f}, {isi:.3f}, {xtalk:.3f}, {pseudo_eye:.3f}, {p_ratio:.3f}'
-            )
+                    contribution = integrate_nonuniform(time, [abs(v) for v in voltage])
+                    xtalk += contribution
+                    if tx in tx_column:
+                        contributions[tx_column[tx]] = contribution
+        pseudo_eye = sig - isi - xtalk
+        denom = isi + xtalk
+        p_ratio = sig / denom if denom else float('inf')
+        aggressors = [waveform for tx, waveform in rx.waveforms.items() if tx != primary_tx]
+        victim, main, others = cursor_matrices(waveform_primary, aggressors, ui)
+        eye = peak_distortion(victim, main, others, ui)
+
+        row = {
+            "tx_name": self._object_label(primary_tx),
+            "rx_name": self._object_label(rx),
+            "sig": sig,
+            "isi": isi,
+            "xtalk": xtalk,
+            "pseudo_eye": pseudo_eye,
+            "power_ratio": p_ratio,
+            "eye_height": eye["eye_height"],
+            "eye_width": eye["eye_width"],
+        }
+        return row, contributions, interference_cursors(victim, main, others)
 
-        with output_file.open('w') as f:
-            f.writelines('tx_name, rx_name, sig(V*ps), isi(V*ps), xtalk(V*ps), pseudo_eye(V*ps), power_ratio\n')
-            f.write('\n'.join(result))
+    @staticmethod
+    def _rx_sequences(rx: object) -> Tuple[int, ...]:
+        if isinstance(rx, Rx_diff):
+            return (rx.pid_pos, rx.pid_neg)
+        return (rx.sequence,)
+
+    @staticmethod
+    def _object_label(obj: object) -> str:
+        return str(getattr(obj, 'label', getattr(obj, 'pid', 'unknown')))
+
+    def _run_settings(self) -> Dict[str, object]:
+        return {
+            "snp_path": self.snp_path,
+            "circuit_version": self.circuit_version,
+            "threshold_db": self.threshold_db,
+            "ui": self.ui,
+            "tx_config": self.tx_config,
+            "rx_config": self.rx_config,
+            "ber_levels": list(self.ber_levels),
+            "tx_labels": [self._object_label(tx) for tx in self.txs],
+            "rx_labels": [self._object_label(rx) for rx in self.rxs],
+        }
+
+    def _write_xtalk_matrix(self, output_file: Path, rx_labels: List[str], matrix: np.ndarray) -> None:
+        """Victim x aggressor crosstalk integrals (V*ps) as npz plus a top-K aggressor CSV.
+
+        NaN marks a victim's own TX and aggressors that were not simulated for it.
+        """
+        tx_labels = [self._object_label(tx) for tx in self.txs]
+        matrix_path = output_file.with_name(f"{output_file.stem}_xtalk.npz")
+        np.savez_compressed(
+            matrix_path,
+            rx_labels=np.array(rx_labels),
+            tx_labels=np.array(tx_labels),
+            xtalk=matrix.astype(np.float32),
+        )
+
+        filled = np.nan_to_num(matrix, nan=-np.inf)
+        count = min(self.top_aggressors, matrix.shape[1])
+        order = np.argsort(-filled, axis=1)[:, :count]
+        totals = np.nansum(matrix, axis=1)
+        lines = []
+        for row, rx_label in enumerate(rx_labels):
+            for rank, column in enumerate(order[row], 1):
+                value = matrix[row, column]
+                if not np.isfinite(value):
+                    break
+                share = value / totals[row] if totals[row] else 0.0
+                lines.append(f'{rx_label}, {rank}, {tx_labels[column]}, {value:.3f}, {share:.1%}')
+        top_path = output_file.with_name(f"{output_file.stem}_top_aggressors.csv")
+        with top_path.open('w') as f:
+            f.write('rx_name, rank, aggressor, xtalk(V*ps), share\n')
+            f.write('\n'.join(lines))
+        print(f"[xtalk] Aggressor matrix saved to {matrix_path}; top {count} per victim in {top_path}")
 
     def _write_debug_netlist(self, tx_obj: object, netlist_text: str) -> None:
         if not netlist_text:
@@ -880,11 +2003,11 @@ class CCT:
         label = getattr(tx_obj, 'label', f"tx_{sequence if sequence is not None else 'unknown'}")
         sanitized = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'tx'
         if sequence is not None:
-            filename = f"netlist_{sequence:03d}_{sanitized}.cir"
+            filename = f"netlist_{sequence:03d}_{sanitized}.cir.gz"
         else:
-            filename = f"netlist_{sanitized}.cir"
-        path = NETLIST_DEBUG_DIR / filename
-        path.write_text(netlist_text, encoding='utf-8')
+            filename = f"netlist_{sanitized}.cir.gz"
+        with gzip.open(NETLIST_DEBUG_DIR / filename, 'wt', encoding='utf-8') as f:
+            f.write(netlist_text)
 
 
 if __name__ == '__main__':
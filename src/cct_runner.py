@@ -1,10 +1,19 @@
 import argparse
+import contextlib
+import contextvars
+import itertools
 import json
 import logging
+import os
 import sys
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 # Ensure the 'src' directory is in the Python path
 # to allow importing the 'cct' module.
 ROOT_DIR = Path(__file__).resolve().parent
@@ -16,7 +25,19 @@ else:
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from cct import CCT, DEFAULT_CIRCUIT_VERSION
+from cct import CCT, DEFAULT_TOP_AGGRESSORS, AedtBackend
+from file_queue import DEFAULT_LEASE_SECONDS, FileQueue, LeaseKeeper, worker_name
+from optimize import DEFAULT_KEEP, DEFAULT_LEVELS, DEFAULT_ROUNDS
+from progress import print_event
+from sim_backend import RecordingBackend, ReplayBackend, SharedBackend
+
+QUEUE_POLL_SECONDS = 1.0
+JOB_LOG_NAME = 'runner.log'
+RUNNER_MODES = ['run', 'prerun', 'prescreen', 'estimate', 'optimize', 'sweep']
+DEFAULT_OPTIMIZE_SPACE = {
+    'res_rx': ['20ohm', '200ohm'],
+    'cap_rx': ['0.1pF', '2pF'],
+}
 
 
 def main():
@@ -31,17 +52,46 @@ def main():
     - stdout is used for structured messages:
       - "MESSAGE: <text>" for status updates.
       - "PROGRESS: <step>" for progress bar updates.
+      - "EVENT: <json>" for simulation progress: run_start, tx_start, tx_end (per-TX
+        phase seconds, done/total and ETA), victim (partial or final metrics of one
+        receiver) and run_end (phase totals).
       - "FINISHED: <payload>" on successful completion.
+      - "STATUS: <json>" per job (or queue item) state change in --batch, --queue
+        and --worker modes. In --batch mode the other lines of each job go to
+        runner.log in its workdir.
     - stderr is used for error reporting.
     """
     parser = argparse.ArgumentParser(description="CCT Runner")
-    parser.add_argument("--touchstone-path", required=True, type=Path)
-    parser.add_argument("--metadata-path", required=True, type=Path)
+    parser.add_argument("--touchstone-path", type=Path)
+    parser.add_argument("--metadata-path", type=Path)
     parser.add_argument("--output-path", type=Path, default=None)
     parser.add_argument("--workdir", required=True, type=Path)
-    parser.add_argument("--settings", required=True, type=str, help="JSON string of CCT settings")
-    parser.add_argument("--mode", required=True, choices=['run', 'prerun'])
+    parser.add_argument("--settings", type=str, help="JSON string of CCT settings")
+    parser.add_argument("--mode", choices=RUNNER_MODES)
+    parser.add_argument("--backend", choices=['aedt', 'record', 'replay'], default='aedt',
+                        help="Simulator for run mode; record/replay store and serve waveforms in --backend-dir")
+    parser.add_argument("--backend-dir", type=Path, default=None,
+                        help="Recording directory (default: <workdir>/recordings)")
+    parser.add_argument("--batch", type=str, default=None,
+                        help="JSON-lines job file, or '-' for stdin; each line holds touchstone, metadata, "
+                             "settings, output and optionally mode, workdir and id")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Batch jobs run at once; simulator calls are still serialized")
+    parser.add_argument("--queue", type=Path, default=None,
+                        help="Shared queue directory; with --batch, split run jobs into per-TX items there and merge the results")
+    parser.add_argument("--worker", action="store_true",
+                        help="Simulate items from --queue until it is sealed and drained")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Seconds without a heartbeat before a claimed queue item is handed to another worker")
     args = parser.parse_args()
+    if args.worker and args.queue is None:
+        parser.error("--worker requires --queue")
+    if args.queue is not None and not args.worker and args.batch is None:
+        parser.error("--queue requires --batch (coordinator) or --worker")
+    if args.batch is None and not args.worker:
+        missing = [name for name in ('touchstone_path', 'metadata_path', 'settings', 'mode') if getattr(args, name) is None]
+        if missing:
+            parser.error(f"the following arguments are required without --batch: {', '.join(missing)}")
 
     # Ensure the working directory exists before setting up logging
     args.workdir.mkdir(parents=True, exist_ok=True)
@@ -56,97 +106,590 @@ def main():
     logging.info(f"Args: {args}")
 
     try:
-        settings = json.loads(args.settings)
+        if args.worker:
+            failures = run_queue_worker(args)
+            if failures:
+                sys.exit(1)
+        elif args.queue is not None:
+            failures = run_queue_coordinator(args)
+            if failures:
+                sys.exit(1)
+        elif args.batch is not None:
+            failures = run_batch(args)
+            if failures:
+                sys.exit(1)
+        else:
+            run_job(args, json.loads(args.settings))
 
-        print("MESSAGE: Preparing CCT inputs...")
-        print("PROGRESS: 0")
-        logging.info("Preparing CCT inputs.")
+    except Exception:
+        logging.error("An exception occurred in CCT Runner.", exc_info=True)
+        # Use stderr for exceptions to separate them from normal output.
+        traceback.print_exc(file=sys.stderr)
+        sys.exit(1)
 
-        options = settings.get('options') or settings.get('prune', {})
-        threshold_raw = options.get('threshold_db') if isinstance(options, dict) else None
-        try:
-            threshold_value = float(threshold_raw) if threshold_raw is not None else None
-        except (TypeError, ValueError):
-            threshold_value = None
-
-        circuit_version = None
-        if isinstance(options, dict):
-            version_candidate = options.get('circuit_version')
-            if version_candidate is not None:
-                circuit_version = str(version_candidate).strip() or None
-
-        logging.info("Initializing CCT object.")
-        cct = CCT(
-            str(args.touchstone_path),
-            str(args.metadata_path),
-            workdir=args.workdir,
-            threshold_db=threshold_value,
-            circuit_version=circuit_version,
-        )
-        logging.info("CCT object initialized.")
-
-        print("MESSAGE: Configuring transmit settings...")
-        print("PROGRESS: 1")
-        logging.info("Configuring transmit settings.")
-        tx = settings.get('tx', {})
-        cct.set_txs(
-            vhigh=tx.get('vhigh', ''),
-            t_rise=tx.get('t_rise', ''),
-            ui=tx.get('ui', ''),
-            res_tx=tx.get('res_tx', ''),
-            cap_tx=tx.get('cap_tx', ''),
-        )
-        logging.info("Transmit settings configured.")
-
-        print("MESSAGE: Configuring receive settings...")
-        print("PROGRESS: 2")
-        logging.info("Configuring receive settings.")
-        rx = settings.get('rx', {})
-        cct.set_rxs(
-            res_rx=rx.get('res_rx', ''),
-            cap_rx=rx.get('cap_rx', ''),
+    logging.info("CCT Runner finished successfully.")
+
+
+def run_job(job, settings, backend=None, backend_for=None):
+    """Run one CCT job described by ``job`` (paths, mode, backend options).
+
+    With ``backend``, or ``backend_for`` mapping the job's circuit version to a
+    session, the job uses that simulator session and leaves it open; otherwise it
+    creates one from ``job.backend`` and closes it when done. Returns the FINISHED payload.
+    """
+    print("MESSAGE: Preparing CCT inputs...")
+    print("PROGRESS: 0")
+    logging.info("Preparing CCT inputs.")
+
+    cct = _create_cct(job, settings)
+    options = settings.get('options') or settings.get('prune', {})
+    if backend is None and backend_for is not None:
+        backend = backend_for(cct.circuit_version)
+    owns_backend = backend is None
+    cct.backend = _create_backend(job, cct.workdir, cct.circuit_version) if owns_backend else backend
+    cct.progress = print_event
+    logging.info("CCT object initialized.")
+
+    preflight = bool(options.get('preflight', False)) if isinstance(options, dict) else False
+    enforce_passivity = bool(options.get('enforce_passivity', False)) if isinstance(options, dict) else False
+    if preflight or enforce_passivity:
+        print("MESSAGE: Checking network passivity and causality...")
+        logging.info("Running network pre-flight check.")
+        report = cct.preflight(enforce=enforce_passivity)
+        if report.get('passivity_violations') and 'enforced_path' not in report:
+            print(f"MESSAGE: Network is not passive at {report['passivity_violations']} frequency points")
+        if report.get('causality_violations'):
+            print(f"MESSAGE: {report['causality_violations']} S-parameter entries look non-causal")
+        logging.info(f"Pre-flight report: {report}")
+
+    print("MESSAGE: Configuring transmit settings...")
+    print("PROGRESS: 1")
+    logging.info("Configuring transmit settings.")
+    _apply_tx_settings(cct, settings)
+    logging.info("Transmit settings configured.")
+
+    print("MESSAGE: Configuring receive settings...")
+    print("PROGRESS: 2")
+    logging.info("Configuring receive settings.")
+    _apply_rx_settings(cct, settings)
+    logging.info("Receive settings configured.")
+
+    if job.mode == 'prerun':
+        print("MESSAGE: Running pre-run threshold analysis...")
+        print("PROGRESS: 3")
+        logging.info("Running pre-run threshold analysis.")
+        summaries = cct.pre_run()
+        summary_text = _summarize_prerun(summaries, cct.threshold_db)
+        print("PROGRESS: 4")
+        print(f"FINISHED: {summary_text}")
+        logging.info("Pre-run finished.")
+        return summary_text
+
+    if job.mode == 'prescreen':
+        print("MESSAGE: Running frequency-domain pre-screen...")
+        print("PROGRESS: 3")
+        logging.info("Running frequency-domain pre-screen.")
+        output_path = job.output_path or job.metadata_path.with_name('cct_prescreen.csv')
+        cct.prescreen(output_path=str(output_path))
+        print("PROGRESS: 4")
+        print(f"MESSAGE: Pre-screen report saved to {output_path}")
+        print(f"FINISHED: {output_path}")
+        logging.info(f"Pre-screen report saved to {output_path}")
+        return str(output_path)
+
+    if job.mode == 'estimate':
+        print("MESSAGE: Estimating metric bounds from the frequency response...")
+        print("PROGRESS: 3")
+        logging.info("Estimating metric bounds.")
+        output_path = job.output_path or job.metadata_path.with_name('cct_estimate.csv')
+        run_params = settings.get('run', {})
+        cct.estimate(output_path=str(output_path), tstop=run_params.get('tstop') or '3ns')
+        print("PROGRESS: 4")
+        print(f"MESSAGE: Bound estimate saved to {output_path}")
+        print(f"FINISHED: {output_path}")
+        logging.info(f"Bound estimate saved to {output_path}")
+        return str(output_path)
+
+    if job.mode == 'optimize':
+        print("MESSAGE: Searching termination values...")
+        print("PROGRESS: 3")
+        logging.info("Running termination optimization.")
+        search = settings.get('optimize') or {}
+        space = search.get('parameters') or DEFAULT_OPTIMIZE_SPACE
+        output_path = job.output_path or job.metadata_path.with_name('cct_optimize.csv')
+        run_params = settings.get('run', {})
+        results = cct.optimize(
+            output_path=str(output_path),
+            space={name: tuple(bounds) for name, bounds in space.items()},
+            tstop=run_params.get('tstop') or '3ns',
+            objective=search.get('objective', 'pseudo_eye'),
+            levels=int(search.get('levels', DEFAULT_LEVELS)),
+            rounds=int(search.get('rounds', DEFAULT_ROUNDS)),
+            keep=int(search.get('keep', DEFAULT_KEEP)),
+            workers=int(search['workers']) if search.get('workers') not in (None, '') else None,
         )
-        logging.info("Receive settings configured.")
-
-        if args.mode == 'prerun':
-            print("MESSAGE: Running pre-run threshold analysis...")
-            print("PROGRESS: 3")
-            logging.info("Running pre-run threshold analysis.")
-            summaries = cct.pre_run()
-            summary_text = _summarize_prerun(summaries, threshold_value)
-            print("PROGRESS: 4")
-            print(f"FINISHED: {summary_text}")
-            logging.info("Pre-run finished.")
-            return
-
-        print("MESSAGE: Running transient simulation...")
+        print("PROGRESS: 4")
+        print(f"MESSAGE: {len(results)} candidates evaluated; table saved to {output_path}")
+        print(f"FINISHED: {output_path}")
+        logging.info(f"Optimization table saved to {output_path}")
+        return str(output_path)
+
+    if job.mode == 'sweep':
+        corners = _expand_corners(settings.get('corners'))
+        if not corners:
+            raise RuntimeError('Corner sweep requires a non-empty "corners" setting')
+        print(f"MESSAGE: Running corner sweep over {len(corners)} corners...")
         print("PROGRESS: 3")
-        logging.info("Running transient simulation.")
+        logging.info(f"Running corner sweep over {len(corners)} corners.")
+        output_path = job.output_path or job.metadata_path.with_name('cct_sweep.csv')
         run_params = settings.get('run', {})
+        try:
+            cct.sweep(
+                corners,
+                output_path=str(output_path),
+                tstep=run_params.get('tstep', ''),
+                tstop=run_params.get('tstop', ''),
+            )
+        finally:
+            if owns_backend and cct.backend is not None:
+                cct.backend.close()
+        print("PROGRESS: 4")
+        print(f"MESSAGE: Corner sweep saved to {output_path}")
+        print(f"FINISHED: {output_path}")
+        logging.info(f"Corner sweep saved to {output_path}")
+        return str(output_path)
+
+    print("MESSAGE: Running transient simulation...")
+    print("PROGRESS: 3")
+    logging.info("Running transient simulation.")
+    run_params = settings.get('run', {})
+    try:
         cct.run(
             tstep=run_params.get('tstep', ''),
             tstop=run_params.get('tstop', ''),
         )
-        logging.info("Transient simulation finished.")
+    finally:
+        if owns_backend and cct.backend is not None:
+            cct.backend.close()
+    logging.info("Transient simulation finished.")
+
+    print("MESSAGE: Generating CCT report...")
+    print("PROGRESS: 4")
+    logging.info("Generating CCT report.")
+    if job.output_path is None:
+        raise RuntimeError('Output path not provided for CCT run')
+    cct.calculate(output_path=str(job.output_path))
+    logging.info(f"CCT report saved to {job.output_path}")
+
+    print(f"MESSAGE: CCT results saved to {job.output_path}")
+    print(f"FINISHED: {job.output_path}")
+    return str(job.output_path)
+
+
+def _create_cct(job, settings):
+    """CCT for ``job`` with the constructor options from ``settings['options']``."""
+    options = settings.get('options') or settings.get('prune', {})
+    threshold_raw = options.get('threshold_db') if isinstance(options, dict) else None
+    try:
+        threshold_value = float(threshold_raw) if threshold_raw is not None else None
+    except (TypeError, ValueError):
+        threshold_value = None
+
+    circuit_version = None
+    if isinstance(options, dict):
+        version_candidate = options.get('circuit_version')
+        if version_candidate is not None:
+            circuit_version = str(version_candidate).strip() or None
+
+    compact_network = bool(options.get('compact_network', False)) if isinstance(options, dict) else False
+    trim_workers = None
+    if isinstance(options, dict) and options.get('trim_workers') is not None:
+        try:
+            trim_workers = int(options['trim_workers'])
+        except (TypeError, ValueError):
+            trim_workers = None
 
-        print("MESSAGE: Generating CCT report...")
-        print("PROGRESS: 4")
-        logging.info("Generating CCT report.")
-        if args.output_path is None:
-            raise RuntimeError('Output path not provided for CCT run')
-        cct.calculate(output_path=str(args.output_path))
-        logging.info(f"CCT report saved to {args.output_path}")
+    decimate_tol = None
+    if isinstance(options, dict) and options.get('decimate_tol') not in (None, ''):
+        try:
+            decimate_tol = float(options['decimate_tol'])
+        except (TypeError, ValueError):
+            decimate_tol = None
 
-        print(f"MESSAGE: CCT results saved to {args.output_path}")
-        print(f"FINISHED: {args.output_path}")
+    macromodel = bool(options.get('macromodel', False)) if isinstance(options, dict) else False
+    macromodel_poles = None
+    if isinstance(options, dict) and options.get('macromodel_poles') not in (None, ''):
+        try:
+            macromodel_poles = int(options['macromodel_poles'])
+        except (TypeError, ValueError):
+            macromodel_poles = None
 
-    except Exception:
-        logging.error("An exception occurred in CCT Runner.", exc_info=True)
-        # Use stderr for exceptions to separate them from normal output.
-        traceback.print_exc(file=sys.stderr)
-        sys.exit(1)
+    fold_terminations = bool(options.get('fold_terminations', False)) if isinstance(options, dict) else False
 
-    logging.info("CCT Runner finished successfully.")
+    ber_levels = None
+    if isinstance(options, dict) and options.get('ber_levels') not in (None, ''):
+        raw_levels = options['ber_levels']
+        if isinstance(raw_levels, str):
+            raw_levels = raw_levels.replace(';', ',').split(',')
+        try:
+            ber_levels = [float(level) for level in raw_levels if str(level).strip()]
+        except (TypeError, ValueError):
+            ber_levels = None
+    stat_eye_contours = bool(options.get('stat_eye_contours', False)) if isinstance(options, dict) else False
+    top_aggressors = DEFAULT_TOP_AGGRESSORS
+    if isinstance(options, dict) and options.get('top_aggressors') not in (None, ''):
+        try:
+            top_aggressors = int(options['top_aggressors'])
+        except (TypeError, ValueError):
+            top_aggressors = DEFAULT_TOP_AGGRESSORS
+
+    debug_netlists = bool(options.get('debug_netlists', False)) if isinstance(options, dict) else False
+
+    logging.info("Initializing CCT object.")
+    return CCT(
+        str(job.touchstone_path),
+        str(job.metadata_path),
+        workdir=job.workdir,
+        threshold_db=threshold_value,
+        circuit_version=circuit_version,
+        compact_network=compact_network,
+        trim_workers=trim_workers,
+        decimate_tol=decimate_tol,
+        macromodel=macromodel,
+        macromodel_poles=macromodel_poles,
+        fold_terminations=fold_terminations,
+        ber_levels=ber_levels,
+        stat_eye_contours=stat_eye_contours,
+        top_aggressors=top_aggressors,
+        debug_netlists=debug_netlists,
+    )
+
+
+def _apply_tx_settings(cct, settings):
+    tx = settings.get('tx', {})
+    cct.set_txs(
+        vhigh=tx.get('vhigh', ''),
+        t_rise=tx.get('t_rise', ''),
+        ui=tx.get('ui', ''),
+        res_tx=tx.get('res_tx', ''),
+        cap_tx=tx.get('cap_tx', ''),
+    )
+
+
+def _apply_rx_settings(cct, settings):
+    rx = settings.get('rx', {})
+    cct.set_rxs(
+        res_rx=rx.get('res_rx', ''),
+        cap_rx=rx.get('cap_rx', ''),
+    )
+
+
+class _RoutedStdout:
+    """``sys.stdout`` stand-in that sends writes to the stream routed in the current context.
+
+    Batch jobs print MESSAGE, PROGRESS, EVENT and FINISHED lines like a single run;
+    routing them to per-job logs keeps concurrent jobs apart and leaves the runner's
+    own stdout to STATUS lines and the final FINISHED. The route is a context
+    variable, so threads a job starts in a copied context write to the same log.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._target = contextvars.ContextVar('runner_stdout', default=None)
+
+    def _current(self):
+        return self._target.get() or self.stream
+
+    def write(self, text):
+        return self._current().write(text)
+
+    def flush(self):
+        self._current().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextlib.contextmanager
+    def routed(self, path):
+        with open(path, 'w', encoding='utf-8', buffering=1) as handle:
+            token = self._target.set(handle)
+            try:
+                yield handle
+            finally:
+                self._target.reset(token)
+
+
+def _status(lock, **payload):
+    with lock:
+        print(f"STATUS: {json.dumps(payload)}", flush=True)
+
+
+def _job_from_spec(spec, args, job_id):
+    """Job namespace and settings for one JSON-lines job; backend options come from ``args``."""
+    settings = spec.get('settings') or {}
+    if isinstance(settings, str):
+        settings = json.loads(settings)
+    job = argparse.Namespace(
+        touchstone_path=Path(spec['touchstone']),
+        metadata_path=Path(spec['metadata']),
+        output_path=Path(spec['output']) if spec.get('output') else None,
+        workdir=Path(spec.get('workdir') or args.workdir / f"job_{job_id}"),
+        mode=spec.get('mode', 'run'),
+        backend=args.backend,
+        backend_dir=args.backend_dir,
+    )
+    if job.mode not in RUNNER_MODES:
+        raise ValueError(f"Unsupported mode {job.mode!r}")
+    job.workdir.mkdir(parents=True, exist_ok=True)
+    return job, settings
+
+
+def _read_jobs(source):
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        jobs = []
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                jobs.append(json.loads(line))
+        return jobs
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(args):
+    """Run every job of ``--batch`` in this process through warm simulator sessions.
+
+    Jobs share one session per circuit version, opened when the first job of that
+    version starts. Jobs run ``--concurrency`` at a time; each reports STATUS lines
+    with its id and state (started, finished or failed), and its own
+    MESSAGE/PROGRESS/EVENT lines go to ``runner.log`` in its workdir. Stdout carries
+    only STATUS lines and one final FINISHED. Returns the number of failed jobs.
+    """
+    jobs = _read_jobs(args.batch)
+    sessions = {}
+    session_lock = threading.Lock()
+    lock = threading.Lock()
+    output = _RoutedStdout(sys.stdout)
+
+    def session_for(version):
+        with session_lock:
+            if version not in sessions:
+                inner = _create_backend(args, args.workdir, version)
+                if inner is None:
+                    inner = AedtBackend(args.workdir, version=version)
+                sessions[version] = SharedBackend(inner)
+            return sessions[version]
+
+    def execute(number, spec):
+        job_id = str(spec.get('id', number))
+        try:
+            job, settings = _job_from_spec(spec, args, job_id)
+            log_path = job.workdir / JOB_LOG_NAME
+            _status(lock, job=job_id, state='started', mode=job.mode, log=str(log_path))
+            started = time.perf_counter()
+            with output.routed(log_path):
+                payload = run_job(job, settings, backend_for=session_for)
+        except Exception as exc:
+            logging.error(f"Batch job {job_id} failed.", exc_info=True)
+            _status(lock, job=job_id, state='failed', error=f"{type(exc).__name__}: {exc}")
+            return False
+        _status(lock, job=job_id, state='finished', output=payload,
+                seconds=round(time.perf_counter() - started, 3))
+        return True
+
+    sys.stdout = output
+    try:
+        if args.concurrency <= 1:
+            outcomes = [execute(number, spec) for number, spec in enumerate(jobs, 1)]
+        else:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                outcomes = list(pool.map(lambda item: execute(*item), enumerate(jobs, 1)))
+    finally:
+        sys.stdout = output.stream
+        for session in sessions.values():
+            session.shutdown()
+    failures = outcomes.count(False)
+    print(f"FINISHED: {json.dumps({'jobs': len(jobs), 'failed': failures})}", flush=True)
+    return failures
+
+
+def _write_responses(path, responses):
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    labels = list(responses)
+    np.savez_compressed(
+        tmp_path,
+        labels=np.array(labels, dtype=str),
+        **{f"response_{index}": np.vstack([np.asarray(time, dtype=float), np.asarray(voltage, dtype=float)])
+           for index, (time, voltage) in enumerate(responses[label] for label in labels)},
+    )
+    os.replace(tmp_path, path)
+
+
+def _read_responses(path):
+    with np.load(path) as data:
+        return {
+            str(label): (data[f"response_{index}"][0].tolist(), data[f"response_{index}"][1].tolist())
+            for index, label in enumerate(data['labels'])
+        }
+
+
+def run_queue_worker(args):
+    """Claim per-TX items from ``--queue`` and simulate them until the queue is sealed and drained.
+
+    Waveforms go back to the queue's ``results/`` directory. Items of the same job
+    reuse the parsed network; all items share one simulator session.
+    Returns the number of items that failed here.
+    """
+    queue = FileQueue(args.queue)
+    worker = worker_name()
+    lock = threading.Lock()
+    backend = None
+    context = None
+    finished = failed = 0
+    logging.info(f"Queue worker {worker} polling {queue.root}")
+    try:
+        while True:
+            claim = queue.claim(worker)
+            if claim is None:
+                if queue.drained:
+                    break
+                queue.reclaim_expired(args.lease)
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+            started = time.perf_counter()
+            try:
+                with LeaseKeeper(queue, claim, args.lease) as lease:
+                    job_id = str(claim.payload['job'])
+                    if context is None or context[0] != job_id:
+                        job, settings = _job_from_spec(claim.payload['spec'], args, job_id)
+                        cct = _create_cct(job, settings)
+                        _apply_tx_settings(cct, settings)
+                        _apply_rx_settings(cct, settings)
+                        if backend is None:
+                            backend = _create_backend(args, args.workdir, cct.circuit_version)
+                            if backend is None:
+                                backend = AedtBackend(args.workdir, version=cct.circuit_version)
+                        cct.backend = backend
+                        context = (job_id, cct, settings.get('run', {}))
+                    _, cct, run_params = context
+                    tx_index = int(claim.payload['tx_index'])
+                    cct.run(
+                        tstep=run_params.get('tstep', ''),
+                        tstop=run_params.get('tstop', ''),
+                        tx_indices=[tx_index],
+                    )
+                    _write_responses(queue.result_path(claim.item_id, '.npz'), cct.responses_to(tx_index))
+            except Exception as exc:
+                logging.error(f"Queue item {claim.item_id} failed.", exc_info=True)
+                queue.fail(claim, f"{type(exc).__name__}: {exc}")
+                _status(lock, item=claim.item_id, state='failed', worker=worker, error=f"{type(exc).__name__}: {exc}")
+                failed += 1
+                continue
+            if lease.lost:
+                logging.warning(f"Lease on {claim.item_id} expired while running; another worker may repeat it")
+            seconds = round(time.perf_counter() - started, 3)
+            queue.complete(claim, {"seconds": seconds})
+            _status(lock, item=claim.item_id, state='finished', worker=worker, seconds=seconds)
+            finished += 1
+    finally:
+        if backend is not None:
+            backend.close()
+    print(f"FINISHED: {json.dumps({'worker': worker, 'finished': finished, 'failed': failed})}", flush=True)
+    return failed
+
+
+def run_queue_coordinator(args):
+    """Split the ``--batch`` run jobs into per-TX items on ``--queue``, then merge finished jobs.
+
+    Enqueuing skips items that are already queued or done, so a coordinator can be
+    restarted on the same queue; failed items are retried. Each job is merged into
+    its usual CSV and archive once all of its items are done. Returns the number of
+    failed jobs.
+    """
+    queue = FileQueue(args.queue)
+    lock = threading.Lock()
+    waiting = []
+    for number, spec in enumerate(_read_jobs(args.batch), 1):
+        job_id = str(spec.get('id', number))
+        job, settings = _job_from_spec(spec, args, job_id)
+        if job.mode != 'run' or job.output_path is None:
+            raise ValueError(f"Queued job {job_id} must be a run job with an output")
+        cct = _create_cct(job, settings)
+        _apply_tx_settings(cct, settings)
+        items = []
+        for tx_index, tx in enumerate(cct.txs):
+            item_id = f"{job_id}.tx{tx_index:04d}"
+            queue.put(item_id, {"job": job_id, "spec": spec, "tx_index": tx_index, "tx_name": CCT._object_label(tx)})
+            items.append(item_id)
+        waiting.append((job_id, job, settings, items))
+        _status(lock, job=job_id, state='queued', items=len(items))
+    queue.seal()
+
+    total = len(waiting)
+    failures = 0
+    while waiting:
+        queue.reclaim_expired(args.lease)
+        for entry in list(waiting):
+            job_id, job, settings, items = entry
+            states = [queue.state(item_id) for item_id in items]
+            if any(state not in ('done', 'failed') for state in states):
+                continue
+            waiting.remove(entry)
+            failed_items = [item_id for item_id, state in zip(items, states) if state == 'failed']
+            if failed_items:
+                failures += 1
+                error = queue.record('failed', failed_items[0]).get('error')
+                _status(lock, job=job_id, state='failed', items=failed_items, error=error)
+                continue
+            try:
+                cct = _create_cct(job, settings)
+                _apply_tx_settings(cct, settings)
+                _apply_rx_settings(cct, settings)
+                for tx_index, item_id in enumerate(items):
+                    cct.add_responses(tx_index, _read_responses(queue.result_path(item_id, '.npz')))
+                cct.calculate(output_path=str(job.output_path))
+            except Exception as exc:
+                logging.error(f"Merging queued job {job_id} failed.", exc_info=True)
+                failures += 1
+                _status(lock, job=job_id, state='failed', error=f"{type(exc).__name__}: {exc}")
+                continue
+            _status(lock, job=job_id, state='finished', output=str(job.output_path))
+        if waiting:
+            time.sleep(QUEUE_POLL_SECONDS)
+    print(f"FINISHED: {json.dumps({'jobs': total, 'failed': failures})}", flush=True)
+    return failures
+
+
+def _expand_corners(spec):
+    """Corner list from either a list of overrides or a matrix of value lists.
+
+    A matrix such as {"vhigh": ["0.75V", "0.85V"], "t_rise": ["25ps", "35ps"]}
+    expands to every combination.
+    """
+    if not spec:
+        return []
+    if isinstance(spec, dict):
+        names = list(spec)
+        value_lists = [spec[name] if isinstance(spec[name], list) else [spec[name]] for name in names]
+        return [
+            {**dict(zip(names, combination)), 'name': '_'.join(str(value) for value in combination)}
+            for combination in itertools.product(*value_lists)
+        ]
+    return [dict(corner) for corner in spec]
+
+
+def _create_backend(args, workdir, version):
+    """Backend selected by --backend; None lets CCT open its own AEDT session per run."""
+    if args.backend == 'aedt':
+        return None
+    backend_dir = args.backend_dir or args.workdir / 'recordings'
+    if args.backend == 'replay':
+        logging.info(f"Replaying recorded simulations from {backend_dir}")
+        return ReplayBackend(backend_dir)
+    logging.info(f"Recording simulations to {backend_dir}")
+    return RecordingBackend(AedtBackend(workdir, version=version), backend_dir)
 
 
 def _summarize_prerun(summaries, threshold_value):
@@ -182,6 +725,9 @@ def _summarize_prerun(summaries, threshold_value):
             line += f" ({port_ratio:.1%})"
         if total_rx:
             line += f", rx {kept_rx}/{total_rx} ({rx_ratio:.1%})"
+        removed_points = int(stats.get('removed_frequency_points', 0) or 0)
+        if removed_points:
+            line += f", freq points -{removed_points}/{stats.get('frequency_points')}"
         lines.append(line)
 
     if port_ratios:
@@ -0,0 +1,59 @@
+from typing import Tuple
+
+import numpy as np
+
+Trace = Tuple[np.ndarray, np.ndarray]
+
+
+def visible_slice(x: np.ndarray, lo: float, hi: float) -> slice:
+    """Samples of sorted ``x`` inside [lo, hi] plus one on each side so lines reach the edges."""
+    start = max(int(np.searchsorted(x, lo, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, hi, side='right')) + 1, len(x))
+    return slice(start, stop)
+
+
+def min_max(x: np.ndarray, y: np.ndarray, buckets: int) -> Trace:
+    """Minimum and maximum of each of ``buckets`` equal-count buckets, in time order.
+
+    Keeps every peak, which matters for crosstalk, at two points per bucket.
+    """
+    n = len(x)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+    size = -(-n // buckets)
+    padded = np.pad(y, (0, size * buckets - n), mode='edge').reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    low = np.minimum(offsets + padded.argmin(axis=1), n - 1)
+    high = np.minimum(offsets + padded.argmax(axis=1), n - 1)
+    picks = np.unique(np.concatenate([[0], low, high, [n - 1]]))
+    return x[picks], y[picks]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> Trace:
+    """Largest-Triangle-Three-Buckets reduction to ``points`` samples (Steinarsson 2013)."""
+    n = len(x)
+    if points >= n or points < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    picks = np.empty(points, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_stop].mean() if next_stop > next_start else x[-1]
+        next_y = y[next_start:next_stop].mean() if next_stop > next_start else y[-1]
+        px, py = x[previous], y[previous]
+        area = np.abs((px - next_x) * (y[start:stop] - py) - (px - x[start:stop]) * (next_y - py))
+        previous = start + int(area.argmax())
+        picks[bucket + 1] = previous
+    return x[picks], y[picks]
+
+
+def level_of_detail(x: np.ndarray, y: np.ndarray, lo: float, hi: float, pixels: int, method: str = 'lttb') -> Trace:
+    """Samples of (x, y) worth drawing across ``pixels`` for the visible range [lo, hi]."""
+    window = visible_slice(x, lo, hi)
+    x, y = x[window], y[window]
+    if method == 'minmax':
+        return min_max(x, y, pixels)
+    return lttb(x, y, 2 * pixels)
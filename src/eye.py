@@ -0,0 +1,224 @@
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_PHASES = 64
+DEFAULT_BER_LEVELS = (1e-6, 1e-9, 1e-12)
+STAT_EYE_BINS = 1024
+_STAT_EYE_FILL = 0.9
+_STAT_EYE_ROWS = 256
+_LOG_ZERO = -1e3
+
+Waveform = Tuple[Sequence[float], Sequence[float]]
+
+
+def _as_arrays(waveform: Waveform) -> Tuple[np.ndarray, np.ndarray]:
+    time = np.asarray(waveform[0], dtype=float)
+    voltage = np.asarray(waveform[1], dtype=float)
+    order = np.argsort(time)
+    return time[order], voltage[order]
+
+
+def cursor_times(time: np.ndarray, voltage: np.ndarray, ui: float, phases: int = DEFAULT_PHASES) -> Tuple[np.ndarray, int]:
+    """UI-spaced sampling instants of shape (K, P) and the index of the main cursor.
+
+    The main cursor spans one UI centred on the pulse-response peak; phase p samples
+    every cursor at the same offset ``(p / P - 0.5) * ui`` from its centre.
+    """
+    peak_time = time[int(np.argmax(voltage))]
+    before = int(np.ceil((peak_time - time[0]) / ui + 0.5))
+    after = int(np.ceil((time[-1] - peak_time) / ui + 0.5))
+    offsets = (np.arange(phases) / phases - 0.5) * ui
+    centres = peak_time + np.arange(-before, after + 1) * ui
+    return centres[:, None] + offsets[None, :], before
+
+
+def sample_cursors(waveform: Waveform, times: np.ndarray) -> np.ndarray:
+    """Sample ``waveform`` at ``times``; zero outside its time span."""
+    time, voltage = _as_arrays(waveform)
+    return np.interp(times, time, voltage, left=0.0, right=0.0)
+
+
+def cursor_matrices(
+    primary: Waveform,
+    aggressors: Sequence[Waveform],
+    ui: float,
+    phases: int = DEFAULT_PHASES,
+) -> Tuple[np.ndarray, int, np.ndarray]:
+    """Primary cursors (K, P), main cursor index and aggressor cursors (A, K, P).
+
+    Aggressors are sampled on the victim's clock, i.e. synchronously.
+    """
+    time, voltage = _as_arrays(primary)
+    times, main = cursor_times(time, voltage, ui, phases)
+    victim = np.interp(times, time, voltage, left=0.0, right=0.0)
+    if aggressors:
+        others = np.stack([sample_cursors(waveform, times) for waveform in aggressors])
+    else:
+        others = np.zeros((0,) + times.shape)
+    return victim, main, others
+
+
+def eye_width(height_by_phase: np.ndarray, ui: float) -> float:
+    """Width of the contiguous open region around the best phase, in units of ``ui``."""
+    phases = height_by_phase.size
+    best = int(np.argmax(height_by_phase))
+    if height_by_phase[best] <= 0:
+        return 0.0
+    is_open = height_by_phase > 0
+    left = best
+    while left > 0 and is_open[left - 1]:
+        left -= 1
+    right = best
+    while right < phases - 1 and is_open[right + 1]:
+        right += 1
+    return (right - left + 1) * ui / phases
+
+
+def peak_distortion(victim: np.ndarray, main: int, others: np.ndarray, ui: float) -> Dict[str, float]:
+    """Worst-case eye from cursor matrices by peak-distortion analysis.
+
+    At every sampling phase the eye height is the main cursor minus the absolute
+    sum of all ISI cursors and all aggressor cursors; the worst-case data pattern
+    for each cursor is chosen independently.
+    """
+    phases = victim.shape[1]
+    isi = np.abs(victim).sum(axis=0) - np.abs(victim[main])
+    xtalk = np.abs(others).sum(axis=(0, 1))
+    height = victim[main] - isi - xtalk
+    best = int(np.argmax(height))
+    return {
+        "eye_height": float(max(height[best], 0.0)),
+        "eye_width": float(eye_width(height, ui)),
+        "best_phase": float((best / phases - 0.5) * ui),
+    }
+
+
+def interference_cursors(victim: np.ndarray, main: int, others: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Main-cursor level per phase (P,) and all interfering cursor amplitudes (C, P)."""
+    isi = np.delete(victim, main, axis=0)
+    return victim[main], np.concatenate([isi, others.reshape(-1, victim.shape[1])], axis=0)
+
+
+def _log_factor_table(shifts: np.ndarray, bins: int) -> np.ndarray:
+    """log(0.5 + 0.5 exp(-2 pi i m q / L)): characteristic function of one equiprobable 0/q cursor."""
+    m = np.arange(bins)
+    with np.errstate(divide='ignore'):
+        table = np.log(0.5 + 0.5 * np.exp(-2j * np.pi * np.outer(shifts, m) / bins))
+    # Exact zeros of a factor: any finite count times this still underflows to zero.
+    table[~np.isfinite(table)] = _LOG_ZERO
+    return table
+
+
+def _quantize(cursors, step: float, phases: int):
+    """Quantized nonzero cursor shifts, their (victim, phase) rows, zero offset, extent in bins
+    and the summed absolute rounding error per row."""
+    rows, shifts, residual = [], [], []
+    offset = top = 0
+    for index, (_, amps) in enumerate(cursors):
+        quantized = np.rint(amps / step).astype(np.int64)
+        residual.append(np.abs(amps - quantized * step).sum(axis=0))
+        up = np.clip(quantized, 0, None).sum(axis=0)
+        down = np.clip(-quantized, 0, None).sum(axis=0)
+        offset = max(offset, int(down.max(initial=0)))
+        top = max(top, int(up.max(initial=0)))
+        nonzero = quantized != 0
+        rows.append(index * phases + np.broadcast_to(np.arange(phases), quantized.shape)[nonzero])
+        shifts.append(quantized[nonzero])
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    shifts = np.concatenate(shifts) if shifts else np.zeros(0, dtype=np.int64)
+    residual = np.concatenate(residual) if residual else np.zeros(0)
+    return rows, shifts, offset, offset + top, residual
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    return np.where(mask.any(axis=1), np.argmax(mask, axis=1), mask.shape[1] - 1)
+
+
+def statistical_eye(
+    cursors: Sequence[Tuple[np.ndarray, np.ndarray]],
+    ui: float,
+    ber_levels: Sequence[float] = DEFAULT_BER_LEVELS,
+    bins: int = STAT_EYE_BINS,
+    contours: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Statistical eye height and width at each BER level for a batch of victims.
+
+    ``cursors`` holds (main (P,), interference (C, P)) per victim, all with the same
+    number of phases. Every interfering cursor is an independent, equiprobable 0/1
+    symbol, so the interference PDF is the convolution of two-point PDFs. Cursor
+    amplitudes are quantized to a voltage grid shared by all victims; the
+    convolution is done in the DFT domain, where each PDF's transform is a product
+    of factors. Grouping equal quantized amplitudes turns the products for all
+    victims and phases into one matrix product of counts with a log-factor table.
+    The summed rounding error of each row is subtracted from its eye height.
+
+    Returns heights (V, B) in volts and widths (V, B) in the units of ``ui``; with
+    ``contours`` also the BER map (V, P, J) on the voltage axis (J,).
+    """
+    ber_levels = np.asarray(ber_levels, dtype=float)
+    victims = len(cursors)
+    phases = cursors[0][0].size if victims else 0
+    mains = np.array([main for main, _ in cursors]).reshape(victims, phases)
+    positive = max((np.clip(amps, 0, None).sum(axis=0).max() for _, amps in cursors), default=0.0)
+    negative = max((np.clip(-amps, 0, None).sum(axis=0).max() for _, amps in cursors), default=0.0)
+    step = max(positive + negative, 1e-12) / (_STAT_EYE_FILL * bins)
+    while True:
+        rows, shifts, offset, extent, residual = _quantize(cursors, step, phases)
+        # Rounding can push the quantized extremes past the grid; widen it until no sum wraps.
+        if extent < bins:
+            break
+        step *= extent / (_STAT_EYE_FILL * bins)
+
+    distinct, column = np.unique(shifts, return_inverse=True)
+    counts = np.zeros((victims * phases, distinct.size))
+    np.add.at(counts, (rows, column), 1.0)
+    table = _log_factor_table(distinct, bins)
+
+    cdf = np.empty((victims * phases, bins))
+    for start in range(0, victims * phases, _STAT_EYE_ROWS):
+        spectrum = np.exp(counts[start:start + _STAT_EYE_ROWS] @ table)
+        pmf = np.clip(np.fft.ifft(spectrum, axis=1).real, 0.0, None)
+        pmf = np.roll(pmf, offset, axis=1)
+        pmf /= pmf.sum(axis=1, keepdims=True)
+        cdf[start:start + _STAT_EYE_ROWS] = np.cumsum(pmf, axis=1)
+
+    levels = (np.arange(bins) - offset) * step
+    main_rows = mains.reshape(-1)
+    heights = np.empty((victims, ber_levels.size))
+    widths = np.empty((victims, ber_levels.size))
+    for column, ber in enumerate(ber_levels):
+        # '1' fails below main + low quantile, '0' fails above the high quantile.
+        low = levels[_first_true(cdf > ber)]
+        high = levels[_first_true(1.0 - cdf <= ber)]
+        # Charging the rounding error against the eye keeps the result conservative.
+        height = (main_rows + low - high - residual).reshape(victims, phases)
+        heights[:, column] = np.clip(height.max(axis=1), 0.0, None)
+        widths[:, column] = [eye_width(row, ui) for row in height]
+
+    result = {"ber_levels": ber_levels, "eye_height": heights, "eye_width": widths}
+    if contours:
+        extra = int(np.ceil(max(main_rows.max(initial=0.0), 0.0) / step))
+        voltage = (np.arange(bins + extra) - offset) * step
+        survival_zero = 1.0 - _cdf_at(cdf, voltage[None, :] / step + offset)
+        error_one = _cdf_at(cdf, (voltage[None, :] - main_rows[:, None]) / step + offset)
+        ber_map = 0.5 * (survival_zero + error_one)
+        result["voltage"] = voltage
+        result["ber"] = ber_map.reshape(victims, phases, -1).astype(np.float32)
+    return result
+
+
+def _cdf_at(cdf: np.ndarray, position: np.ndarray) -> np.ndarray:
+    """Row-wise linear interpolation of ``cdf`` at fractional bin ``position``."""
+    bins = cdf.shape[1]
+    position = np.broadcast_to(position, (cdf.shape[0], position.shape[1]))
+    lower = np.clip(np.floor(position).astype(np.int64), 0, bins - 1)
+    upper = np.clip(lower + 1, 0, bins - 1)
+    weight = np.clip(position - np.floor(position), 0.0, 1.0)
+    value = (
+        np.take_along_axis(cdf, lower, axis=1) * (1.0 - weight)
+        + np.take_along_axis(cdf, upper, axis=1) * weight
+    )
+    value[position < 0] = 0.0
+    value[position >= bins - 1] = 1.0
+    return value
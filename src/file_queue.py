@@ -0,0 +1,170 @@
+import json
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_LEASE_SECONDS = 300.0
+QUEUE_STATES = ("pending", "claimed", "done", "failed")
+SEALED_NAME = "sealed"
+_CLAIM_SEPARATOR = "@"
+
+
+def worker_name() -> str:
+    """Queue-safe identity of this process, unique across hosts sharing a queue."""
+    host = socket.gethostname().replace(_CLAIM_SEPARATOR, "_")
+    return f"{host}-{os.getpid()}"
+
+
+@dataclass
+class Claim:
+    item_id: str
+    worker: str
+    path: Path
+    payload: Dict[str, object]
+
+
+class FileQueue:
+    """Work queue in a shared directory, usable by any number of processes and hosts.
+
+    Items move between ``pending/``, ``claimed/``, ``done/`` and ``failed/`` by
+    ``os.rename``, which is atomic on one filesystem, so exactly one worker wins each
+    claim. A claim is a lease: its file mtime is the last heartbeat, and claims older
+    than the lease go back to ``pending/``. Leases should be long compared with the
+    clock skew between hosts.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        for state in QUEUE_STATES + ("results", "tmp"):
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def _write_json(self, path: Path, payload: Dict[str, object]) -> None:
+        tmp_path = self.root / "tmp" / f"{path.name}.{worker_name()}.tmp"
+        tmp_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _path(self, state: str, item_id: str) -> Path:
+        return self.root / state / f"{item_id}.json"
+
+    def state(self, item_id: str) -> Optional[str]:
+        for state in ("done", "failed", "pending"):
+            if self._path(state, item_id).exists():
+                return state
+        if any((self.root / "claimed").glob(f"{item_id}{_CLAIM_SEPARATOR}*.json")):
+            return "claimed"
+        return None
+
+    def put(self, item_id: str, payload: Dict[str, object]) -> bool:
+        """Enqueue ``item_id`` unless it is already queued, running or done; failed items are retried."""
+        if _CLAIM_SEPARATOR in item_id:
+            raise ValueError(f"Queue item ids may not contain {_CLAIM_SEPARATOR!r}: {item_id}")
+        state = self.state(item_id)
+        if state == "failed":
+            self._path("failed", item_id).unlink(missing_ok=True)
+        elif state is not None:
+            return False
+        self._write_json(self._path("pending", item_id), payload)
+        return True
+
+    def seal(self) -> None:
+        """Mark the queue complete; idle workers exit once it drains."""
+        (self.root / SEALED_NAME).touch()
+
+    @property
+    def sealed(self) -> bool:
+        return (self.root / SEALED_NAME).exists()
+
+    def claim(self, worker: str) -> Optional[Claim]:
+        for path in sorted((self.root / "pending").glob("*.json")):
+            target = self.root / "claimed" / f"{path.stem}{_CLAIM_SEPARATOR}{worker}.json"
+            try:
+                # Touch first so the lease never starts from the enqueue time.
+                os.utime(path)
+                os.rename(path, target)
+            except FileNotFoundError:
+                continue
+            payload = json.loads(target.read_text(encoding="utf-8"))
+            return Claim(path.stem, worker, target, payload)
+        return None
+
+    def renew(self, claim: Claim) -> bool:
+        """Extend the lease; False when it already expired and was taken back."""
+        try:
+            os.utime(claim.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, claim: Claim, record: Dict[str, object]) -> None:
+        self._write_json(self._path("done", claim.item_id), dict(record, worker=claim.worker))
+        claim.path.unlink(missing_ok=True)
+
+    def fail(self, claim: Claim, error: str) -> None:
+        self._write_json(self._path("failed", claim.item_id), {"worker": claim.worker, "error": error})
+        claim.path.unlink(missing_ok=True)
+
+    def reclaim_expired(self, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> List[str]:
+        """Return claims whose lease ran out to ``pending/``; returns their item ids."""
+        reclaimed = []
+        now = time.time()
+        for path in (self.root / "claimed").glob("*.json"):
+            try:
+                expired = now - path.stat().st_mtime > lease_seconds
+            except FileNotFoundError:
+                continue
+            if not expired:
+                continue
+            item_id = path.stem.split(_CLAIM_SEPARATOR, 1)[0]
+            try:
+                if self._path("done", item_id).exists():
+                    path.unlink()
+                else:
+                    os.rename(path, self._path("pending", item_id))
+                    reclaimed.append(item_id)
+            except FileNotFoundError:
+                continue
+        return reclaimed
+
+    def record(self, state: str, item_id: str) -> Dict[str, object]:
+        return json.loads(self._path(state, item_id).read_text(encoding="utf-8"))
+
+    def counts(self) -> Dict[str, int]:
+        return {state: sum(1 for _ in (self.root / state).glob("*.json")) for state in QUEUE_STATES}
+
+    @property
+    def drained(self) -> bool:
+        counts = self.counts()
+        return self.sealed and counts["pending"] == 0 and counts["claimed"] == 0
+
+    def result_path(self, item_id: str, suffix: str) -> Path:
+        return self.root / "results" / f"{item_id}{suffix}"
+
+
+class LeaseKeeper:
+    """Renews a claim from a background thread while the work runs."""
+
+    def __init__(self, queue: FileQueue, claim: Claim, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.queue = queue
+        self.claim = claim
+        self.interval = max(lease_seconds / 3.0, 0.05)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"lease-{claim.item_id}", daemon=True)
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.interval):
+            if not self.queue.renew(self.claim):
+                self.lost = True
+                return
+
+    def __enter__(self) -> 'LeaseKeeper':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
@@ -23,15 +23,23 @@ from PySide6.QtWidgets import (
     QAbstractItemView,
     QGridLayout,
     QTextEdit,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QHeaderView,
     QSpinBox,
     QRadioButton,
+    QProgressBar,
 )
 from PySide6.QtCore import Qt, QProcess
 from PySide6.QtGui import QColor
 
+from results_archive import METRIC_COLUMNS, ResultsArchive
+from table_models import ColumnTableModel, TableFilterProxy, columns_from_text
+from waveform_view import WaveformViewer
+
+PORT_TABLE_HEADERS = ["", "TX Port", "RX Port", "Type", "Pair"]
+
 
 class NetListWidget(QListWidget):
     def __init__(self, parent=None):
@@ -65,6 +73,8 @@ class AEDBCCTCalculator(QMainWindow):
         self.setWindowTitle("AEDB CCT Calculator")
         self.setGeometry(100, 100, 1200, 800)
         self.pcb_data = None
+        self.net_index = None
+        self.selected_nets = None
         self.all_components = []
         self.config_file = os.path.join(os.path.dirname(__file__), "..", "data", "config.json")
 
@@ -78,11 +88,13 @@ class AEDBCCTCalculator(QMainWindow):
         self.simulation_tab = QWidget()
         self.cct_tab = QWidget()
         self.result_tab = QWidget()
+        self.waveform_viewer = WaveformViewer()
         self.tabs.addTab(self.import_tab, "Import")
         self.tabs.addTab(self.port_setup_tab, "Port Setup")
         self.tabs.addTab(self.simulation_tab, "Simulation")
         self.tabs.addTab(self.cct_tab, "CCT")
         self.tabs.addTab(self.result_tab, "Result")
+        self.tabs.addTab(self.waveform_viewer, "Waveforms")
         main_layout.addWidget(self.tabs)
 
         log_group = QGroupBox("Information")
@@ -104,8 +116,47 @@ class AEDBCCTCalculator(QMainWindow):
     def setup_result_tab(self):
         result_layout = QVBoxLayout(self.result_tab)
         result_layout.setContentsMargins(0, 0, 0, 0)
-        self.result_table = QTableWidget()
+        self.result_filter = QLineEdit()
+        self.result_filter.setPlaceholderText("Filter, e.g. pseudo_eye < 0 and rx_name ~ DQ")
+        result_layout.addWidget(self.result_filter)
+        self.result_model = ColumnTableModel(self)
+        self.result_model.row_foreground = self.result_row_color
+        self.result_proxy = TableFilterProxy(self)
+        self.result_proxy.setSourceModel(self.result_model)
+        self.result_table = self.create_table_view(self.result_proxy)
         result_layout.addWidget(self.result_table)
+        self.partial_results_started = False
+        self.result_archive_path = None
+
+    def create_table_view(self, proxy):
+        view = QTableView()
+        view.setModel(proxy)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        view.setSortingEnabled(True)
+        view.verticalHeader().setVisible(False)
+        view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        return view
+
+    def apply_table_filter(self, proxy, line_edit):
+        try:
+            proxy.set_filter_expression(line_edit.text())
+        except ValueError as e:
+            line_edit.setStyleSheet("color: red;")
+            line_edit.setToolTip(str(e))
+            return
+        line_edit.setStyleSheet("")
+        line_edit.setToolTip("")
+
+    def result_row_color(self, row):
+        """Red text for victims whose pseudo-eye is closed."""
+        column = self.result_model.column_index("pseudo_eye")
+        if column is None:
+            return None
+        value = self.result_model.raw(row, column)
+        if isinstance(value, (int, float)) and value <= 0:
+            return QColor("red")
+        return None
 
     def load_result_csv(self, file_path=None):
         if file_path is None:
@@ -120,19 +171,50 @@ class AEDBCCTCalculator(QMainWindow):
         try:
             with open(file_path, "r", newline="") as csvfile:
                 reader = csv.reader(csvfile)
-                headers = next(reader)
-                self.result_table.setColumnCount(len(headers))
-                self.result_table.setHorizontalHeaderLabels(headers)
-                self.result_table.setRowCount(0)
-                for row_data in reader:
-                    row = self.result_table.rowCount()
-                    self.result_table.insertRow(row)
-                    for i, data in enumerate(row_data):
-                        self.result_table.setItem(row, i, QTableWidgetItem(data))
-            self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+                headers = [header.strip() for header in next(reader)]
+                rows = [row for row in reader if row]
+            columns, formats = columns_from_text(rows, len(headers))
+            self.result_model.set_columns(headers, columns, formats)
+            self.result_archive_path = None
+            self.apply_table_filter(self.result_proxy, self.result_filter)
         except Exception as e:
             self.log_window.append(f"Error loading result CSV: {e}")
 
+    def load_result_archive(self, file_path):
+        """Fill the result table from the metrics of a results archive; waveforms stay on disk."""
+        try:
+            with ResultsArchive(file_path) as archive:
+                metrics = archive.metrics
+                columns = archive.columns
+        except Exception as e:
+            self.log_window.append(f"Error loading results archive: {e}")
+            return
+        headers = ["tx_name", "rx_name"] + [header for _, header, _ in columns]
+        self.result_model.set_columns(
+            headers,
+            [metrics["tx_name"], metrics["rx_name"]] + [metrics[field] for field, _, _ in columns],
+            [None, None] + [spec for _, _, spec in columns],
+        )
+        self.result_archive_path = file_path
+        self.apply_table_filter(self.result_proxy, self.result_filter)
+
+    def show_victim_update(self, event):
+        """Insert or refresh one victim row from a runner ``victim`` event while a run is going."""
+        if not self.partial_results_started:
+            headers = ["state", "tx_name", "rx_name"] + [header for _, header, _ in METRIC_COLUMNS]
+            self.result_model.set_columns(
+                headers,
+                [[] for _ in headers],
+                [None, None, None] + [spec for _, _, spec in METRIC_COLUMNS],
+                key_column=2,
+            )
+            self.partial_results_started = True
+            self.result_archive_path = None
+        metrics = event.get("metrics", {})
+        values = [str(event.get("state")), str(event.get("tx")), str(event.get("rx"))]
+        values += [metrics.get(field) for field, _, _ in METRIC_COLUMNS]
+        self.result_model.upsert(values)
+
     def setup_import_tab(self):
         import_layout = QVBoxLayout(self.import_tab)
         import_group = QGroupBox("Layout Import")
@@ -217,6 +299,10 @@ class AEDBCCTCalculator(QMainWindow):
         secondary_style = "background-color: #6c757d; color: white; border: none;"
         self.prerun_button.setStyleSheet(secondary_style)
         self.prerun_button_original_style = secondary_style
+        self.prescreen_button.setStyleSheet(secondary_style)
+        self.prescreen_button_original_style = secondary_style
+        self.estimate_button.setStyleSheet(secondary_style)
+        self.estimate_button_original_style = secondary_style
 
     def setup_port_setup_tab(self):
         port_setup_layout = QVBoxLayout(self.port_setup_tab)
@@ -441,25 +527,37 @@ class AEDBCCTCalculator(QMainWindow):
 
         port_group = QGroupBox("Port Information")
         port_layout = QVBoxLayout(port_group)
-        self.port_table = QTableWidget()
-        self.port_table.setColumnCount(5)
-        self.port_table.setHorizontalHeaderLabels(["", "TX Port", "RX Port", "Type", "Pair"])
-        header = self.port_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.Stretch)
-        header.setSectionResizeMode(3, QHeaderView.Stretch)
-        header.setSectionResizeMode(4, QHeaderView.Stretch)
-        self.port_table.verticalHeader().setVisible(False)
-        self.port_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.port_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.port_filter = QLineEdit()
+        self.port_filter.setPlaceholderText("Filter, e.g. DQ or Type == Differential")
+        port_layout.addWidget(self.port_filter)
+        self.port_model = ColumnTableModel(self)
+        self.port_model.set_columns(PORT_TABLE_HEADERS, [[] for _ in PORT_TABLE_HEADERS])
+        self.port_proxy = TableFilterProxy(self)
+        self.port_proxy.setSourceModel(self.port_model)
+        self.port_table = self.create_table_view(self.port_proxy)
         port_layout.addWidget(self.port_table)
         cct_layout.addWidget(port_group)
 
+        progress_layout = QHBoxLayout()
+        self.cct_progress_bar = QProgressBar()
+        self.cct_progress_bar.setRange(0, 4)
+        self.cct_progress_bar.setValue(0)
+        self.cct_timing_label = QLabel("")
+        progress_layout.addWidget(self.cct_progress_bar, 2)
+        progress_layout.addWidget(self.cct_timing_label, 3)
+        cct_layout.addLayout(progress_layout)
+
         action_buttons_layout = QHBoxLayout()
         action_buttons_layout.addStretch()
+        self.prescreen_button = QPushButton("Pre-screen")
+        self.estimate_button = QPushButton("Estimate")
         self.prerun_button = QPushButton("Pre-run")
         self.calculate_button = QPushButton("Calculate")
+        action_buttons_layout.addWidget(self.prescreen_button)
+        action_buttons_layout.addWidget(self.estimate_button)
         action_buttons_layout.addWidget(self.prerun_button)
         action_buttons_layout.addWidget(self.calculate_button)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        action_buttons_layout.addWidget(self.stop_button)
         cct_layout.addLayout(action_buttons_layout)
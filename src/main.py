@@ -3,10 +3,13 @@ import os
 import json
 import re
 import subprocess
-from PySide6.QtWidgets import QApplication, QFileDialog, QListWidgetItem, QTableWidgetItem
+from PySide6.QtWidgets import QApplication, QFileDialog, QListWidgetItem
 from PySide6.QtCore import QProcess, Qt
 from PySide6.QtGui import QColor
-from gui import AEDBCCTCalculator
+from gui import PORT_TABLE_HEADERS, AEDBCCTCalculator
+from net_index import NetIndex, SelectedNets
+from progress import PHASES, parse_event
+from results_archive import ARCHIVE_SUFFIX
 
 class MainController(AEDBCCTCalculator):
     def __init__(self):
@@ -34,8 +37,15 @@ class MainController(AEDBCCTCalculator):
         self.save_config_button.clicked.connect(self.save_cct_config)
         self.load_config_button.clicked.connect(self.load_cct_config)
         self.reset_defaults_button.clicked.connect(self.reset_cct_defaults)
+        self.prescreen_button.clicked.connect(self.run_prescreen)
+        self.estimate_button.clicked.connect(self.run_estimate)
         self.prerun_button.clicked.connect(self.run_prerun)
         self.calculate_button.clicked.connect(self.run_calculate)
+        self.stop_button.clicked.connect(self.stop_cct_process)
+        self.result_filter.textChanged.connect(lambda: self.apply_table_filter(self.result_proxy, self.result_filter))
+        self.port_filter.textChanged.connect(lambda: self.apply_table_filter(self.port_proxy, self.port_filter))
+        self.result_table.selectionModel().currentRowChanged.connect(self.show_selected_waveforms)
+        self.result_table.doubleClicked.connect(lambda: self.tabs.setCurrentWidget(self.waveform_viewer))
 
     def on_layout_type_changed(self):
         if self.sender().isChecked():
@@ -120,10 +130,10 @@ class MainController(AEDBCCTCalculator):
                 net_name = item.text()
                 signal_nets.append(net_name)
                 for comp in data["controller_components"]:
-                    if any(pin[1] == net_name for pin in self.pcb_data["component"].get(comp, [])):
+                    if self.net_index.has_net(comp, net_name):
                         data["ports"].append({"sequence": sequence, "name": f"{sequence}_{comp}_{net_name}", "component": comp, "component_role": "controller", "net": net_name, "net_type": "single", "pair": None, "polarity": None, "reference_net": data["reference_net"]}); sequence += 1
                 for comp in data["dram_components"]:
-                    if any(pin[1] == net_name for pin in self.pcb_data["component"].get(comp, [])):
+                    if self.net_index.has_net(comp, net_name):
                         data["ports"].append({"sequence": sequence, "name": f"{sequence}_{comp}_{net_name}", "component": comp, "component_role": "dram", "net": net_name, "net_type": "single", "pair": None, "polarity": None, "reference_net": data["reference_net"]}); sequence += 1
         
         for i in range(self.differential_pairs_list.count()):
@@ -133,16 +143,16 @@ class MainController(AEDBCCTCalculator):
                 p_net, n_net = diff_pairs_info[pair_name]
                 signal_nets.extend([p_net, n_net])
                 for comp in data["controller_components"]:
-                    if any(pin[1] == p_net for pin in self.pcb_data["component"].get(comp, [])):
+                    if self.net_index.has_net(comp, p_net):
                         data["ports"].append({"sequence": sequence, "name": f"{sequence}_{comp}_{p_net}", "component": comp, "component_role": "controller", "net": p_net, "net_type": "differential", "pair": pair_name, "polarity": "positive", "reference_net": data["reference_net"]}); sequence += 1
                 for comp in data["dram_components"]:
-                    if any(pin[1] == p_net for pin in self.pcb_data["component"].get(comp, [])):
+                    if self.net_index.has_net(comp, p_net):
                         data["ports"].append({"sequence": sequence, "name": f"{sequence}_{comp}_{p_net}", "component": comp, "component_role": "dram", "net": p_net, "net_type": "differential", "pair": pair_name, "polarity": "positive", "reference_net": data["reference_net"]}); sequence += 1
                 for comp in data["controller_components"]:
-                    if any(pin[1] == n_net for pin in self.pcb_data["component"].get(comp, [])):
+                    if self.net_index.has_net(comp, n_net):
                         data["ports"].append({"sequence": sequence, "name": f"{sequence}_{comp}_{n_net}", "component": comp, "component_role": "controller", "net": n_net, "net_type": "differential", "pair": pair_name, "polarity": "negative", "reference_net": data["reference_net"]}); sequence += 1
                 for comp in data["dram_components"]:
-                    if any(pin[1] == n_net for pin in self.pcb_data["component"].get(comp, [])):
+                    if self.net_index.has_net(comp, n_net):
                         data["ports"].append({"sequence": sequence, "name": f"{sequence}_{comp}_{n_net}", "component": comp, "component_role": "dram", "net": n_net, "net_type": "differential", "pair": pair_name, "polarity": "negative", "reference_net": data["reference_net"]}); sequence += 1
         
         self.signal_nets_label.setText(", ".join(sorted(signal_nets)))
@@ -275,6 +285,8 @@ class MainController(AEDBCCTCalculator):
             with open(json_path, "r") as f: self.pcb_data = json.load(f)
             self.controller_components_list.clear()
             self.dram_components_list.clear()
+            self.net_index = NetIndex(self.pcb_data.get("component", {}))
+            self.selected_nets = SelectedNets(self.net_index)
             if "component" in self.pcb_data:
                 self.all_components = [(name, len(pins)) for name, pins in self.pcb_data["component"].items()]
                 self.all_components.sort(key=lambda x: x[1], reverse=True)
@@ -287,6 +299,8 @@ class MainController(AEDBCCTCalculator):
         if not self.pcb_data or "component" not in self.pcb_data: return
         selected_controllers = [item.text().split(" ")[0] for item in self.controller_components_list.selectedItems()]
         selected_drams = [item.text().split(" ")[0] for item in self.dram_components_list.selectedItems()]
+        self.selected_nets.select("controller", selected_controllers)
+        self.selected_nets.select("dram", selected_drams)
         
         # Block signals to prevent excessive updates
         self.single_ended_list.blockSignals(True)
@@ -302,12 +316,8 @@ class MainController(AEDBCCTCalculator):
                 self.update_checked_count()
                 return
 
-            controller_nets = set(pin[1] for comp in selected_controllers for pin in self.pcb_data["component"].get(comp, []))
-            dram_nets = set(pin[1] for comp in selected_drams for pin in self.pcb_data["component"].get(comp, []))
-            common_nets = controller_nets.intersection(dram_nets)
-            
-            selected_components = selected_controllers + selected_drams
-            net_pin_counts = {net: sum(1 for comp_name in selected_components for pin in self.pcb_data["component"].get(comp_name, []) if pin[1] == net) for net in common_nets}
+            common_nets = self.selected_nets.common
+            net_pin_counts = {net: self.selected_nets.pin_counts[net] for net in common_nets}
             sorted_nets = sorted(net_pin_counts.items(), key=lambda item: item[1], reverse=True)
             
             for net_name, count in sorted_nets: self.ref_net_combo.addItem(net_name)
@@ -484,7 +494,7 @@ class MainController(AEDBCCTCalculator):
         if os.path.exists(touchstone_path) and os.path.exists(metadata_path):
             self.load_port_data(metadata_path)
         else:
-            self.port_table.setRowCount(0)
+            self.port_model.set_columns(PORT_TABLE_HEADERS, [[] for _ in PORT_TABLE_HEADERS])
 
     def load_port_data(self, metadata_path):
         try:
@@ -513,17 +523,14 @@ class MainController(AEDBCCTCalculator):
                             "pair_name": tx_port_list[0].get("pair")
                         })
             
-            self.port_table.setRowCount(len(matched_ports))
-            for i, item in enumerate(matched_ports):
-                tx_names = " / ".join(p['name'] for p in item['tx'])
-                rx_names = " / ".join(p['name'] for p in item['rx'])
-                port_type = item['type'].capitalize()
-                pair_name = item['pair_name'] or f"M_DQ<{i}>"
-                self.port_table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-                self.port_table.setItem(i, 1, QTableWidgetItem(tx_names))
-                self.port_table.setItem(i, 2, QTableWidgetItem(rx_names))
-                self.port_table.setItem(i, 3, QTableWidgetItem(port_type))
-                self.port_table.setItem(i, 4, QTableWidgetItem(pair_name))
+            self.port_model.set_columns(PORT_TABLE_HEADERS, [
+                list(range(1, len(matched_ports) + 1)),
+                [" / ".join(p['name'] for p in item['tx']) for item in matched_ports],
+                [" / ".join(p['name'] for p in item['rx']) for item in matched_ports],
+                [item['type'].capitalize() for item in matched_ports],
+                [item['pair_name'] or f"M_DQ<{i}>" for i, item in enumerate(matched_ports)],
+            ])
+            self.apply_table_filter(self.port_proxy, self.port_filter)
             self.log(f"Loaded {len(ports)} ports from {os.path.basename(metadata_path)}")
         except Exception as e:
             self.log(f"Error loading port data: {e}", color="red")
@@ -614,6 +621,8 @@ class MainController(AEDBCCTCalculator):
             return
 
         self.log(f"Starting CCT {mode}...")
+        self.prescreen_button.setEnabled(False)
+        self.estimate_button.setEnabled(False)
         self.prerun_button.setEnabled(False)
         self.calculate_button.setEnabled(False)
 
@@ -623,6 +632,12 @@ class MainController(AEDBCCTCalculator):
         elif mode == 'prerun':
             self.prerun_button.setText("Running...")
             self.prerun_button.setStyleSheet("background-color: yellow; color: black;")
+        elif mode == 'prescreen':
+            self.prescreen_button.setText("Running...")
+            self.prescreen_button.setStyleSheet("background-color: yellow; color: black;")
+        elif mode == 'estimate':
+            self.estimate_button.setText("Running...")
+            self.estimate_button.setStyleSheet("background-color: yellow; color: black;")
 
         script_path = os.path.join(os.path.dirname(__file__), "cct_runner.py")
         python_executable = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".venv", "Scripts", "python.exe")
@@ -637,6 +652,20 @@ class MainController(AEDBCCTCalculator):
             output_path = os.path.join(os.path.dirname(metadata_path), "cct_results.csv")
             self.cct_output_path = output_path
             command.extend(["--output-path", output_path])
+        elif mode in ('prescreen', 'estimate'):
+            output_path = os.path.join(os.path.dirname(metadata_path), f"cct_{mode}.csv")
+            self.cct_output_path = output_path
+            command.extend(["--output-path", output_path])
+
+        self._stdout_buffer = ""
+        self.cct_tx_total = None
+        self.cct_phase_totals = {phase: 0.0 for phase in PHASES}
+        self.cct_progress_bar.setRange(0, 4)
+        self.cct_progress_bar.setValue(0)
+        self.cct_progress_bar.setFormat("%p%")
+        self.cct_timing_label.setText("")
+        self.partial_results_started = False
+        self.stop_button.setEnabled(True)
 
         self.process = QProcess()
         self.process.readyReadStandardOutput.connect(self.handle_stdout)
@@ -645,14 +674,92 @@ class MainController(AEDBCCTCalculator):
         self.process.start(command[0], command[1:])
 
     def handle_stdout(self):
-        data = self.process.readAllStandardOutput().data().decode(errors='ignore').strip()
-        for line in data.splitlines(): self.log(line)
+        # Output arrives in arbitrary chunks; keep the trailing partial line for the next read.
+        self._stdout_buffer += self.process.readAllStandardOutput().data().decode(errors='ignore')
+        *lines, self._stdout_buffer = self._stdout_buffer.split('\n')
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            event = parse_event(line)
+            if event is not None:
+                self.handle_cct_event(event)
+                continue
+            if line.startswith("PROGRESS:") and self.cct_tx_total is None:
+                try:
+                    self.cct_progress_bar.setValue(int(line.split(":", 1)[1]))
+                except ValueError:
+                    pass
+            self.log(line)
+
+    def handle_cct_event(self, event):
+        kind = event.get("event")
+        if kind == "run_start":
+            self.cct_tx_total = int(event.get("total", 0))
+            self.cct_progress_bar.setRange(0, max(self.cct_tx_total, 1))
+            self.cct_progress_bar.setValue(0)
+            self.cct_progress_bar.setFormat("%v/%m TX")
+        elif kind == "tx_end":
+            for phase, seconds in event.get("phases", {}).items():
+                self.cct_phase_totals[phase] = self.cct_phase_totals.get(phase, 0.0) + seconds
+            self.cct_progress_bar.setValue(int(event.get("done", 0)))
+            self.cct_progress_bar.setFormat(f"%v/%m TX - ETA {self.format_duration(event.get('eta', 0))}")
+            self.cct_timing_label.setText(self.format_phase_breakdown(self.cct_phase_totals))
+        elif kind == "victim":
+            self.show_victim_update(event)
+        elif kind == "run_end":
+            self.cct_phase_totals = dict(event.get("phases", self.cct_phase_totals))
+            elapsed = self.format_duration(event.get("elapsed", 0))
+            self.cct_progress_bar.setFormat(f"%v/%m TX in {elapsed}")
+            breakdown = self.format_phase_breakdown(self.cct_phase_totals)
+            self.cct_timing_label.setText(breakdown)
+            self.log(f"Simulated {event.get('done')} TX in {elapsed}: {breakdown}")
+
+    @staticmethod
+    def format_duration(seconds):
+        seconds = int(round(float(seconds)))
+        hours, remainder = divmod(seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+    @staticmethod
+    def format_phase_breakdown(totals):
+        busy = sum(totals.values())
+        if not busy:
+            return ""
+        return ", ".join(
+            f"{phase} {seconds:.1f}s ({seconds / busy:.0%})" for phase, seconds in totals.items() if seconds > 0
+        )
 
     def handle_stderr(self):
         data = self.process.readAllStandardError().data().decode(errors='ignore').strip()
         for line in data.splitlines(): self.log(line, color="red")
 
-    def cct_finished(self):
+    def show_selected_waveforms(self, current, previous=None):
+        if not current.isValid():
+            return
+        row = self.result_proxy.mapToSource(current).row()
+        rx_column = self.result_model.column_index("rx_name")
+        tx_column = self.result_model.column_index("tx_name")
+        if rx_column is None or tx_column is None:
+            return
+        rx_name = self.result_model.text(row, rx_column)
+        tx_name = self.result_model.text(row, tx_column)
+        if self.result_archive_path is None:
+            self.waveform_viewer.show_message(f"{rx_name}: waveforms are stored with finished run results only.")
+            return
+        try:
+            self.waveform_viewer.show_victim(self.result_archive_path, rx_name, tx_name)
+        except (KeyError, OSError, ValueError) as e:
+            self.waveform_viewer.show_message(f"{rx_name}: {e}")
+
+    def stop_cct_process(self):
+        if self.process.state() != QProcess.NotRunning:
+            self.log("Stopping CCT process; partial results stay in the Result tab.", color="red")
+            self.process.kill()
+
+    def cct_finished(self, exit_code=0, exit_status=QProcess.NormalExit):
+        self.stop_button.setEnabled(False)
         self.log("CCT process finished.")
         self.prerun_button.setEnabled(True)
         self.calculate_button.setEnabled(True)
@@ -660,9 +767,29 @@ class MainController(AEDBCCTCalculator):
         self.calculate_button.setStyleSheet(self.calculate_button_original_style)
         self.prerun_button.setText("Pre-run")
         self.prerun_button.setStyleSheet(self.prerun_button_original_style)
+        self.prescreen_button.setEnabled(True)
+        self.prescreen_button.setText("Pre-screen")
+        self.prescreen_button.setStyleSheet(self.prescreen_button_original_style)
+        self.estimate_button.setEnabled(True)
+        self.estimate_button.setText("Estimate")
+        self.estimate_button.setStyleSheet(self.estimate_button_original_style)
+        if exit_status != QProcess.NormalExit or exit_code != 0:
+            return
         if self.cct_mode == "run":
+            archive_path = os.path.splitext(self.cct_output_path)[0] + ARCHIVE_SUFFIX
+            if os.path.exists(archive_path):
+                self.load_result_archive(archive_path)
+            else:
+                self.load_result_csv(self.cct_output_path)
+        elif self.cct_mode in ("prescreen", "estimate"):
             self.load_result_csv(self.cct_output_path)
 
+    def run_prescreen(self):
+        self.cct_mode = "prescreen"
+        self.run_cct_process("prescreen")
+    def run_estimate(self):
+        self.cct_mode = "estimate"
+        self.run_cct_process("estimate")
     def run_prerun(self): 
         self.cct_mode = "prerun"
         self.run_cct_process("prerun")
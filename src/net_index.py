@@ -0,0 +1,69 @@
+from collections import Counter
+from typing import Dict, Iterable, Sequence, Set
+
+ROLES = ("controller", "dram")
+
+
+class NetIndex:
+    """Pin counts of pcb.json components, indexed both ways.
+
+    ``components`` maps a component to its ``(pin_name, net_name)`` pins, as written
+    by get_edb.py.
+    """
+
+    def __init__(self, components: Dict[str, Sequence[Sequence[str]]]):
+        self.component_nets: Dict[str, Dict[str, int]] = {}
+        self.net_components: Dict[str, Dict[str, int]] = {}
+        for component, pins in components.items():
+            counts = dict(Counter(pin[1] for pin in pins))
+            self.component_nets[component] = counts
+            for net, count in counts.items():
+                self.net_components.setdefault(net, {})[component] = count
+
+    def nets(self, component: str) -> Set[str]:
+        return set(self.component_nets.get(component, ()))
+
+    def has_net(self, component: str, net: str) -> bool:
+        return net in self.component_nets.get(component, ())
+
+    def pin_count(self, component: str, net: str) -> int:
+        return self.component_nets.get(component, {}).get(net, 0)
+
+
+class SelectedNets:
+    """Nets shared by the selected controllers and DRAMs, updated per selection change.
+
+    ``select`` only visits the nets of components that were added or removed, so
+    ``common`` and ``pin_counts`` cost O(changed pins) instead of a rescan.
+    """
+
+    def __init__(self, index: NetIndex):
+        self.index = index
+        self.selected: Dict[str, Set[str]] = {role: set() for role in ROLES}
+        # Per role: net -> number of selected components with a pin on it.
+        self._members: Dict[str, Counter] = {role: Counter() for role in ROLES}
+        self.pin_counts: Counter = Counter()
+        self.common: Set[str] = set()
+
+    def select(self, role: str, components: Iterable[str]) -> None:
+        wanted = set(components)
+        current = self.selected[role]
+        for component in current - wanted:
+            self._update(role, component, -1)
+        for component in wanted - current:
+            self._update(role, component, 1)
+        self.selected[role] = wanted
+
+    def _update(self, role: str, component: str, sign: int) -> None:
+        members = self._members[role]
+        for net, count in self.index.component_nets.get(component, {}).items():
+            members[net] += sign
+            self.pin_counts[net] += sign * count
+            if members[net] <= 0:
+                del members[net]
+            if self.pin_counts[net] <= 0:
+                del self.pin_counts[net]
+            if all(net in self._members[other] for other in ROLES):
+                self.common.add(net)
+            else:
+                self.common.discard(net)
@@ -0,0 +1,309 @@
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bounds import SourceGroup, source_transfer
+from prescreen import uniform_spectrum
+from sparams import load_admittance
+
+OPTIMIZE_PARAMETERS = ("res_rx", "cap_rx", "res_tx", "cap_tx")
+OBJECTIVES = ("pseudo_eye", "power_ratio")
+DEFAULT_LEVELS = 3
+DEFAULT_ROUNDS = 3
+DEFAULT_KEEP = 2
+DEFAULT_OPTIMIZE_WORKERS = min(4, os.cpu_count() or 1)
+OPTIMIZE_CACHE_DIRNAME = "optimize_cache"
+_SAMPLES_PER_UI = 64
+_PULSE_DELAY = 1e-10
+_PS = 1e12
+
+
+@dataclass
+class ChannelGroup:
+    """TXs that share one kept-port set, with the S-block of those ports.
+
+    Port arrays are local to the block; ``observe`` holds (rx index, local ports,
+    weights) for every RX whose ports were all kept. The block stands in for a
+    network in ``sparams.s_block`` and ``port_z0``.
+    """
+
+    f: np.ndarray
+    s: np.ndarray
+    z0: np.ndarray
+    tx_ports: np.ndarray
+    rx_ports: np.ndarray
+    sources: List[SourceGroup]
+    tx_columns: List[int]
+    observe: List[Tuple[int, Tuple[int, ...], Tuple[float, ...]]]
+
+    @property
+    def nports(self) -> int:
+        return self.s.shape[1]
+
+
+@dataclass
+class OptimizeProblem:
+    frequency: np.ndarray
+    groups: List[ChannelGroup]
+    rx_labels: List[str]
+    tx_labels: List[str]
+    expected_tx: List[Optional[int]]
+    vhigh: float
+    t_rise: float
+    ui: float
+    tstop: float
+    base_values: Dict[str, float]
+    signature: str
+
+
+def pulse_phasor(frequency, vhigh: float, t_rise: float, ui: float, delay: float = _PULSE_DELAY) -> np.ndarray:
+    """Spectrum (V*s) of the TX PULSE source: trapezoid with flat top ``ui`` starting at ``delay``."""
+    frequency = np.asarray(frequency, dtype=float)
+    magnitude = vhigh * (ui + t_rise) * np.sinc(frequency * (ui + t_rise)) * np.sinc(frequency * t_rise)
+    return magnitude * np.exp(-2j * np.pi * frequency * (delay + t_rise + 0.5 * ui))
+
+
+def pulse_responses(problem: OptimizeProblem, values: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Time (ps), RX voltages (R, T, samples) and an observed mask (R, T) for one candidate.
+
+    Each group's terminated transfer comes from one factorization per frequency; it is
+    resampled onto a grid whose period is twice ``tstop`` and zero-padded to
+    ``_SAMPLES_PER_UI`` samples per UI before the inverse FFT.
+    """
+    frequency = problem.frequency
+    points = int(np.ceil(frequency[-1] * 2.0 * problem.tstop)) + 1
+    df = frequency[-1] / (points - 1)
+    n_time = max(2 * (points - 1), int(np.ceil(_SAMPLES_PER_UI / (problem.ui * df))))
+    n_time += n_time % 2
+    dt = 1.0 / (n_time * df)
+    samples = int(np.ceil(problem.tstop / dt))
+    time_ps = np.arange(samples) * dt * _PS
+
+    tx_load = load_admittance(frequency, values["res_tx"], values["cap_tx"], 'series')
+    rx_load = load_admittance(frequency, values["res_rx"], values["cap_rx"], 'shunt')
+    voltage = np.zeros((len(problem.rx_labels), len(problem.tx_labels), samples), dtype=np.float32)
+    observed = np.zeros((len(problem.rx_labels), len(problem.tx_labels)), dtype=bool)
+    for group in problem.groups:
+        if not group.observe:
+            continue
+        admittance = np.zeros((frequency.size, group.nports), dtype=complex)
+        admittance[:, group.tx_ports] = tx_load[:, None]
+        admittance[:, group.rx_ports] = rx_load[:, None]
+        observe_ports = sorted({port for _, ports, _ in group.observe for port in ports})
+        column = {port: position for position, port in enumerate(observe_ports)}
+        weights = np.zeros((len(group.observe), len(observe_ports)))
+        for row, (_, ports, port_weights) in enumerate(group.observe):
+            for port, weight in zip(ports, port_weights):
+                weights[row, column[port]] = weight
+        transfer = weights @ source_transfer(
+            group, np.arange(frequency.size), admittance, values["res_tx"], group.sources, observe_ports
+        )
+        grid, spectrum = uniform_spectrum(frequency, transfer.reshape(frequency.size, -1), points)
+        spectrum *= pulse_phasor(grid, problem.vhigh, problem.t_rise, problem.ui)[:, None]
+        response = np.fft.irfft(spectrum, n=n_time, axis=0)[:samples] / dt
+        response = response.reshape(samples, len(group.observe), len(group.tx_columns))
+        rows = [rx for rx, _, _ in group.observe]
+        voltage[np.ix_(rows, group.tx_columns)] = np.moveaxis(response, 0, -1)
+        observed[np.ix_(rows, group.tx_columns)] = True
+    return time_ps, voltage, observed
+
+
+def victim_metrics(problem: OptimizeProblem, time_ps: np.ndarray, voltage: np.ndarray, observed: np.ndarray) -> Dict[str, object]:
+    """Per-victim sig/isi/xtalk (V*ps) as ``CCT.calculate`` computes them, plus the worst victim."""
+    from cct import get_sig_isi
+
+    ui_ps = problem.ui * _PS
+    dt = time_ps[1] - time_ps[0]
+    magnitude = np.abs(voltage.astype(float))
+    area = dt * (magnitude.sum(axis=-1) - 0.5 * (magnitude[..., 0] + magnitude[..., -1]))
+    victims = []
+    for rx, tx in enumerate(problem.expected_tx):
+        if tx is None or not observed[rx, tx]:
+            continue
+        sig, isi = get_sig_isi(time_ps, voltage[rx, tx].astype(float), ui_ps)
+        aggressors = observed[rx].copy()
+        aggressors[tx] = False
+        xtalk = float(area[rx, aggressors].sum())
+        denom = isi + xtalk
+        victims.append({
+            "rx_name": problem.rx_labels[rx],
+            "sig": sig,
+            "isi": isi,
+            "xtalk": xtalk,
+            "pseudo_eye": sig - isi - xtalk,
+            "power_ratio": sig / denom if denom else float('inf'),
+        })
+    result: Dict[str, object] = {"victims": victims}
+    for objective in OBJECTIVES:
+        worst = min(victims, key=lambda item: item[objective]) if victims else None
+        result[f"worst_{objective}"] = worst[objective] if worst else float('nan')
+        result[f"worst_{objective}_victim"] = worst["rx_name"] if worst else ''
+    return result
+
+
+def candidate_key(problem: OptimizeProblem, values: Dict[str, float]) -> str:
+    payload = json.dumps({"problem": problem.signature, "values": {k: values[k] for k in sorted(values)}}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def evaluate_candidate(problem: OptimizeProblem, values: Dict[str, float], cache_dir: Optional[Path] = None) -> Dict[str, object]:
+    """Metrics of one candidate; waveforms and metrics are cached under ``cache_dir``."""
+    values = {**problem.base_values, **values}
+    path = Path(cache_dir) / f"{candidate_key(problem, values)}.npz" if cache_dir is not None else None
+    if path is not None and path.exists():
+        with np.load(path) as data:
+            metrics = json.loads(str(data["metrics"]))
+    else:
+        time_ps, voltage, observed = pulse_responses(problem, values)
+        metrics = victim_metrics(problem, time_ps, voltage, observed)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+            np.savez_compressed(
+                tmp_path, time_ps=time_ps, voltage=voltage, observed=observed,
+                metrics=np.array(json.dumps(metrics)),
+            )
+            os.replace(tmp_path, path)
+    return {"values": values, **metrics}
+
+
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def _init_worker(problem: OptimizeProblem, cache_dir: Optional[Path]) -> None:
+    _WORKER_STATE["problem"] = problem
+    _WORKER_STATE["cache_dir"] = cache_dir
+
+
+def _evaluate_in_worker(values: Dict[str, float]) -> Dict[str, object]:
+    return evaluate_candidate(_WORKER_STATE["problem"], values, _WORKER_STATE["cache_dir"])
+
+
+def _to_unit(value: float, low: float, high: float) -> float:
+    if low > 0 and high > 0:
+        return float(np.log(value / low) / np.log(high / low)) if high != low else 0.0
+    return (value - low) / (high - low) if high != low else 0.0
+
+
+def _from_unit(position: float, low: float, high: float) -> float:
+    if low > 0 and high > 0:
+        return float(low * (high / low) ** position)
+    return float(low + (high - low) * position)
+
+
+def refine_search(
+    evaluate_batch: Callable[[List[Dict[str, float]]], List[Dict[str, object]]],
+    space: Dict[str, Tuple[float, float]],
+    objective: str = "pseudo_eye",
+    levels: int = DEFAULT_LEVELS,
+    rounds: int = DEFAULT_ROUNDS,
+    keep: int = DEFAULT_KEEP,
+) -> List[Dict[str, object]]:
+    """Coarse-to-fine search maximizing ``worst_<objective>`` over ``space``.
+
+    Starts from a ``levels``-per-axis grid (log-spaced for positive ranges), then
+    ``rounds`` times evaluates the neighbours of the ``keep`` best points at half the
+    previous spacing. Points already evaluated are never repeated.
+    """
+    names = list(space)
+    step = 1.0 / max(levels - 1, 1)
+    batch = [tuple(point) for point in itertools.product(np.linspace(0.0, 1.0, max(levels, 1)), repeat=len(names))]
+    evaluated: Dict[Tuple[float, ...], Dict[str, object]] = {}
+    score_key = f"worst_{objective}"
+    for round_index in range(rounds + 1):
+        batch = [point for point in dict.fromkeys(tuple(round(x, 9) for x in point) for point in batch)
+                 if point not in evaluated]
+        candidates = [
+            {name: _from_unit(position, *space[name]) for name, position in zip(names, point)}
+            for point in batch
+        ]
+        for point, result in zip(batch, evaluate_batch(candidates)):
+            evaluated[point] = result
+        print(f"[optimize] Round {round_index}: {len(batch)} candidates, {len(evaluated)} evaluated")
+        if round_index == rounds:
+            break
+        ranked = sorted(evaluated, key=lambda point: -_score(evaluated[point], score_key))
+        step *= 0.5
+        batch = [
+            tuple(float(np.clip(x + offset * step, 0.0, 1.0)) for x, offset in zip(point, offsets))
+            for point in ranked[:keep]
+            for offsets in itertools.product((-1, 0, 1), repeat=len(names))
+        ]
+    return list(evaluated.values())
+
+
+def _score(result: Dict[str, object], key: str) -> float:
+    value = float(result[key])
+    return value if np.isfinite(value) or value > 0 else float('-inf')
+
+
+def pareto_flags(results: Sequence[Dict[str, object]]) -> List[bool]:
+    """Whether each result is non-dominated on (worst pseudo_eye, worst power_ratio)."""
+    points = np.array([[_score(item, f"worst_{name}") for name in OBJECTIVES] for item in results])
+    flags = []
+    for point in points:
+        dominated = np.any(np.all(points >= point, axis=1) & np.any(points > point, axis=1))
+        flags.append(not dominated)
+    return flags
+
+
+def run_optimization(
+    problem: OptimizeProblem,
+    space: Dict[str, Tuple[float, float]],
+    cache_dir: Optional[Path] = None,
+    objective: str = "pseudo_eye",
+    levels: int = DEFAULT_LEVELS,
+    rounds: int = DEFAULT_ROUNDS,
+    keep: int = DEFAULT_KEEP,
+    workers: int = DEFAULT_OPTIMIZE_WORKERS,
+) -> List[Dict[str, object]]:
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unsupported objective {objective!r}; expected one of {OBJECTIVES}")
+    unknown = set(space) - set(OPTIMIZE_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unsupported optimization parameters: {sorted(unknown)}")
+    if workers <= 1:
+        results = refine_search(
+            lambda batch: [evaluate_candidate(problem, values, cache_dir) for values in batch],
+            space, objective, levels, rounds, keep,
+        )
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem, cache_dir)) as pool:
+            results = refine_search(
+                lambda batch: list(pool.map(_evaluate_in_worker, batch)),
+                space, objective, levels, rounds, keep,
+            )
+    for result, flag in zip(results, pareto_flags(results)):
+        result["pareto"] = flag
+    results.sort(key=lambda item: -_score(item, f"worst_{objective}"))
+    return results
+
+
+def write_optimization_table(path: str | Path, results: Sequence[Dict[str, object]], names: Sequence[str]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = list(names) + [
+        'worst_pseudo_eye(V*ps)', 'pseudo_eye_victim', 'worst_power_ratio', 'power_ratio_victim', 'pareto',
+    ]
+    lines = [
+        ', '.join(
+            [f"{item['values'][name]:.4g}" for name in names]
+            + [
+                f"{item['worst_pseudo_eye']:.3f}", str(item['worst_pseudo_eye_victim']),
+                f"{item['worst_power_ratio']:.3f}", str(item['worst_power_ratio_victim']),
+                'yes' if item.get('pareto') else 'no',
+            ]
+        )
+        for item in results
+    ]
+    with path.open('w') as f:
+        f.write(', '.join(header) + '\n')
+        f.write('\n'.join(lines))
+    return path
@@ -0,0 +1,121 @@
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from prescreen import MIN_TDR_POINTS, uniform_spectrum
+from sparams import CompactNetwork, is_reciprocal, port_z0, s_block, write_touchstone
+
+DEFAULT_PASSIVITY_MARGIN = 1e-4
+DEFAULT_CAUSALITY_TOL = 0.05
+CAUSALITY_GUARD_SAMPLES = 8
+_CHUNK_POINTS = 32
+_CAUSALITY_ROWS = 16
+# Traces this far below the strongest one are numerical noise for causality purposes.
+_CAUSALITY_ENERGY_FLOOR = 1e-8
+
+
+def _all_ports(network):
+    return np.arange(network.nports)
+
+
+def singular_value_peaks(network, chunk_points: int = _CHUNK_POINTS) -> np.ndarray:
+    """Largest singular value of S at every frequency, computed in batched chunks."""
+    ports = _all_ports(network)
+    count = len(network.f)
+    peaks = np.empty(count)
+    for start in range(0, count, chunk_points):
+        index = np.arange(start, min(start + chunk_points, count))
+        block = s_block(network, ports, ports, index)
+        peaks[index] = np.linalg.svd(block, compute_uv=False)[:, 0]
+    return peaks
+
+
+def clip_singular_values(block: np.ndarray, limit: float) -> np.ndarray:
+    """Smallest-norm perturbation of each S(f) in ``block`` with all singular values <= ``limit``."""
+    u, sigma, vh = np.linalg.svd(block)
+    return (u * np.minimum(sigma, limit)[:, None, :]) @ vh
+
+
+def causality_ratios(network, points: Optional[int] = None, guard_samples: int = CAUSALITY_GUARD_SAMPLES) -> np.ndarray:
+    """RMS ratio of negative-time to total impulse-response energy for every S_ij.
+
+    Each trace is resampled onto a uniform grid, Hann-windowed to suppress band-limit
+    ringing and transformed with a batched IFFT; the second half of the periodic
+    response is negative time. ``guard_samples`` just before t=0 are ignored because
+    the window's main lobe legitimately spreads there.
+    """
+    frequency = np.asarray(network.f, dtype=float)
+    nports = network.nports
+    points = max(points or frequency.size, MIN_TDR_POINTS)
+    window = np.cos(0.5 * np.pi * np.linspace(0.0, 1.0, points)) ** 2
+    n_time = 2 * (points - 1)
+    half = n_time // 2
+    ports = _all_ports(network)
+
+    negative = np.empty((nports, nports))
+    total = np.empty((nports, nports))
+    for start in range(0, nports, _CAUSALITY_ROWS):
+        rows = ports[start:start + _CAUSALITY_ROWS]
+        block = s_block(network, rows, ports)
+        _, spectrum = uniform_spectrum(frequency, block.reshape(frequency.size, -1), points)
+        impulse = np.fft.irfft(spectrum * window[:, None], n=n_time, axis=0)
+        energy = impulse ** 2
+        negative[rows] = energy[half:n_time - guard_samples].sum(axis=0).reshape(len(rows), nports)
+        total[rows] = energy.sum(axis=0).reshape(len(rows), nports)
+
+    ratios = np.zeros_like(total)
+    significant = total > _CAUSALITY_ENERGY_FLOOR * total.max() if total.size else total.astype(bool)
+    ratios[significant] = np.sqrt(negative[significant] / total[significant])
+    return ratios
+
+
+def check_network(network, causality_tol: float = DEFAULT_CAUSALITY_TOL) -> Dict[str, object]:
+    frequency = np.asarray(network.f, dtype=float)
+    peaks = singular_value_peaks(network)
+    ratios = causality_ratios(network)
+    worst_freq = int(np.argmax(peaks))
+    worst_entry = np.unravel_index(int(np.argmax(ratios)), ratios.shape)
+    return {
+        "frequency_points": int(frequency.size),
+        "max_singular_value": float(peaks[worst_freq]),
+        "worst_passivity_frequency": float(frequency[worst_freq]),
+        "passivity_violations": int(np.count_nonzero(peaks > 1.0)),
+        "max_causality_ratio": float(ratios[worst_entry]),
+        "worst_causality_entry": [int(worst_entry[0]) + 1, int(worst_entry[1]) + 1],
+        "causality_violations": int(np.count_nonzero(ratios > causality_tol)),
+        "causality_tol": causality_tol,
+        "singular_value_peaks": peaks,
+    }
+
+
+def write_passive_network(
+    network,
+    path: str | Path,
+    peaks: Optional[np.ndarray] = None,
+    margin: float = DEFAULT_PASSIVITY_MARGIN,
+) -> Tuple[Path, int]:
+    """Clip singular values above 1 - ``margin`` and write the corrected network.
+
+    Only violating frequencies are touched. Reciprocity is restored afterwards when the
+    input was reciprocal; symmetrizing cannot raise the spectral norm.
+    """
+    if peaks is None:
+        peaks = singular_value_peaks(network)
+    limit = 1.0 - margin
+    ports = _all_ports(network)
+    if isinstance(network, CompactNetwork):
+        s = s_block(network, ports, ports)
+    else:
+        s = np.array(network.s, dtype=complex)
+    reciprocal = isinstance(network, CompactNetwork) or is_reciprocal(s)
+
+    violating = np.flatnonzero(peaks > limit)
+    for start in range(0, violating.size, _CHUNK_POINTS):
+        index = violating[start:start + _CHUNK_POINTS]
+        clipped = clip_singular_values(s[index], limit)
+        if reciprocal:
+            clipped = 0.5 * (clipped + np.swapaxes(clipped, 1, 2))
+        s[index] = clipped
+    path = write_touchstone(path, network.f, s, port_z0(network, ports))
+    return path, int(violating.size)
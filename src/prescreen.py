@@ -0,0 +1,125 @@
+import math
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from sparams import port_z0, s_block
+
+DEFAULT_CHUNK_POINTS = 64
+MIN_TDR_POINTS = 1024
+_RHO_LIMIT = 0.999
+_DB_FLOOR = 1e-15
+
+
+@dataclass
+class Endpoint:
+    """A single-ended port or a differential pair seen through mode weights."""
+
+    label: str
+    port_indices: Tuple[int, ...]
+    weights: Tuple[float, ...]
+
+    @classmethod
+    def single(cls, label: str, index: int) -> 'Endpoint':
+        return cls(label, (index,), (1.0,))
+
+    @classmethod
+    def differential(cls, label: str, positive: int, negative: int) -> 'Endpoint':
+        scale = 1.0 / math.sqrt(2.0)
+        return cls(label, (positive, negative), (scale, -scale))
+
+
+def to_db(values) -> np.ndarray:
+    return 20.0 * np.log10(np.maximum(np.abs(values), _DB_FLOOR))
+
+
+def power_to_db(values) -> np.ndarray:
+    return 10.0 * np.log10(np.maximum(values, _DB_FLOOR ** 2))
+
+
+def _weight_matrix(endpoints: Sequence[Endpoint]) -> Tuple[List[int], np.ndarray]:
+    ports = sorted({index for endpoint in endpoints for index in endpoint.port_indices})
+    position = {index: row for row, index in enumerate(ports)}
+    weights = np.zeros((len(ports), len(endpoints)))
+    for column, endpoint in enumerate(endpoints):
+        for index, weight in zip(endpoint.port_indices, endpoint.weights):
+            weights[position[index], column] = weight
+    return ports, weights
+
+
+def endpoint_transfer(
+    network,
+    rows: Sequence[Endpoint],
+    cols: Sequence[Endpoint],
+    frequency_index,
+    chunk_points: int = DEFAULT_CHUNK_POINTS,
+) -> np.ndarray:
+    """Endpoint-to-endpoint transfer W_r^T S W_c of shape (F, R, C) at ``frequency_index``."""
+    row_ports, row_weights = _weight_matrix(rows)
+    col_ports, col_weights = _weight_matrix(cols)
+    frequency_index = np.asarray(frequency_index)
+    result = np.empty((frequency_index.size, len(rows), len(cols)), dtype=complex)
+    for start in range(0, frequency_index.size, chunk_points):
+        stop = start + chunk_points
+        block = s_block(network, row_ports, col_ports, frequency_index[start:stop])
+        result[start:stop] = np.einsum('pr,fpq,qc->frc', row_weights, block, col_weights, optimize=True)
+    return result
+
+
+def endpoint_reflection(network, endpoints: Sequence[Endpoint]) -> np.ndarray:
+    """Single-ended or differential-mode reflection of every endpoint, shape (F, M)."""
+    gamma = np.empty((len(network.f), len(endpoints)), dtype=complex)
+    for column, endpoint in enumerate(endpoints):
+        weights = np.asarray(endpoint.weights)
+        block = s_block(network, endpoint.port_indices, endpoint.port_indices)
+        gamma[:, column] = np.einsum('p,fpq,q->f', weights, block, weights)
+    return gamma
+
+
+def endpoint_reference_impedance(network, endpoints: Sequence[Endpoint]) -> np.ndarray:
+    return np.array([
+        float(np.sum(np.real(port_z0(network, list(endpoint.port_indices))))) for endpoint in endpoints
+    ])
+
+
+def interpolate_columns(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    index = np.clip(np.searchsorted(xp, x), 1, xp.size - 1)
+    lo = xp[index - 1]
+    hi = xp[index]
+    weight = np.clip((x - lo) / np.where(hi > lo, hi - lo, 1.0), 0.0, 1.0)[:, None]
+    return fp[index - 1] * (1.0 - weight) + fp[index] * weight
+
+
+def uniform_spectrum(frequency, values: np.ndarray, points: int):
+    """Resample the columns of ``values`` onto ``points`` uniform samples from DC to f_max."""
+    grid = np.linspace(0.0, frequency[-1], points)
+    spectrum = interpolate_columns(grid, frequency, values)
+    # Below the first sample only the DC value is physical, which is real.
+    spectrum[grid < frequency[0]] = np.real(values[0])
+    spectrum[0] = np.real(spectrum[0])
+    return grid, spectrum
+
+
+def tdr_profiles(frequency, gamma: np.ndarray, z_ref, rise_time: float, points: int = None):
+    """Impedance step responses for every column of ``gamma`` via one batched IFFT.
+
+    Returns (time in seconds, impedance of shape (T, M)); only the first half of the
+    periodic response is kept so the wrap-around tail never shows up.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    if frequency.size < 2:
+        raise ValueError("TDR needs at least two frequency points")
+    points = max(points or frequency.size, MIN_TDR_POINTS)
+    grid, spectrum = uniform_spectrum(frequency, gamma, points)
+
+    sigma = rise_time / 2.563
+    spectrum *= np.exp(-2.0 * (np.pi * grid * sigma) ** 2)[:, None]
+
+    n_time = 2 * (points - 1)
+    impulse = np.fft.irfft(spectrum, n=n_time, axis=0)
+    rho = np.clip(np.cumsum(impulse, axis=0), -_RHO_LIMIT, _RHO_LIMIT)
+    dt = 1.0 / (n_time * (grid[1] - grid[0]))
+    keep = n_time // 2
+    impedance = np.asarray(z_ref, dtype=float)[None, :] * (1.0 + rho[:keep]) / (1.0 - rho[:keep])
+    return np.arange(keep) * dt, impedance
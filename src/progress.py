@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+PHASES = ("prune", "netlist", "analyze", "extract", "store")
+EVENT_PREFIX = "EVENT: "
+ETA_WINDOW = 5
+
+Event = Dict[str, object]
+
+
+def print_event(event: Event) -> None:
+    """Write ``event`` as one ``EVENT: <json>`` stdout line."""
+    print(f"{EVENT_PREFIX}{json.dumps(event)}", flush=True)
+
+
+def parse_event(line: str) -> Optional[Event]:
+    if not line.startswith(EVENT_PREFIX):
+        return None
+    try:
+        event = json.loads(line[len(EVENT_PREFIX):])
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+class RunProgress:
+    """Per-TX phase timing of one simulation run, reported as events through ``emit``.
+
+    Events are ``run_start``, ``tx_start`` (when the TX reaches the simulator, after
+    any wait in the netlist queue), ``tx_end`` (with the TX's phase seconds, done/total
+    and ETA) and ``run_end`` (with phase totals). Phases may be timed from different
+    threads. The ETA uses the moving average of the last ``window`` gaps
+    between finished TXs, i.e. pipelined throughput rather than single-TX latency.
+    """
+
+    def __init__(self, total: int, emit: Optional[Callable[[Event], None]] = None, window: int = ETA_WINDOW):
+        self.total = total
+        self.emit = emit
+        self.done = 0
+        self.totals = {phase: 0.0 for phase in PHASES}
+        self._phases: Dict[int, Dict[str, float]] = {}
+        self._gaps: Deque[float] = deque(maxlen=max(window, 1))
+        self._lock = threading.Lock()
+        self._started = self._last = time.perf_counter()
+
+    def _send(self, event: Event) -> None:
+        if self.emit is not None:
+            self.emit(event)
+
+    def begin(self) -> None:
+        self._started = self._last = time.perf_counter()
+        self._send({"event": "run_start", "total": self.total})
+
+    def start(self, index: int, label: str) -> None:
+        """Report that TX ``index`` reached the simulator; phases timed before it are kept."""
+        with self._lock:
+            self._phases.setdefault(index, {phase: 0.0 for phase in PHASES})
+        self._send({"event": "tx_start", "index": index, "tx": label, "total": self.total})
+
+    def add(self, index: int, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases.setdefault(index, {name: 0.0 for name in PHASES})[phase] += seconds
+            self.totals[phase] += seconds
+
+    def finish(self, index: int, label: str) -> None:
+        with self._lock:
+            now = time.perf_counter()
+            self._gaps.append(now - self._last)
+            self._last = now
+            self.done += 1
+            phases = self._phases.pop(index, {})
+            eta = sum(self._gaps) / len(self._gaps) * (self.total - self.done)
+            event = {
+                "event": "tx_end",
+                "index": index,
+                "tx": label,
+                "done": self.done,
+                "total": self.total,
+                "phases": {phase: round(seconds, 4) for phase, seconds in phases.items()},
+                "elapsed": round(now - self._started, 3),
+                "eta": round(eta, 1),
+            }
+        self._send(event)
+
+    def end(self) -> None:
+        self._send({
+            "event": "run_end",
+            "done": self.done,
+            "total": self.total,
+            "elapsed": round(time.perf_counter() - self._started, 3),
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.totals.items()},
+        })
@@ -0,0 +1,171 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ARCHIVE_SUFFIX = '.npz'
+_WAVEFORM_PREFIX = 'waveform_'
+
+# (field, CSV header, number format) for the per-victim metrics, in CSV order.
+Column = Tuple[str, str, str]
+METRIC_COLUMNS: List[Column] = [
+    ("sig", "sig(V*ps)", ".3f"),
+    ("isi", "isi(V*ps)", ".3f"),
+    ("xtalk", "xtalk(V*ps)", ".3f"),
+    ("pseudo_eye", "pseudo_eye(V*ps)", ".3f"),
+    ("power_ratio", "power_ratio", ".3f"),
+    ("eye_height", "eye_height(V)", ".4f"),
+    ("eye_width", "eye_width(ps)", ".3f"),
+]
+
+
+def metric_columns(ber_levels: Sequence[float] = ()) -> List[Column]:
+    columns = list(METRIC_COLUMNS)
+    for ber in ber_levels:
+        columns.append((f"stat_eye_height@{ber:g}", f"stat_eye_height@{ber:g}(V)", ".4f"))
+        columns.append((f"stat_eye_width@{ber:g}", f"stat_eye_width@{ber:g}(ps)", ".3f"))
+    return columns
+
+
+def metrics_array(rows: Sequence[Dict[str, object]], columns: Sequence[Column]) -> np.ndarray:
+    """Structured array with tx_name/rx_name labels and one float64 field per column."""
+    width = max([1] + [len(str(row[key])) for row in rows for key in ("tx_name", "rx_name")])
+    dtype = [("tx_name", f"U{width}"), ("rx_name", f"U{width}")] + [(field, "f8") for field, _, _ in columns]
+    records = np.zeros(len(rows), dtype=dtype)
+    for index, row in enumerate(rows):
+        records[index] = tuple(
+            [str(row["tx_name"]), str(row["rx_name"])] + [float(row.get(field, np.nan)) for field, _, _ in columns]
+        )
+    return records
+
+
+def write_metrics_csv(path: str | Path, metrics: np.ndarray, columns: Sequence[Column]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for record in metrics:
+        values = [record["tx_name"], record["rx_name"]]
+        values += [format(float(record[field]), spec) for field, _, spec in columns]
+        lines.append(', '.join(values))
+    with path.open('w') as f:
+        f.writelines(', '.join(['tx_name', 'rx_name'] + [header for _, header, _ in columns]) + '\n')
+        f.write('\n'.join(lines))
+    return path
+
+
+def write_archive(
+    path: str | Path,
+    metrics: np.ndarray,
+    columns: Sequence[Column],
+    settings: Dict[str, object],
+    prune_stats: Sequence[Dict[str, object]],
+    waveforms: Dict[Tuple[str, str], Tuple[Sequence[float], Sequence[float]]],
+) -> Path:
+    """Write metrics, settings, prune stats and (rx, tx) waveforms to one compressed npz.
+
+    Each waveform is its own archive member, so readers decompress only what they use.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    keys = list(waveforms)
+    width = max([1] + [len(label) for key in keys for label in key])
+    index = np.zeros(
+        len(keys), dtype=[("rx_name", f"U{width}"), ("tx_name", f"U{width}"), ("samples", "i8"), ("peak", "f8")]
+    )
+    members: Dict[str, np.ndarray] = {}
+    for position, (rx_label, tx_label) in enumerate(keys):
+        time, voltage = waveforms[(rx_label, tx_label)]
+        data = np.vstack([np.asarray(time, dtype=float), np.asarray(voltage, dtype=float)])
+        peak = float(np.max(np.abs(data[1]))) if data.shape[1] else 0.0
+        index[position] = (rx_label, tx_label, data.shape[1], peak)
+        members[f"{_WAVEFORM_PREFIX}{position}"] = data
+
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{ARCHIVE_SUFFIX}")
+    np.savez_compressed(
+        tmp_path,
+        metrics=metrics,
+        columns=np.array(json.dumps([list(column) for column in columns])),
+        settings=np.array(json.dumps(settings, default=str)),
+        prune_stats=np.array(json.dumps(list(prune_stats), default=str)),
+        waveform_index=index,
+        **members,
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+class ResultsArchive:
+    """Lazy reader for archives written by ``write_archive``.
+
+    Nothing is decompressed until a property or waveform is requested, and each
+    waveform is read on its own.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._npz = np.load(self.path, allow_pickle=False)
+        self._cache: Dict[str, object] = {}
+        self._lookup: Optional[Dict[Tuple[str, str], int]] = None
+
+    def __enter__(self) -> 'ResultsArchive':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._npz.close()
+
+    def _json(self, name: str):
+        if name not in self._cache:
+            self._cache[name] = json.loads(str(self._npz[name]))
+        return self._cache[name]
+
+    @property
+    def metrics(self) -> np.ndarray:
+        if "metrics" not in self._cache:
+            self._cache["metrics"] = self._npz["metrics"]
+        return self._cache["metrics"]
+
+    @property
+    def columns(self) -> List[Column]:
+        return [tuple(column) for column in self._json("columns")]
+
+    @property
+    def settings(self) -> Dict[str, object]:
+        return self._json("settings")
+
+    @property
+    def prune_stats(self) -> List[Dict[str, object]]:
+        return self._json("prune_stats")
+
+    @property
+    def waveform_index(self) -> np.ndarray:
+        if "waveform_index" not in self._cache:
+            self._cache["waveform_index"] = self._npz["waveform_index"]
+        return self._cache["waveform_index"]
+
+    def waveform_keys(self) -> List[Tuple[str, str]]:
+        return [(str(row["rx_name"]), str(row["tx_name"])) for row in self.waveform_index]
+
+    def sources(self, rx_name: str) -> List[Tuple[str, float]]:
+        """TX names with a waveform at ``rx_name`` and each waveform's peak |V| (NaN in older archives)."""
+        index = self.waveform_index
+        rows = index[index["rx_name"] == rx_name]
+        peaks = rows["peak"] if "peak" in index.dtype.names else np.full(len(rows), np.nan)
+        return [(str(tx), float(peak)) for tx, peak in zip(rows["tx_name"], peaks)]
+
+    def waveform(self, rx_name: str, tx_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Time (ps) and voltage (V) of the response at ``rx_name`` to ``tx_name``."""
+        if self._lookup is None:
+            self._lookup = {key: position for position, key in enumerate(self.waveform_keys())}
+        position = self._lookup.get((rx_name, tx_name))
+        if position is None:
+            raise KeyError(f"No waveform for rx {rx_name!r} and tx {tx_name!r}")
+        data = self._npz[f"{_WAVEFORM_PREFIX}{position}"]
+        return data[0], data[1]
+
+    def export_csv(self, path: str | Path) -> Path:
+        return write_metrics_csv(path, self.metrics, self.columns)
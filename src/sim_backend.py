@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+Waveforms = Dict[int, Tuple[List[float], List[float]]]
+
+RECORD_INDEX_NAME = "index.json"
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+_DIGEST_CHUNK = 1 << 20
+_INCLUDE_PATTERN = re.compile(r'^\.include\s+"([^"]+)"\s*$', re.IGNORECASE | re.MULTILINE)
+_QUOTED_PATH_PATTERN = re.compile(r'"([^"]*[\\/][^"]*)"')
+
+
+class SimulatorBackend(Protocol):
+    """Transient simulator used by ``CCT.run``.
+
+    ``run`` returns waveforms keyed by net number as (time in ps, voltage in V).
+    """
+
+    def prepare(self, tstep: str, tstop: str) -> None: ...
+
+    def run(self, netlist: str) -> Waveforms: ...
+
+    def close(self) -> None: ...
+
+
+def file_digest(path: str | Path) -> str:
+    """Streamed SHA-1 of a file's content; cached by path, size and mtime so it is read once."""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    digest = _FILE_DIGESTS.get(key)
+    if digest is None:
+        sha1 = hashlib.sha1()
+        with path.open('rb') as handle:
+            for chunk in iter(lambda: handle.read(_DIGEST_CHUNK), b''):
+                sha1.update(chunk)
+        digest = _FILE_DIGESTS[key] = sha1.hexdigest()
+    return digest
+
+
+def _expand_includes(netlist: str, depth: int = 0) -> str:
+    if depth > 8:
+        return netlist
+
+    def inline(match: re.Match) -> str:
+        path = Path(match.group(1))
+        if not path.is_file() or path.suffix.lower() not in ('.inc', '.cir', '.sp'):
+            return match.group(0)
+        return _expand_includes(path.read_text(encoding='utf-8'), depth + 1)
+
+    return _INCLUDE_PATTERN.sub(inline, netlist)
+
+
+def _path_token(match: re.Match) -> str:
+    """File name plus content digest of a quoted path; the name alone if it is not a readable file."""
+    path = Path(match.group(1))
+    name = Path(match.group(1).replace('\\', '/')).name
+    try:
+        if path.is_file():
+            return f'"{name}@{file_digest(path)}"'
+    except OSError:
+        pass
+    return f'"{name}"'
+
+
+def netlist_key(netlist: str, tstep: str, tstop: str) -> str:
+    """Location-independent key of a simulation.
+
+    Included netlist blocks are inlined and every remaining quoted file path (the
+    Touchstone or macromodel the channel points at) is replaced by its file name and
+    content digest, so the key survives copying or moving the data but changes with
+    the network itself, even under the same name.
+    """
+    text = _expand_includes(netlist)
+    text = _QUOTED_PATH_PATTERN.sub(_path_token, text)
+    digest = hashlib.sha1()
+    digest.update(f"{tstep}|{tstop}\n".encode('utf-8'))
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class _Recording:
+    """Directory of netlist-key -> waveform npz files plus a JSON index."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        index_path = self.directory / RECORD_INDEX_NAME
+        self.index: Dict[str, Dict[str, object]] = {}
+        if index_path.exists():
+            self.index = json.loads(index_path.read_text(encoding='utf-8'))
+
+    def save(self, key: str, waveforms: Waveforms, tstep: str, tstop: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{key}.npz"
+        np.savez_compressed(path, **{
+            f"net_{number}": np.vstack([np.asarray(time, dtype=float), np.asarray(voltage, dtype=float)])
+            for number, (time, voltage) in waveforms.items()
+        })
+        self.index[key] = {"file": path.name, "tstep": tstep, "tstop": tstop, "nets": sorted(waveforms)}
+        tmp_path = self.directory / f"{RECORD_INDEX_NAME}.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(self.index, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.directory / RECORD_INDEX_NAME)
+
+    def load(self, key: str) -> Waveforms:
+        entry = self.index[key]
+        with np.load(self.directory / str(entry["file"])) as data:
+            return {
+                int(name.split('_', 1)[1]): (data[name][0].tolist(), data[name][1].tolist())
+                for name in data.files
+            }
+
+
+class RecordingBackend:
+    """Wraps another backend and stores every netlist -> waveforms pair it produces."""
+
+    def __init__(self, inner: SimulatorBackend, directory: str | Path):
+        self.inner = inner
+        self.recording = _Recording(directory)
+        self._timing: Tuple[str, str] = ('', '')
+
+    def prepare(self, tstep: str, tstop: str) -> None:
+        self._timing = (tstep, tstop)
+        self.inner.prepare(tstep, tstop)
+
+    def run(self, netlist: str) -> Waveforms:
+        waveforms = self.inner.run(netlist)
+        self.recording.save(netlist_key(netlist, *self._timing), waveforms, *self._timing)
+        return waveforms
+
+    @property
+    def phase_seconds(self) -> Optional[Dict[str, float]]:
+        return getattr(self.inner, 'phase_seconds', None)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class ReplayBackend:
+    """Serves waveforms recorded by ``RecordingBackend``; no simulator required."""
+
+    def __init__(self, directory: str | Path):
+        self.recording = _Recording(directory)
+        if not self.recording.index:
+            raise FileNotFoundError(f"No recorded simulations in {directory}")
+        self._timing: Tuple[str, str] = ('', '')
+
+    def prepare(self, tstep: str, tstop: str) -> None:
+        self._timing = (tstep, tstop)
+
+    def run(self, netlist: str) -> Waveforms:
+        key = netlist_key(netlist, *self._timing)
+        if key not in self.recording.index:
+            raise KeyError(f"No recorded simulation for netlist {key[:12]} (tstep={self._timing[0]}, tstop={self._timing[1]})")
+        return self.recording.load(key)
+
+    def close(self) -> None:
+        pass
+
+
+class SharedBackend:
+    """One warm backend shared by several jobs, possibly on different threads.
+
+    ``run`` calls are serialized; each thread's ``prepare`` is remembered and applied
+    to the inner backend only when a different timing ran in between, and its last
+    phase split is kept per thread. ``close`` is a no-op so jobs cannot end the
+    session; call ``shutdown`` when all jobs are done.
+    """
+
+    def __init__(self, inner: SimulatorBackend):
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._applied: Optional[Tuple[str, str]] = None
+
+    def prepare(self, tstep: str, tstop: str) -> None:
+        self._local.timing = (tstep, tstop)
+
+    def run(self, netlist: str) -> Waveforms:
+        timing = getattr(self._local, 'timing', None)
+        if timing is None:
+            raise RuntimeError("prepare must be called before run")
+        with self._lock:
+            if timing != self._applied:
+                self.inner.prepare(*timing)
+                self._applied = timing
+            waveforms = self.inner.run(netlist)
+            self._local.phase_seconds = getattr(self.inner, 'phase_seconds', None)
+            return waveforms
+
+    @property
+    def phase_seconds(self) -> Optional[Dict[str, float]]:
+        """Phase split of this thread's last ``run``, captured before another thread's run replaces it."""
+        return getattr(self._local, 'phase_seconds', None)
+
+    def close(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self.inner.close()
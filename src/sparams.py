@@ -0,0 +1,334 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - optional dependency for network I/O
+    import skrf as rf
+except ImportError:  # pragma: no cover - compact storage still works without skrf
+    rf = None
+
+import numpy as np
+
+DEFAULT_RECIPROCITY_RTOL = 1e-3
+TRIM_REPORT_SUFFIX = '.json'
+_SPICE_SCALE = {'f': 1e-15, 'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3, 'k': 1e3, 'g': 1e9, 't': 1e12}
+
+# (local port index, topology, resistance, capacitance); topology is 'series' for an
+# R in series with C to ground (passive TX) or 'shunt' for R parallel C (RX).
+Termination = Tuple[int, str, float, float]
+_RECIPROCITY_CHUNK = 64
+
+
+class CompactNetwork:
+    """Upper-triangle, single-precision storage of a reciprocal S-parameter network."""
+
+    def __init__(self, frequency, packed, nports: int, z0, name: str = ''):
+        self.f = np.asarray(frequency, dtype=float)
+        self.packed = np.asarray(packed, dtype=np.complex64)
+        self.nports = int(nports)
+        self.z0 = np.broadcast_to(np.asarray(z0, dtype=complex), (self.nports,)).copy()
+        self.name = name
+        if self.packed.shape != (self.f.size, self.nports * (self.nports + 1) // 2):
+            raise ValueError("packed data does not match frequency count and port count")
+
+    @classmethod
+    def from_network(cls, network, rtol: float = DEFAULT_RECIPROCITY_RTOL) -> Optional['CompactNetwork']:
+        """Pack ``network`` if it is reciprocal within ``rtol``; return None otherwise."""
+        s = network.s
+        z0 = np.asarray(network.z0)
+        if z0.ndim == 2 and not np.allclose(z0, z0[0]):
+            return None
+        if not is_reciprocal(s, rtol):
+            return None
+        nports = s.shape[1]
+        rows, cols = np.triu_indices(nports)
+        packed = np.empty((s.shape[0], rows.size), dtype=np.complex64)
+        for start in range(0, s.shape[0], _RECIPROCITY_CHUNK):
+            stop = start + _RECIPROCITY_CHUNK
+            packed[start:stop] = s[start:stop, rows, cols]
+        return cls(network.f, packed, nports, z0[0] if z0.ndim == 2 else z0, name=getattr(network, 'name', '') or '')
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.packed.nbytes + self.f.nbytes)
+
+    def _packed_index(self, rows, cols) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        lo = np.minimum(rows, cols)
+        hi = np.maximum(rows, cols)
+        return lo * self.nports - lo * (lo - 1) // 2 + (hi - lo)
+
+    def s_trace(self, row: int, col: int) -> np.ndarray:
+        return self.packed[:, int(self._packed_index(row, col))]
+
+    def s_block(self, rows: Sequence[int], cols: Sequence[int], frequency_index=None) -> np.ndarray:
+        """Expand the ``rows`` x ``cols`` block to a full complex128 array of shape (F, R, C)."""
+        index = self._packed_index(np.asarray(rows)[:, None], np.asarray(cols)[None, :])
+        packed = self.packed if frequency_index is None else self.packed[frequency_index]
+        return packed[:, index].astype(complex)
+
+    def subnetwork(self, port_indices: Sequence[int]):
+        if rf is None:
+            raise ImportError("scikit-rf is required to build sub-networks")
+        block = self.s_block(port_indices, port_indices)
+        frequency = rf.Frequency.from_f(self.f, unit='hz')
+        return rf.Network(frequency=frequency, s=block, z0=self.z0[list(port_indices)], name=self.name)
+
+
+def is_reciprocal(s: np.ndarray, rtol: float = DEFAULT_RECIPROCITY_RTOL) -> bool:
+    scale = 0.0
+    worst = 0.0
+    for start in range(0, s.shape[0], _RECIPROCITY_CHUNK):
+        chunk = s[start:start + _RECIPROCITY_CHUNK]
+        if chunk.size == 0:
+            continue
+        scale = max(scale, float(np.max(np.abs(chunk))))
+        worst = max(worst, float(np.max(np.abs(chunk - np.swapaxes(chunk, 1, 2)))))
+    return worst <= rtol * scale if scale else True
+
+
+def s_trace(network, row: int, col: int) -> np.ndarray:
+    if isinstance(network, CompactNetwork):
+        return network.s_trace(row, col)
+    return network.s[:, row, col]
+
+
+def s_block(network, rows: Sequence[int], cols: Sequence[int], frequency_index=None) -> np.ndarray:
+    if isinstance(network, CompactNetwork):
+        return network.s_block(rows, cols, frequency_index)
+    s = network.s if frequency_index is None else network.s[frequency_index]
+    return s[:, np.asarray(rows)[:, None], np.asarray(cols)[None, :]]
+
+
+def parse_spice_value(value) -> float:
+    """Convert a SPICE-style quantity such as '40ohm', '1.8pF' or '1meg' to a float."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.match(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([A-Za-z]*)', str(value))
+    if not match:
+        raise ValueError(f"Cannot parse SPICE value: {value!r}")
+    number = float(match.group(1))
+    suffix = match.group(2).lower()
+    if suffix.startswith('meg'):
+        return number * 1e6
+    return number * _SPICE_SCALE.get(suffix[:1], 1.0)
+
+
+def load_admittance(frequency, resistance: float, capacitance: float, topology: str) -> np.ndarray:
+    jwc = 2j * np.pi * np.asarray(frequency, dtype=float) * capacitance
+    if topology == 'series':
+        return jwc / (1.0 + jwc * resistance)
+    if topology == 'shunt':
+        return 1.0 / resistance + jwc
+    raise ValueError(f"Unsupported termination topology: {topology!r}")
+
+
+def apply_terminations(frequency, s: np.ndarray, z0, terminations: Optional[Sequence[Termination]]):
+    """Fold R/C loads on the listed ports into ``s`` and return the reduced network.
+
+    Uses S_KK + S_KT G (I - S_TT G)^-1 S_TK with G the diagonal of load reflection
+    coefficients, batched over frequency. Remaining ports keep their original order.
+    """
+    s = np.asarray(s)
+    z0 = np.broadcast_to(np.asarray(z0, dtype=complex), (s.shape[1],))
+    if not terminations:
+        return s, z0
+    folded = [int(index) for index, _, _, _ in terminations]
+    kept = [index for index in range(s.shape[1]) if index not in set(folded)]
+    gamma = np.empty((s.shape[0], len(folded)), dtype=complex)
+    for column, (index, topology, resistance, capacitance) in enumerate(terminations):
+        admittance = z0[index].real * load_admittance(frequency, resistance, capacitance, topology)
+        gamma[:, column] = (1.0 - admittance) / (1.0 + admittance)
+
+    s_kk = s[:, kept][:, :, kept]
+    s_kt = s[:, kept][:, :, folded]
+    s_tk = s[:, folded][:, :, kept]
+    s_tt = s[:, folded][:, :, folded]
+    system = np.eye(len(folded))[None] - s_tt * gamma[:, None, :]
+    reflected = np.linalg.solve(system, s_tk)
+    return s_kk + s_kt @ (gamma[:, :, None] * reflected), z0[kept]
+
+
+def port_z0(network, indices: Sequence[int]) -> np.ndarray:
+    if isinstance(network, CompactNetwork):
+        return network.z0[list(indices)]
+    z0 = np.asarray(network.z0)
+    return (z0[0] if z0.ndim == 2 else z0)[list(indices)]
+
+
+def renormalize(s: np.ndarray, z0, reference: float) -> np.ndarray:
+    """Power-wave S-parameters of ``s`` (real per-port ``z0``) against a common real ``reference``.
+
+    S' = A^-1 (S - G)(I - G S)^-1 A with G = (r - z0)/(r + z0) and A = sqrt(1 - G^2),
+    batched over frequency.
+    """
+    s = np.asarray(s, dtype=complex)
+    z0 = np.broadcast_to(np.real(np.asarray(z0, dtype=complex)), (s.shape[1],))
+    gamma = (reference - z0) / (reference + z0)
+    scale = np.sqrt(1.0 - gamma ** 2)
+    system = np.eye(s.shape[1])[None] - gamma[None, :, None] * s
+    # (S - G)(I - G S)^-1, computed as a solve on the transposed system.
+    product = np.swapaxes(np.linalg.solve(np.swapaxes(system, 1, 2), np.swapaxes(s - np.diag(gamma), 1, 2)), 1, 2)
+    return product * (scale[None, None, :] / scale[None, :, None])
+
+
+def _touchstone_row_format(nports: int) -> str:
+    """One frequency point: 1- and 2-port data on a single line, larger matrices one
+    row per line wrapped after four pairs (Touchstone v1)."""
+    pair = '% .9e % .9e'
+    if nports <= 2:
+        return '%.12g ' + ' '.join([pair] * nports * nports) + '\n'
+    rows = []
+    for _ in range(nports):
+        chunks = [' '.join([pair] * min(4, nports - start)) for start in range(0, nports, 4)]
+        rows.append('\n'.join(chunks))
+    return '%.12g ' + '\n'.join(rows) + '\n'
+
+
+def write_touchstone(path: str | Path, frequency, s: np.ndarray, z0) -> Path:
+    """Write a Touchstone v1 file in RI format using one format pass per frequency point.
+
+    The file is written to a temporary name first and moved into place, so readers
+    never observe a partially written network. Touchstone v1 has a single reference
+    impedance, so mixed real port references are renormalised to port 0's; mixed
+    complex references raise ValueError.
+    """
+    path = Path(path)
+    s = np.asarray(s, dtype=complex)
+    nports = s.shape[1]
+    z0 = np.broadcast_to(np.asarray(z0, dtype=complex), (nports,))
+    reference = float(np.real(z0[0]))
+    if not np.allclose(z0, z0[0]):
+        if np.any(np.abs(np.imag(z0)) > 1e-9 * np.abs(z0)) or np.any(np.real(z0) <= 0):
+            raise ValueError(f"Cannot write mixed complex port references to Touchstone v1: {z0.tolist()}")
+        s = renormalize(s, z0, reference)
+    if nports == 2:
+        s = np.swapaxes(s, 1, 2)
+    values = np.ascontiguousarray(s).reshape(s.shape[0], -1).view(float)
+    table = np.column_stack([np.asarray(frequency, dtype=float), values])
+    row_format = _touchstone_row_format(nports)
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open('w', encoding='ascii') as handle:
+        handle.write(f"! {nports}-port network\n")
+        handle.write(f"# Hz S RI R {reference:g}\n")
+        handle.writelines(row_format % tuple(row) for row in table.tolist())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _segment_error(frequency, parts, data_type: str, start: int, stop: int) -> float:
+    """Worst complex error when points strictly between ``start`` and ``stop`` are interpolated."""
+    if stop - start < 2:
+        return 0.0
+    f = frequency[start:stop + 1]
+    weight = ((f[1:-1] - f[0]) / (f[-1] - f[0]))[:, None]
+    if data_type == 'MA':
+        magnitude, angle = parts
+        # Keep phase steps below pi so the endpoints' angles interpolate unambiguously.
+        if np.any(np.abs(angle[stop] - angle[start]) >= np.pi):
+            return float('inf')
+        mag = magnitude[start] + weight * (magnitude[stop] - magnitude[start])
+        ang = angle[start] + weight * (angle[stop] - angle[start])
+        approx = mag * np.exp(1j * ang)
+        exact = magnitude[start + 1:stop] * np.exp(1j * angle[start + 1:stop])
+    else:
+        (values,) = parts
+        approx = values[start] + weight * (values[stop] - values[start])
+        exact = values[start + 1:stop]
+    return float(np.max(np.abs(approx - exact)))
+
+
+def decimate_frequencies(frequency, s: np.ndarray, tol: float, data_type: str = 'MA') -> Tuple[np.ndarray, float]:
+    """Greedily drop frequency points that linear interpolation reproduces within ``tol``.
+
+    ``data_type`` selects the quantity the simulator interpolates: 'MA' interpolates
+    magnitude and unwrapped angle, 'RI' interpolates real and imaginary parts. The
+    first (DC) and last points are always kept. Returns the kept indices and the
+    largest interpolation error over the removed points.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    count = frequency.size
+    if count <= 2:
+        return np.arange(count), 0.0
+    flat = np.asarray(s).reshape(count, -1)
+    data_type = str(data_type).upper()
+    if data_type == 'MA':
+        parts = (np.abs(flat), np.unwrap(np.angle(flat), axis=0))
+    else:
+        parts = (flat,)
+
+    def error(start, stop):
+        return _segment_error(frequency, parts, data_type, start, stop)
+
+    keep = [0]
+    worst = 0.0
+    anchor = 0
+    while anchor < count - 1:
+        good = anchor + 1
+        span = 2
+        while anchor + span <= count - 1 and error(anchor, anchor + span) <= tol:
+            good = anchor + span
+            span *= 2
+        low, high = good, min(anchor + span, count)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if error(anchor, middle) <= tol:
+                low = middle
+            else:
+                high = middle
+        worst = max(worst, error(anchor, low))
+        keep.append(low)
+        anchor = low
+    return np.asarray(keep), worst
+
+
+def trim_report_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + TRIM_REPORT_SUFFIX)
+
+
+def load_trim_report(path: str | Path) -> Optional[Dict[str, object]]:
+    report_path = trim_report_path(path)
+    if not report_path.exists():
+        return None
+    try:
+        with report_path.open('r', encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_reduced_touchstone(
+    path: str | Path,
+    frequency,
+    s: np.ndarray,
+    z0,
+    decimate_tol: Optional[float] = None,
+    data_type: str = 'MA',
+    terminations: Optional[List[Termination]] = None,
+) -> Dict[str, object]:
+    """Fold terminations, optionally thin the frequency grid, then write with a sidecar report."""
+    frequency = np.asarray(frequency, dtype=float)
+    s, z0 = apply_terminations(frequency, s, z0, terminations)
+    report: Dict[str, object] = {
+        "folded_port_count": len(terminations or []),
+        "frequency_points": int(frequency.size),
+        "removed_frequency_points": 0,
+        "max_interpolation_error": 0.0,
+        "decimate_tol": decimate_tol,
+    }
+    if decimate_tol is not None and decimate_tol > 0:
+        keep, max_error = decimate_frequencies(frequency, s, decimate_tol, data_type)
+        report["removed_frequency_points"] = int(frequency.size - keep.size)
+        report["max_interpolation_error"] = max_error
+        frequency = frequency[keep]
+        s = np.asarray(s)[keep]
+
+    with trim_report_path(path).open('w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    write_touchstone(path, frequency, s, z0)
+    return report
@@ -0,0 +1,250 @@
+import math
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PySide6.QtGui import QColor
+
+FETCH_BATCH = 500
+_CLAUSE_PATTERN = re.compile(r'^(?P<field>[^<>=!~]+?)\s*(?P<op><=|>=|==|!=|<|>|~)\s*(?P<value>.+)$')
+_AND_PATTERN = re.compile(r'\s+and\s+', re.IGNORECASE)
+
+# (column or None for any column, operator, text, number or None)
+Clause = Tuple[Optional[int], str, str, Optional[float]]
+
+
+def _number(value: object) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value))
+    except ValueError:
+        return None
+
+
+def columns_from_text(rows: Sequence[Sequence[str]], column_count: int) -> Tuple[List[list], List[Optional[str]]]:
+    """Columns of CSV text cells; all-numeric columns become floats shown with their CSV precision."""
+    columns: List[list] = []
+    formats: List[Optional[str]] = []
+    for column in range(column_count):
+        cells = [row[column].strip() if column < len(row) else '' for row in rows]
+        numbers = [_number(cell) for cell in cells]
+        if cells and all(number is not None for number in numbers):
+            decimals = max(len(cell.partition('.')[2]) if 'e' not in cell.lower() else 6 for cell in cells)
+            columns.append(numbers)
+            formats.append(f".{decimals}f")
+        else:
+            columns.append(cells)
+            formats.append(None)
+    return columns, formats
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """Read-only table over per-column sequences (lists or numpy arrays).
+
+    Views receive rows in batches of ``FETCH_BATCH`` as they scroll. ``Qt.UserRole``
+    returns the raw cell value for sorting and filtering. With a key column, rows
+    can be replaced or appended one at a time for live updates.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers: List[str] = []
+        self.columns: List[Sequence] = []
+        self.formats: List[Optional[str]] = []
+        self.row_foreground: Optional[Callable[[int], Optional[QColor]]] = None
+        self._row_count = 0
+        self._loaded = 0
+        self._key_column: Optional[int] = None
+        self._keys: Dict[object, int] = {}
+
+    def set_columns(self, headers, columns, formats=None, key_column=None):
+        self.beginResetModel()
+        self.headers = list(headers)
+        self.columns = list(columns)
+        self.formats = list(formats) if formats is not None else [None] * len(self.headers)
+        self._row_count = len(self.columns[0]) if self.columns else 0
+        self._loaded = min(self._row_count, FETCH_BATCH)
+        self._key_column = key_column
+        self._keys = {}
+        if key_column is not None:
+            self._keys = {self.raw(row, key_column): row for row in range(self._row_count)}
+        self.endResetModel()
+
+    def clear(self):
+        self.set_columns([], [])
+
+    def upsert(self, values: Sequence[object]) -> int:
+        """Replace the row whose key matches ``values`` or append it; returns its row."""
+        key = values[self._key_column]
+        row = self._keys.get(key)
+        if row is not None:
+            for column, value in enumerate(values):
+                self.columns[column][row] = value
+            if row < self._loaded:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+            return row
+
+        row = self._row_count
+        visible = self._loaded == self._row_count
+        if visible:
+            self.beginInsertRows(QModelIndex(), row, row)
+        for column, value in enumerate(values):
+            self.columns[column].append(value)
+        self._row_count += 1
+        self._keys[key] = row
+        if visible:
+            self._loaded += 1
+            self.endInsertRows()
+        return row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._row_count
+
+    def fetchMore(self, parent=QModelIndex(), count=FETCH_BATCH):
+        count = min(count, self._row_count - self._loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def fetch_all(self):
+        self.fetchMore(QModelIndex(), self._row_count - self._loaded)
+
+    def raw(self, row: int, column: int) -> object:
+        value = self.columns[column][row]
+        return value.item() if hasattr(value, 'item') else value
+
+    def text(self, row: int, column: int) -> str:
+        value = self.raw(row, column)
+        if value is None:
+            return ""
+        spec = self.formats[column]
+        if spec and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return format(value, spec)
+        return str(value)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.text(index.row(), index.column())
+        if role == Qt.UserRole:
+            return self.raw(index.row(), index.column())
+        if role == Qt.ForegroundRole and self.row_foreground is not None:
+            return self.row_foreground(index.row())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.headers):
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def column_index(self, name: str) -> Optional[int]:
+        """Column by header, or by header up to its unit, e.g. ``pseudo_eye`` for ``pseudo_eye(V*ps)``."""
+        wanted = name.strip().lower()
+        for column, header in enumerate(self.headers):
+            if header.lower() == wanted or header.split('(', 1)[0].strip().lower() == wanted:
+                return column
+        return None
+
+
+class TableFilterProxy(QSortFilterProxyModel):
+    """Sorts a ``ColumnTableModel`` on raw values and filters it by expression.
+
+    An expression is clauses joined by ``and``, each ``<column> <op> <value>`` with
+    op one of ``< <= > >= == !=`` or ``~`` (contains), for example
+    ``pseudo_eye < 0 and rx_name ~ DQ``. Text comparisons ignore case, and text
+    without an operator matches any column.
+    Sorting or filtering loads all rows first so it covers the whole table.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.UserRole)
+        self._clauses: List[Clause] = []
+
+    def set_filter_expression(self, text: str) -> None:
+        """Apply ``text``; raises ValueError for an unknown column."""
+        clauses = self.parse_filter(text)
+        if clauses:
+            self.sourceModel().fetch_all()
+        self._clauses = clauses
+        self.invalidateFilter()
+
+    def parse_filter(self, text: str) -> List[Clause]:
+        model = self.sourceModel()
+        clauses: List[Clause] = []
+        for part in _AND_PATTERN.split(text.strip()):
+            part = part.strip()
+            if not part:
+                continue
+            match = _CLAUSE_PATTERN.match(part)
+            if match is None:
+                clauses.append((None, '~', part.lower(), None))
+                continue
+            column = model.column_index(match.group('field'))
+            if column is None:
+                raise ValueError(f"Unknown column {match.group('field').strip()!r}")
+            value = match.group('value').strip().strip('"\'')
+            clauses.append((column, match.group('op'), value, _number(value)))
+        return clauses
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        for column, op, value, number in self._clauses:
+            if column is None:
+                if not any(value in model.text(source_row, index).lower() for index in range(model.columnCount())):
+                    return False
+            elif not self._matches(model.raw(source_row, column), op, value, number):
+                return False
+        return True
+
+    @staticmethod
+    def _matches(raw: object, op: str, value: str, number: Optional[float]) -> bool:
+        if op == '~':
+            return value.lower() in str(raw).lower()
+        left = _number(raw)
+        if number is not None and left is not None:
+            if math.isnan(left):
+                return op == '!='
+            right = number
+        else:
+            left, right = str(raw).lower(), value.lower()
+        if op == '<':
+            return left < right
+        if op == '<=':
+            return left <= right
+        if op == '>':
+            return left > right
+        if op == '>=':
+            return left >= right
+        if op == '==':
+            return left == right
+        return left != right
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        a = model.raw(left.row(), left.column())
+        b = model.raw(right.row(), right.column())
+        a_number, b_number = _number(a), _number(b)
+        if a_number is not None and b_number is not None:
+            # NaN sorts after every number.
+            if math.isnan(a_number) or math.isnan(b_number):
+                return not math.isnan(a_number) and math.isnan(b_number)
+            return a_number < b_number
+        return str(a if a is not None else "") < str(b if b is not None else "")
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column >= 0 and self.sourceModel() is not None:
+            self.sourceModel().fetch_all()
+        super().sort(column, order)
@@ -0,0 +1,465 @@
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sparams import Termination, apply_terminations
+
+MIN_POLE_COUNT = 8
+MAX_POLE_COUNT = 160
+DEFAULT_ITERATIONS = 5
+PASSIVITY_MARGIN = 1e-3
+PASSIVITY_ITERATIONS = 20
+PASSIVITY_WEIGHT = 100.0
+MACROMODEL_REPORT_SUFFIX = '.json'
+_QR_CHUNK = 32
+
+
+@dataclass
+class PoleResidueModel:
+    """Common-pole rational model ``S(s) = sum_k R_k / (s - p_k) + D``.
+
+    Complex poles are stored once with positive imaginary part; their conjugates
+    (with conjugated residues) are implied.
+    """
+
+    poles: np.ndarray
+    residues: np.ndarray
+    d: np.ndarray
+    z0: np.ndarray
+    rms_error: float = 0.0
+    max_error: float = 0.0
+    passive: bool = True
+    passivity_iterations: int = 0
+    stats: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def nports(self) -> int:
+        return int(self.d.shape[0])
+
+    def evaluate(self, frequency) -> np.ndarray:
+        s = 2j * np.pi * np.asarray(frequency, dtype=float)
+        response = np.broadcast_to(self.d.astype(complex), (s.size,) + self.d.shape).copy()
+        for pole, residue in zip(self.poles, self.residues):
+            response += residue[None] / (s - pole)[:, None, None]
+            if pole.imag > 0:
+                response += np.conj(residue)[None] / (s - np.conj(pole))[:, None, None]
+        return response
+
+
+def _is_complex_pole(pole: complex) -> bool:
+    return abs(pole.imag) > 1e-12 * max(abs(pole), 1.0)
+
+
+def _basis(s: np.ndarray, poles: np.ndarray) -> np.ndarray:
+    columns = []
+    for pole in poles:
+        if _is_complex_pole(pole):
+            columns.append(1.0 / (s - pole) + 1.0 / (s - np.conj(pole)))
+            columns.append(1j / (s - pole) - 1j / (s - np.conj(pole)))
+        else:
+            columns.append(1.0 / (s - pole.real))
+    return np.stack(columns, axis=1)
+
+
+def _state_space(poles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    size = sum(2 if _is_complex_pole(p) else 1 for p in poles)
+    a = np.zeros((size, size))
+    b = np.zeros(size)
+    index = 0
+    for pole in poles:
+        if _is_complex_pole(pole):
+            a[index:index + 2, index:index + 2] = [[pole.real, pole.imag], [-pole.imag, pole.real]]
+            b[index] = 2.0
+            index += 2
+        else:
+            a[index, index] = pole.real
+            b[index] = 1.0
+            index += 1
+    return a, b
+
+
+def _normalize_poles(values: np.ndarray) -> np.ndarray:
+    poles: List[complex] = []
+    for value in values:
+        if _is_complex_pole(value):
+            if value.imag > 0:
+                poles.append(complex(-abs(value.real), value.imag))
+        else:
+            poles.append(complex(-abs(value.real), 0.0))
+    return np.asarray(sorted(poles, key=lambda p: (abs(p.imag), p.real)), dtype=complex)
+
+
+def _initial_poles(omega: np.ndarray, count: int) -> np.ndarray:
+    positive = omega[omega > 0]
+    low = positive.min() if positive.size else omega.max() / max(count, 1)
+    betas = np.linspace(low, omega.max(), max(1, count // 2))
+    return np.asarray([complex(-0.01 * beta, beta) for beta in betas])
+
+
+def _relocate_poles(s: np.ndarray, data: np.ndarray, poles: np.ndarray) -> np.ndarray:
+    frequency_count, element_count = data.shape
+    phi = _basis(s, poles)
+    base = np.concatenate([phi, np.ones((frequency_count, 1))], axis=1)
+    columns = base.shape[1]
+    scale = np.linalg.norm(data) / max(frequency_count * math.sqrt(element_count), 1)
+    constraint = np.concatenate([np.zeros(columns), scale * np.real(base.sum(axis=0))])
+
+    blocks = []
+    rhs = []
+    for start in range(0, element_count, _QR_CHUNK):
+        h = data[:, start:start + _QR_CHUNK].T
+        count = h.shape[0]
+        system = np.concatenate(
+            [np.broadcast_to(base, (count,) + base.shape), -h[:, :, None] * base[None]],
+            axis=2,
+        )
+        augmented = np.zeros((count, 2 * frequency_count + 1, 2 * columns + 1))
+        augmented[:, :frequency_count, :2 * columns] = system.real
+        augmented[:, frequency_count:2 * frequency_count, :2 * columns] = system.imag
+        augmented[:, -1, :2 * columns] = constraint
+        augmented[:, -1, -1] = frequency_count * scale
+        r = np.linalg.qr(augmented, mode='r')
+        blocks.append(r[:, columns:2 * columns, columns:2 * columns].reshape(-1, columns))
+        rhs.append(r[:, columns:2 * columns, -1].reshape(-1))
+
+    matrix = np.concatenate(blocks)
+    vector = np.concatenate(rhs)
+    norms = np.linalg.norm(matrix, axis=0)
+    norms[norms == 0] = 1.0
+    solution = np.linalg.lstsq(matrix / norms, vector, rcond=None)[0] / norms
+    c_tilde, d_tilde = solution[:-1], solution[-1]
+    if abs(d_tilde) < 1e-8:
+        d_tilde = math.copysign(1e-8, d_tilde if d_tilde else 1.0)
+
+    a, b = _state_space(poles)
+    zeros = np.linalg.eigvals(a - np.outer(b, c_tilde) / d_tilde)
+    return _normalize_poles(zeros)
+
+
+def _fit_residues(s: np.ndarray, data: np.ndarray, poles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    phi = _basis(s, poles)
+    base = np.concatenate([phi, np.ones((s.size, 1))], axis=1)
+    matrix = np.concatenate([base.real, base.imag])
+    target = np.concatenate([data.real, data.imag])
+    norms = np.linalg.norm(matrix, axis=0)
+    norms[norms == 0] = 1.0
+    coefficients = np.linalg.lstsq(matrix / norms, target, rcond=None)[0] / norms[:, None]
+
+    residues = []
+    index = 0
+    for pole in poles:
+        if _is_complex_pole(pole):
+            residues.append(coefficients[index] + 1j * coefficients[index + 1])
+            index += 2
+        else:
+            residues.append(coefficients[index].astype(complex))
+            index += 1
+    return np.asarray(residues), coefficients[-1]
+
+
+def estimate_pole_count(frequency, s: np.ndarray) -> int:
+    """Pick a pole count from the longest group delay among the significant elements.
+
+    A delay ``tau`` across a band ``f_max`` winds the phase ``tau * f_max`` times and
+    needs roughly two poles per turn.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    flat = np.asarray(s).reshape(frequency.size, -1)
+    magnitude = np.abs(flat).max(axis=0)
+    significant = magnitude >= 0.1 * magnitude.max() if magnitude.size else magnitude
+    if frequency.size < 2 or not np.any(significant):
+        return MIN_POLE_COUNT
+    phase = np.unwrap(np.angle(flat[:, significant]), axis=0)
+    span = frequency[-1] - frequency[0]
+    delay = float(np.max(np.abs(phase[-1] - phase[0]))) / (2 * np.pi * span) if span > 0 else 0.0
+    count = 2 * math.ceil(delay * frequency.max()) + MIN_POLE_COUNT
+    return int(min(MAX_POLE_COUNT, max(MIN_POLE_COUNT, count + count % 2)))
+
+
+def fit_network(
+    frequency,
+    s: np.ndarray,
+    z0=50.0,
+    pole_count: Optional[int] = None,
+    iterations: int = DEFAULT_ITERATIONS,
+) -> PoleResidueModel:
+    """Fit a reciprocal network with relaxed vector fitting and common poles.
+
+    Only the upper triangle is fitted; the lower triangle mirrors it. Passivity is
+    then enforced at all frequencies (see ``enforce_passivity``); check ``passive``.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    s = np.asarray(s, dtype=complex)
+    nports = s.shape[1]
+    if pole_count is None:
+        pole_count = estimate_pole_count(frequency, s)
+    omega_scale = 2 * np.pi * frequency.max()
+    s_norm = 2j * np.pi * frequency / omega_scale
+
+    rows, cols = np.triu_indices(nports)
+    data = s[:, rows, cols]
+    poles = _initial_poles(np.imag(s_norm), pole_count)
+    for _ in range(max(1, iterations)):
+        poles = _relocate_poles(s_norm, data, poles)
+    residues_packed, d_packed = _fit_residues(s_norm, data, poles)
+
+    residues = np.zeros((poles.size, nports, nports), dtype=complex)
+    residues[:, rows, cols] = residues_packed
+    residues[:, cols, rows] = residues_packed
+    d = np.zeros((nports, nports))
+    d[rows, cols] = d_packed
+    d[cols, rows] = d_packed
+
+    model = PoleResidueModel(
+        poles=poles * omega_scale,
+        residues=residues * omega_scale,
+        d=d,
+        z0=np.broadcast_to(np.asarray(z0, dtype=complex), (nports,)).copy(),
+    )
+    peak_gain = enforce_passivity(model, frequency, s)
+    error = np.abs(model.evaluate(frequency) - s)
+    model.rms_error = float(np.sqrt(np.mean(error ** 2)))
+    model.max_error = float(np.max(error))
+    model.stats = {
+        "pole_count": int(sum(2 if _is_complex_pole(p) else 1 for p in model.poles)),
+        "rms_error": model.rms_error,
+        "max_error": model.max_error,
+        "passive": model.passive,
+        "passivity_iterations": model.passivity_iterations,
+        "peak_gain": peak_gain,
+    }
+    return model
+
+
+def _passivity_grid(model: PoleResidueModel, frequency: np.ndarray) -> np.ndarray:
+    """Check frequencies: eight times denser than the fitted band, then geometric beyond it.
+
+    The out-of-band part reaches a hundred times the larger of the top frequency and
+    the fastest pole, past which the response has settled towards D, and includes
+    every pole's resonance frequency.
+    """
+    top = float(frequency.max())
+    dense = np.linspace(0.0, top, max(8 * frequency.size, 400))
+    fastest = float(np.max(np.abs(model.poles))) / (2 * np.pi) if model.poles.size else top
+    beyond = np.geomspace(top, 100.0 * max(top, fastest), 800)[1:]
+    resonances = np.abs(model.poles.imag) / (2 * np.pi)
+    return np.unique(np.concatenate([dense, beyond, resonances]))
+
+
+def _violations(gains: np.ndarray, limit: float) -> np.ndarray:
+    """Indices of the local maxima of ``gains`` that exceed ``limit``."""
+    padded = np.concatenate([[-np.inf], gains, [-np.inf]])
+    peaks = (gains >= padded[:-2]) & (gains >= padded[2:]) & (gains > limit)
+    return np.flatnonzero(peaks)
+
+
+def _clip_d(model: PoleResidueModel, limit: float) -> bool:
+    """Clip the eigenvalues of the symmetric D term to [-limit, limit]; True if D changed."""
+    values, vectors = np.linalg.eigh(model.d)
+    if np.all(np.abs(values) <= limit):
+        return False
+    model.d = (vectors * np.clip(values, -limit, limit)) @ vectors.T
+    return True
+
+
+def _refit_residues(
+    model: PoleResidueModel,
+    frequency: np.ndarray,
+    data: np.ndarray,
+    check: np.ndarray,
+    targets: np.ndarray,
+) -> None:
+    """Refit the residues, with D and the poles fixed, to ``data`` and to ``targets`` at ``check``.
+
+    The target rows are weighted heavily, so the residues meet the passivity targets
+    and then follow the measured data in band as closely as they still can. Every
+    upper-triangle element shares the same basis and is solved in one lstsq.
+    """
+    nports = model.nports
+    rows, cols = np.triu_indices(nports)
+    weight = PASSIVITY_WEIGHT * math.sqrt(max(frequency.size, 1) / max(check.size, 1))
+    basis = np.concatenate([
+        _basis(2j * np.pi * frequency, model.poles),
+        weight * _basis(2j * np.pi * check, model.poles),
+    ])
+    rhs = np.concatenate([data - model.d[None], weight * (targets - model.d[None])])[:, rows, cols]
+    matrix = np.concatenate([basis.real, basis.imag])
+    vector = np.concatenate([rhs.real, rhs.imag])
+    norms = np.linalg.norm(matrix, axis=0)
+    norms[norms == 0] = 1.0
+    coefficients = np.linalg.lstsq(matrix / norms, vector, rcond=None)[0] / norms[:, None]
+
+    index = 0
+    for k, pole in enumerate(model.poles):
+        if _is_complex_pole(pole):
+            packed = coefficients[index] + 1j * coefficients[index + 1]
+            index += 2
+        else:
+            packed = coefficients[index].astype(complex)
+            index += 1
+        model.residues[k, rows, cols] = packed
+        model.residues[k, cols, rows] = packed
+
+
+def enforce_passivity(
+    model: PoleResidueModel,
+    frequency,
+    s: np.ndarray,
+    margin: float = PASSIVITY_MARGIN,
+    iterations: int = PASSIVITY_ITERATIONS,
+) -> float:
+    """Make the largest singular value of ``model`` stay below ``1 - margin`` at all frequencies.
+
+    D (the infinite-frequency limit) is clipped first. Then, for up to ``iterations``
+    rounds, every local singular-value peak above the limit, in band or out of band,
+    joins a set of constraint frequencies where S is asked to be U min(sigma, limit) V^H,
+    and the residues are refitted to the data ``s`` under those constraints (see
+    ``_refit_residues``). Sets ``model.passive`` and returns the largest singular
+    value left on the check grid.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    s = np.asarray(s, dtype=complex)
+    limit = 1.0 - margin
+    grid = _passivity_grid(model, frequency)
+    check = np.empty(0)
+    if _clip_d(model, limit):
+        _refit_residues(model, frequency, s, check, np.empty((0,) + model.d.shape))
+    model.passivity_iterations = 0
+    while True:
+        sigma = np.linalg.svd(model.evaluate(grid), compute_uv=False)[:, 0]
+        peaks = _violations(sigma, limit)
+        if peaks.size == 0 or model.passivity_iterations >= iterations:
+            break
+        check = np.union1d(check, grid[peaks])
+        u, values, vh = np.linalg.svd(model.evaluate(check))
+        # Aim slightly below the limit so neighbouring frequencies follow.
+        targets = (u * np.minimum(values, limit - 0.5 * margin)[:, None, :]) @ vh
+        _refit_residues(model, frequency, s, check, targets)
+        model.passivity_iterations += 1
+    worst = float(sigma.max())
+    model.passive = worst <= limit
+    return worst
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.10e}"
+
+
+def subcircuit_lines(model: PoleResidueModel, name: str) -> List[str]:
+    """Realise ``model`` as a SPICE subcircuit built from R, C, V, E, F and G elements.
+
+    Each port uses incident/reflected wave nodes ``a`` and ``b`` (unit resistors),
+    with V = Z0*I + 2*sqrt(Z0)*b. States are one pole-bank per input column,
+    time-scaled by the largest pole magnitude so element values stay near unity.
+    """
+    nports = model.nports
+    tau = 1.0 / max(float(np.max(np.abs(model.poles))), 1.0)
+    pins = ' '.join(f'p{i + 1}' for i in range(nports))
+    lines = [f'.subckt {name} {pins}']
+
+    for j in range(nports):
+        port = j + 1
+        z0 = float(np.real(model.z0[j]))
+        root = math.sqrt(z0)
+        lines.extend([
+            f'Vs{port} p{port} pi{port} 0',
+            f'Rz{port} pi{port} xb{port} {_fmt(z0)}',
+            f'Eb{port} xb{port} 0 nb{port} 0 {_fmt(2 * root)}',
+            f'Ra{port} na{port} 0 1',
+            f'Gav{port} 0 na{port} p{port} 0 {_fmt(1 / (2 * root))}',
+            f'Fai{port} 0 na{port} Vs{port} {_fmt(root / 2)}',
+            f'Rb{port} nb{port} 0 1',
+        ])
+
+    for j in range(nports):
+        col = j + 1
+        for k, pole in enumerate(model.poles):
+            sigma = pole.real
+            if _is_complex_pole(pole):
+                omega = pole.imag
+                x1 = f'x{col}_{k}a'
+                x2 = f'x{col}_{k}b'
+                lines.extend([
+                    f'C{x1} {x1} 0 {_fmt(tau)}',
+                    f'R{x1} {x1} 0 {_fmt(-1 / (sigma * tau))}',
+                    f'G{x1}c 0 {x1} {x2} 0 {_fmt(omega * tau)}',
+                    f'G{x1}i 0 {x1} na{col} 0 {_fmt(2 * tau)}',
+                    f'C{x2} {x2} 0 {_fmt(tau)}',
+                    f'R{x2} {x2} 0 {_fmt(-1 / (sigma * tau))}',
+                    f'G{x2}c 0 {x2} {x1} 0 {_fmt(-omega * tau)}',
+                ])
+            else:
+                x1 = f'x{col}_{k}'
+                lines.extend([
+                    f'C{x1} {x1} 0 {_fmt(tau)}',
+                    f'R{x1} {x1} 0 {_fmt(-1 / (sigma * tau))}',
+                    f'G{x1}i 0 {x1} na{col} 0 {_fmt(tau)}',
+                ])
+
+    for i in range(nports):
+        row = i + 1
+        for j in range(nports):
+            col = j + 1
+            if model.d[i, j]:
+                lines.append(f'Gd{row}_{col} 0 nb{row} na{col} 0 {_fmt(model.d[i, j])}')
+            for k, pole in enumerate(model.poles):
+                residue = model.residues[k, i, j]
+                if _is_complex_pole(pole):
+                    lines.append(f'Gr{row}_{col}_{k}a 0 nb{row} x{col}_{k}a 0 {_fmt(residue.real)}')
+                    lines.append(f'Gr{row}_{col}_{k}b 0 nb{row} x{col}_{k}b 0 {_fmt(residue.imag)}')
+                else:
+                    lines.append(f'Gr{row}_{col}_{k} 0 nb{row} x{col}_{k} 0 {_fmt(residue.real)}')
+
+    lines.append(f'.ends {name}')
+    return lines
+
+
+def macromodel_report_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + MACROMODEL_REPORT_SUFFIX)
+
+
+def load_macromodel_report(path: str | Path) -> Optional[Dict[str, object]]:
+    report_path = macromodel_report_path(path)
+    if not report_path.exists():
+        return None
+    try:
+        with report_path.open('r', encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_macromodel(
+    path: str | Path,
+    frequency,
+    s: np.ndarray,
+    z0,
+    name: str,
+    pole_count: Optional[int] = None,
+    iterations: int = DEFAULT_ITERATIONS,
+    terminations: Optional[List[Termination]] = None,
+) -> Dict[str, object]:
+    """Fit ``s`` and write the subcircuit plus a JSON report of the fitting error.
+
+    A model that is still not passive after enforcement is not written; the report
+    records ``"passive": false`` so callers fall back to the tabulated network.
+    """
+    path = Path(path)
+    s, z0 = apply_terminations(frequency, s, z0, terminations)
+    model = fit_network(frequency, s, z0, pole_count=pole_count, iterations=iterations)
+    report = dict(model.stats)
+    report["subcircuit"] = name
+    with macromodel_report_path(path).open('w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    if not model.passive:
+        return report
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text('\n'.join(subcircuit_lines(model, name)) + '\n', encoding='ascii')
+    os.replace(tmp_path, path)
+    return report
@@ -0,0 +1,116 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from downsample import level_of_detail
+from results_archive import ResultsArchive
+
+try:  # pragma: no cover - optional dependency for plotting
+    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg, NavigationToolbar2QT
+    from matplotlib.figure import Figure
+except ImportError:  # pragma: no cover - the viewer shows a hint instead
+    FigureCanvasQTAgg = None
+
+MAX_AGGRESSOR_TRACES = 16
+
+
+class WaveformViewer(QWidget):
+    """Primary and aggressor waveforms of one victim, read lazily from a results archive.
+
+    Only the selected victim's waveforms are decompressed. Traces are reduced to the
+    axis width in pixels, with LTTB for the primary and min-max for aggressors so
+    crosstalk peaks survive, and reduced again whenever the view is zoomed or panned.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.title = QLabel("Select a result row to view its waveforms.")
+        layout.addWidget(self.title)
+        self._archive: Optional[ResultsArchive] = None
+        self._traces: List[Tuple[object, np.ndarray, np.ndarray, str]] = []
+        if FigureCanvasQTAgg is None:
+            self.canvas = None
+            self.title.setText("Install matplotlib to view waveforms.")
+            return
+        self.figure = Figure()
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        layout.addWidget(NavigationToolbar2QT(self.canvas, self))
+        layout.addWidget(self.canvas)
+        self.axes = self.figure.add_subplot()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def show_message(self, text: str) -> None:
+        self.title.setText(text)
+        if self.canvas is not None:
+            self._traces = []
+            self.axes.clear()
+            self.canvas.draw_idle()
+
+    def open_archive(self, path: str) -> ResultsArchive:
+        if self._archive is None or str(self._archive.path) != str(path):
+            self.close_archive()
+            self._archive = ResultsArchive(path)
+        return self._archive
+
+    def close_archive(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def show_victim(self, archive_path: str, rx_name: str, tx_name: str) -> None:
+        """Plot the response at ``rx_name`` to its primary ``tx_name`` and its strongest aggressors."""
+        if self.canvas is None:
+            return
+        archive = self.open_archive(archive_path)
+        sources = dict(archive.sources(rx_name))
+        if tx_name not in sources:
+            raise KeyError(f"No waveform for rx {rx_name!r} and tx {tx_name!r}")
+        primary = archive.waveform(rx_name, tx_name)
+        aggressors = [(peak, source) for source, peak in sources.items() if source != tx_name]
+        if any(np.isnan(peak) for peak, _ in aggressors):
+            # Archives without stored peaks: measure them, which reads every aggressor.
+            aggressors = [(float(np.max(np.abs(archive.waveform(rx_name, source)[1]), initial=0.0)), source)
+                          for _, source in aggressors]
+        aggressors.sort(key=lambda item: -item[0])
+        shown = [(source, *archive.waveform(rx_name, source)) for _, source in aggressors[:MAX_AGGRESSOR_TRACES]]
+
+        self.axes.clear()
+        self._traces = []
+        for source, time, voltage in reversed(shown):
+            line, = self.axes.plot([], [], linewidth=0.8, alpha=0.7, label=source)
+            self._traces.append((line, time, voltage, 'minmax'))
+        line, = self.axes.plot([], [], color='black', linewidth=1.6, label=f"{tx_name} (primary)")
+        self._traces.append((line, primary[0], primary[1], 'lttb'))
+
+        times = [trace[1] for trace in self._traces if len(trace[1])]
+        volts = [trace[2] for trace in self._traces if len(trace[2])]
+        if times:
+            self.axes.set_xlim(min(t[0] for t in times), max(t[-1] for t in times))
+            low, high = min(float(v.min()) for v in volts), max(float(v.max()) for v in volts)
+            margin = 0.05 * (high - low) or 0.1
+            self.axes.set_ylim(low - margin, high + margin)
+        self.axes.set_xlabel("time (ps)")
+        self.axes.set_ylabel("voltage (V)")
+        self.axes.grid(True, alpha=0.3)
+        self.axes.legend(loc='upper right', fontsize='small')
+        # clear() replaces the axes callback registry, so reconnect after every plot.
+        self.axes.callbacks.connect('xlim_changed', lambda _axes: self._refresh_timer.start(0))
+        hidden = len(aggressors) - len(shown)
+        suffix = f", {hidden} weaker aggressors hidden" if hidden > 0 else ""
+        self.title.setText(f"{rx_name}: primary {tx_name}, {len(shown)} aggressors{suffix}")
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-reduce every trace to the current x range and axis width."""
+        if self.canvas is None or not self._traces:
+            return
+        lo, hi = self.axes.get_xlim()
+        pixels = max(int(self.axes.bbox.width), 100)
+        for line, time, voltage, method in self._traces:
+            line.set_data(*level_of_detail(time, voltage, lo, hi, pixels, method))
+        self.canvas.draw_idle()
@@ -0,0 +1,115 @@
+"""A small controller/DRAM design and a simulator stand-in for CCT runs without AEDT."""
+import json
+import re
+import threading
+
+import numpy as np
+import pytest
+
+from sim_backend import _expand_includes
+from sparams import parse_spice_value
+
+NETS = ('DQ0', 'DQ1', 'DQ2', 'CLK_P', 'CLK_N')
+_RESISTOR_PATTERN = re.compile(r'^R\S*\s+(\S+)\s+(\S+)\s+(\S+)', re.MULTILINE)
+
+
+class FakeBackend:
+    """Deterministic waveforms per net number, so recorded and replayed runs can be compared.
+
+    Each net's amplitude scales with the resistors attached to it, so TX/RX corners
+    change the results. With ``fail_on`` the N-th ``run`` (1-based) raises RuntimeError.
+    """
+
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def prepare(self, tstep, tstop):
+        pass
+
+    def run(self, netlist):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.threads.add(threading.current_thread().name)
+        if call == self.fail_on:
+            raise RuntimeError(f"simulation {call} failed")
+        text = _expand_includes(netlist)
+        nets = sorted({int(number) for number in re.findall(r'\bnet_(\d+)', text)})
+        sources = {int(number) for number in re.findall(r'^V(\d+)', text, re.MULTILINE)}
+        loads = {number: 0.0 for number in nets}
+        for first, second, value in _RESISTOR_PATTERN.findall(text):
+            for node in (first, second):
+                if node.startswith('net_') and int(node[4:]) in loads:
+                    loads[int(node[4:])] += parse_spice_value(value)
+        time = np.linspace(0.0, 2000.0, 400)
+        return {
+            number: (
+                time.tolist(),
+                (np.exp(-((time - 300 - 10 * number) / 80) ** 2)
+                 * (0.5 if number in sources else 0.05 * number) * (1.0 + loads[number] / 50.0)).tolist(),
+            )
+            for number in nets
+        }
+
+    def close(self):
+        pass
+
+
+def write_design(directory, scale=1.0):
+    """Controller U1 and DRAM U2 joined by lossy lines with weak coupling; returns (snp, ports.json).
+
+    ``scale`` multiplies the whole S-matrix, giving a different board under the same file names.
+    """
+    rf = pytest.importorskip('skrf')
+    directory.mkdir(parents=True)
+    ports = []
+    for role, component in (('controller', 'U1'), ('dram', 'U2')):
+        for net in NETS:
+            sequence = len(ports) + 1
+            differential = net.startswith('CLK')
+            ports.append({
+                'sequence': sequence,
+                'name': f'{sequence}_{component}_{net}',
+                'component': component,
+                'component_role': role,
+                'net': net,
+                'net_type': 'differential' if differential else 'single',
+                'pair': 'CLK' if differential else None,
+                'polarity': ('positive' if net.endswith('P') else 'negative') if differential else None,
+            })
+    count = len(NETS)
+    frequency = np.linspace(0.0, 2e10, 201)
+    delay = np.exp(-2j * np.pi * frequency * 1e-9)
+    s = np.zeros((frequency.size, 2 * count, 2 * count), dtype=complex)
+    for i in range(count):
+        s[:, i, i + count] = s[:, i + count, i] = 0.8 * np.exp(-frequency / 4e10) * delay
+        s[:, i, i] = s[:, i + count, i + count] = 0.1 * (frequency / 2e10) * np.exp(-2j * np.pi * frequency * 1e-10)
+        for j in range(count):
+            if j != i:
+                coupling = 0.02 / abs(i - j) ** 2 * (frequency / 2e10)
+                s[:, i, j + count] = s[:, j + count, i] = coupling * delay
+                s[:, i, j] = s[:, j, i] = 0.5 * coupling
+    s[0] = s[0].real
+    s *= scale
+    network = rf.Network(frequency=rf.Frequency.from_f(frequency, unit='hz'), s=s, z0=50)
+    network.write_touchstone(str(directory / 'pcb'))
+    (directory / 'ports.json').write_text(json.dumps({
+        'reference_net': 'GND',
+        'controller_components': ['U1'],
+        'dram_components': ['U2'],
+        'ports': ports,
+    }), encoding='utf-8')
+    return directory / 'pcb.s10p', directory / 'ports.json'
+
+
+def make_cct(snp, ports, workdir, backend, **options):
+    """CCT with the usual DDR drive settings; ``options`` go to the constructor."""
+    from cct import CCT
+
+    cct = CCT(snp, ports, workdir=workdir, backend=backend, **options)
+    cct.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+    cct.set_rxs(res_rx='30ohm', cap_rx='1.8pF')
+    return cct
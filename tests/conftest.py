@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# The modules under src/ import each other as top-level modules.
+SRC_DIR = Path(__file__).resolve().parents[1] / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+@pytest.fixture
+def reciprocal_network():
+    """Factory of random reciprocal networks shaped like scikit-rf's (f, s, z0 of shape (F, N), nports).
+
+    With ``gain`` every frequency point is scaled to that largest singular value, which
+    keeps the network passive and I - S invertible.
+    """
+
+    def make(nports, points=7, seed=0, z0=50.0, gain=None):
+        rng = np.random.default_rng(seed)
+        s = 0.3 * (rng.normal(size=(points, nports, nports)) + 1j * rng.normal(size=(points, nports, nports)))
+        s = (s + np.swapaxes(s, 1, 2)) / 2
+        if gain is not None:
+            s *= gain / np.linalg.svd(s, compute_uv=False).max(axis=1)[:, None, None]
+        return SimpleNamespace(
+            f=np.linspace(0.0, 1e10, points),
+            s=s,
+            z0=np.full((points, nports), z0, dtype=complex),
+            nports=nports,
+        )
+
+    return make
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bounds import SourceGroup, pulse_spectrum, source_transfer, waveform_bounds
+
+NPORTS = 6
+SOURCE_RESISTANCE = 40.0
+
+
+def _admittance(points, seed=2):
+    rng = np.random.default_rng(seed)
+    return 1.0 / rng.uniform(20.0, 80.0, size=(points, NPORTS)) + 1j * rng.uniform(0.0, 0.05, size=(points, NPORTS))
+
+
+def _direct(network, admittance, group):
+    """Reference: one full nodal solve per frequency with the TX load replaced by its source."""
+    zh = np.sqrt(50.0)
+    eye = np.eye(NPORTS)
+    ports = list(group.port_indices)
+    voltages = np.empty((network.s.shape[0], NPORTS), dtype=complex)
+    for k, s in enumerate(network.s):
+        y = admittance[k].copy()
+        y[ports] = 1.0 / SOURCE_RESISTANCE
+        system = (eye - s) / zh + np.diag(y * zh) @ (eye + s)
+        current = np.zeros(NPORTS)
+        current[ports] = np.asarray(group.amplitudes) / SOURCE_RESISTANCE
+        voltages[k] = zh * (eye + s) @ np.linalg.solve(system, current)
+    return voltages
+
+
+def test_source_transfer_matches_direct_solve(reciprocal_network):
+    network = reciprocal_network(NPORTS, points=12, seed=1, gain=0.9)
+    admittance = _admittance(12)
+    sources = [
+        SourceGroup((0,), (1.0,)),
+        SourceGroup((2, 3), (0.5, -0.5)),
+        SourceGroup((5,), (1.0,)),
+        SourceGroup((1, 4), (0.5, -0.5)),
+    ]
+    transfer = source_transfer(network, np.arange(12), admittance, SOURCE_RESISTANCE, sources, range(NPORTS))
+    assert transfer.shape == (12, NPORTS, len(sources))
+    for position, group in enumerate(sources):
+        np.testing.assert_allclose(transfer[:, :, position], _direct(network, admittance, group), atol=1e-12)
+
+
+def test_source_transfer_honours_frequency_index_and_observed_ports(reciprocal_network):
+    network = reciprocal_network(NPORTS, points=80, seed=1, gain=0.9)
+    admittance = _admittance(80)
+    index = np.arange(1, 80, 2)
+    sources = [SourceGroup((2, 3), (0.5, -0.5))]
+    transfer = source_transfer(network, index, admittance[index], SOURCE_RESISTANCE, sources, [4, 0])
+    expected = _direct(SimpleNamespace(s=network.s[index], z0=network.z0[index]), admittance[index], sources[0])
+    np.testing.assert_allclose(transfer[:, :, 0], expected[:, [4, 0]], atol=1e-12)
+
+
+def test_pulse_spectrum_dc_is_pulse_area():
+    assert pulse_spectrum([0.0], 0.8, 30e-12, 133e-12)[0] == pytest.approx(0.8 * 163e-12)
+
+
+@pytest.mark.parametrize('ui', [50e-12, 133e-12, 400e-12])
+def test_waveform_bounds_bracket_time_domain_integrals(ui):
+    dt = 0.25e-12
+    window = 4e-9
+    time = np.arange(0.0, window, dt)
+    y = np.exp(-((time - 400e-12) / 60e-12) ** 2) - 0.3 * np.exp(-((time - 700e-12) / 120e-12) ** 2)
+    frequency = np.fft.rfftfreq(time.size, dt)
+    spectrum = np.abs(np.fft.rfft(y) * dt)[:, None]
+    bounds = {name: value[0] for name, value in waveform_bounds(frequency, spectrum, ui, window).items()}
+
+    abs_integral = np.sum(np.abs(y)) * dt * 1e12
+    width = int(round(ui / dt))
+    cumulative = np.concatenate([[0.0], np.cumsum(y)]) * dt * 1e12
+    gated = np.abs(cumulative[width:] - cumulative[:-width])
+    slack = 1e-3 * abs_integral
+    assert bounds["abs_lower"] - slack <= abs_integral <= bounds["abs_upper"] + slack
+    assert bounds["window_lower"] - slack <= gated.max() <= bounds["window_upper"] + slack
+    assert gated.max() <= bounds["window_abs_upper"] + slack
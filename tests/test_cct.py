@@ -0,0 +1,208 @@
+import itertools
+import threading
+
+import numpy as np
+import pytest
+
+from cct_fakes import FakeBackend, make_cct, write_design
+from results_archive import ResultsArchive, metric_columns
+
+
+@pytest.fixture
+def design(tmp_path):
+    return write_design(tmp_path / 'data')
+
+
+def _files(*roots):
+    return {path for root in roots for path in root.rglob('*') if path.is_file()}
+
+
+def test_calculate_returns_metrics_without_writing(tmp_path, design, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cct = make_cct(*design, tmp_path / 'work', FakeBackend())
+    cct.run()
+    before = _files(tmp_path)
+    metrics = cct.calculate()
+    assert _files(tmp_path) == before
+
+    assert isinstance(metrics, np.recarray)
+    expected = ['tx_name', 'rx_name'] + [field for field, _, _ in metric_columns(cct.ber_levels)]
+    assert list(metrics.dtype.names) == expected
+    assert metrics.dtype['tx_name'].kind == metrics.dtype['rx_name'].kind == 'U'
+    assert all(metrics.dtype[field] == np.float64 for field in expected[2:])
+    assert dict(zip(metrics.rx_name, metrics.tx_name)) == {rx.label: rx.expected_tx.label for rx in cct.rxs}
+    assert np.all(metrics.sig > 0) and np.all(np.isfinite(metrics.pseudo_eye))
+    np.testing.assert_allclose(metrics.pseudo_eye, metrics.sig - metrics.isi - metrics.xtalk)
+
+
+def test_calculate_with_output_path_writes_the_same_metrics(tmp_path, design):
+    cct = make_cct(*design, tmp_path / 'work', FakeBackend())
+    cct.run()
+    output = tmp_path / 'out' / 'calc.csv'
+    metrics = cct.calculate(output)
+    assert output.exists() and output.with_suffix('.npz').exists()
+    assert len(output.read_text().splitlines()) == 1 + len(metrics)
+    with ResultsArchive(output.with_suffix('.npz')) as archive:
+        np.testing.assert_array_equal(archive.metrics, metrics.view(np.ndarray))
+
+
+def _run_with_timeout(cct, timeout=30.0):
+    """Run ``cct.run()`` in a thread; returns the exception it raised (None on success)."""
+    outcome = {}
+
+    def target():
+        try:
+            cct.run()
+        except BaseException as exc:
+            outcome['error'] = exc
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "run() deadlocked"
+    assert not [t for t in threading.enumerate() if t.name in ('cct-netlist', 'cct-waveforms')]
+    return outcome.get('error')
+
+
+def _fail_on_call(method, call):
+    count = itertools.count(1)
+
+    def wrapper(*args, **kwargs):
+        if next(count) == call:
+            raise ValueError(f"{method.__name__} failed")
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+@pytest.mark.parametrize('fail_on', [1, 2, 4])
+def test_simulator_error_stops_the_pipeline(tmp_path, design, fail_on):
+    backend = FakeBackend(fail_on=fail_on)
+    cct = make_cct(*design, tmp_path / 'work', backend)
+    error = _run_with_timeout(cct)
+    assert isinstance(error, RuntimeError) and str(error) == f"simulation {fail_on} failed"
+    assert backend.calls == fail_on
+    # The backend is only driven from the thread that called run().
+    assert len(backend.threads) == 1 and not backend.threads & {'cct-netlist', 'cct-waveforms'}
+
+
+@pytest.mark.parametrize('stage, call', [('_build_netlist', 1), ('_build_netlist', 3), ('_store_waveforms', 1), ('_store_waveforms', 3)])
+def test_preparation_and_storage_errors_stop_the_pipeline(tmp_path, design, stage, call):
+    backend = FakeBackend()
+    cct = make_cct(*design, tmp_path / 'work', backend)
+    setattr(cct, stage, _fail_on_call(getattr(cct, stage), call))
+    error = _run_with_timeout(cct)
+    assert isinstance(error, ValueError) and stage in str(error)
+    assert backend.calls <= len(cct.txs)
+    if stage == '_build_netlist':
+        assert backend.calls == call - 1
+
+
+CORNERS = [
+    {'name': 'nominal'},
+    {'name': 'strong', 'res_tx': '20ohm', 'res_rx': '60ohm'},
+    {'res_rx': '120ohm', 'vhigh': '1.2V'},
+]
+
+
+def _corner_settings(cct, corner):
+    tx = {key: corner.get(key, value) for key, value in cct.tx_config.items()}
+    rx = {key: corner.get(key, value) for key, value in cct.rx_config.items()}
+    return tx, rx
+
+
+def test_sweep_matches_separate_runs_per_corner(tmp_path, design):
+    cct = make_cct(*design, tmp_path / 'work', FakeBackend())
+    base_tx, base_rx = dict(cct.tx_config), dict(cct.rx_config)
+    base_txs, base_rxs = list(cct.txs), list(cct.rxs)
+    output = tmp_path / 'out' / 'sweep.csv'
+    tables = cct.sweep(CORNERS, output)
+    assert len(tables) == len(CORNERS)
+
+    # The corner copies leave the swept CCT untouched.
+    assert cct.tx_config == base_tx and cct.rx_config == base_rx
+    assert cct.txs == base_txs and cct.rxs == base_rxs
+    assert all(not rx.waveforms for rx in cct.rxs)
+
+    for corner, table in zip(CORNERS, tables):
+        tx, rx = _corner_settings(cct, corner)
+        single = make_cct(*design, tmp_path / 'single', FakeBackend())
+        single.set_txs(**tx)
+        single.set_rxs(**rx)
+        single.run()
+        expected = single.calculate()
+        np.testing.assert_array_equal(table[['tx_name', 'rx_name']], expected[['tx_name', 'rx_name']])
+        for field in ('sig', 'isi', 'xtalk', 'pseudo_eye', 'power_ratio'):
+            np.testing.assert_allclose(table[field], expected[field])
+    # The fake simulator scales with the terminations, so corners must differ.
+    assert not np.allclose(tables[0].sig, tables[1].sig)
+    assert not np.allclose(tables[1].sig, tables[2].sig)
+
+    settings = list(cct.tx_config) + list(cct.rx_config)
+    names = ['nominal', 'strong', 'corner_2']
+    lines = output.read_text().splitlines()
+    assert lines[0].split(', ')[:len(settings) + 3] == ['corner'] + settings + ['tx_name', 'rx_name']
+    rows = [line.split(', ') for line in lines[1:]]
+    assert len(rows) == sum(len(table) for table in tables)
+    start = 0
+    for name, corner, table in zip(names, CORNERS, tables):
+        tx, rx = _corner_settings(cct, corner)
+        block = rows[start:start + len(table)]
+        start += len(table)
+        assert all(row[:len(settings) + 1] == [name] + [str({**tx, **rx}[key]) for key in settings] for row in block)
+        assert [row[len(settings) + 2] for row in block] == list(table.rx_name)
+        sig_column = len(settings) + 3
+        np.testing.assert_allclose([float(row[sig_column]) for row in block], table.sig, atol=5e-4)
+
+    worst = [line.split(', ') for line in output.with_name('sweep_worst.csv').read_text().splitlines()]
+    assert worst[0][len(settings) + 1:] == [
+        'worst_pseudo_eye(V*ps)', 'pseudo_eye_victim', 'worst_eye_height(V)', 'eye_height_victim', 'min_power_ratio',
+    ]
+    assert [row[0] for row in worst[1:]] == names
+    for row, table in zip(worst[1:], tables):
+        eye, height = np.argmin(table.pseudo_eye), np.argmin(table.eye_height)
+        assert row[len(settings) + 1:] == [
+            f"{table.pseudo_eye[eye]:.3f}", table.rx_name[eye],
+            f"{table.eye_height[height]:.4f}", table.rx_name[height], f"{table.power_ratio.min():.3f}",
+        ]
+
+
+def test_sweep_rejects_unknown_corner_settings(tmp_path, design):
+    backend = FakeBackend()
+    cct = make_cct(*design, tmp_path / 'work', backend)
+    with pytest.raises(ValueError, match="'res_load'"):
+        cct.sweep([{'name': 'ok'}, {'res_load': '50ohm'}], tmp_path / 'sweep.csv')
+    assert backend.calls == 0 and not (tmp_path / 'sweep.csv').exists()
+
+
+@pytest.mark.parametrize('options', [{}, {'threshold_db': -30}])
+def test_victim_events_bound_and_match_the_final_metrics(tmp_path, design, options):
+    events = []
+    cct = make_cct(*design, tmp_path / 'work', FakeBackend(), **options)
+    cct.progress = events.append
+    cct.run()
+    metrics = cct.calculate()
+    expected = {row.rx_name: row for row in metrics}
+
+    victims = [event for event in events if event['event'] == 'victim']
+    assert {event['rx'] for event in victims} == set(expected)
+    # Without a threshold every TX reaches every victim, so aggressors arrive after the primary.
+    assert any(event['state'] == 'partial' for event in victims) == (not options)
+    for rx_name, row in expected.items():
+        updates = [event for event in victims if event['rx'] == rx_name]
+        assert [event['state'] for event in updates] == ['partial'] * (len(updates) - 1) + ['final']
+        final = updates[-1]
+        assert final['tx'] == row.tx_name
+        # Statistical eyes are computed over all victims in calculate(), not per event.
+        assert set(final['metrics']) == {field for field in metrics.dtype.names[2:] if not field.startswith('stat_eye')}
+        for field in final['metrics']:
+            value = float(row[field])
+            if np.isfinite(value):
+                assert final['metrics'][field] == pytest.approx(value, rel=1e-12, abs=1e-12), field
+            else:
+                assert final['metrics'][field] is None, field
+        xtalk = [event['metrics']['xtalk'] for event in updates]
+        assert xtalk == sorted(xtalk)
+        for event in updates[:-1]:
+            assert 'eye_height' not in event['metrics']
+            assert event['metrics']['pseudo_eye'] >= final['metrics']['pseudo_eye'] - 1e-9
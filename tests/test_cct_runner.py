@@ -0,0 +1,57 @@
+import argparse
+import json
+
+import cct_runner
+from cct import DEFAULT_CIRCUIT_VERSION
+from cct_fakes import FakeBackend, write_design
+
+SETTINGS = {
+    'tx': {'vhigh': '0.8V', 't_rise': '30ps', 'ui': '133ps', 'res_tx': '40ohm', 'cap_tx': '1pF'},
+    'rx': {'res_rx': '30ohm', 'cap_rx': '1.8pF'},
+    'run': {'tstep': '100ps', 'tstop': '3ns'},
+}
+
+
+class VersionedBackend(FakeBackend):
+    def __init__(self, version):
+        super().__init__()
+        self.version = version
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+def test_batch_opens_one_session_per_circuit_version(tmp_path, monkeypatch, capsys):
+    snp, ports = write_design(tmp_path / 'data')
+    opened = []
+
+    def create_backend(args, workdir, version):
+        opened.append(VersionedBackend(version))
+        return opened[-1]
+
+    monkeypatch.setattr(cct_runner, '_create_backend', create_backend)
+    versions = ['2024.2', None, '2024.2']
+    batch = tmp_path / 'jobs.jsonl'
+    batch.write_text('\n'.join(json.dumps({
+        'id': f'job{index}',
+        'touchstone': str(snp),
+        'metadata': str(ports),
+        'output': str(tmp_path / f'out{index}.csv'),
+        'settings': {**SETTINGS, 'options': {'circuit_version': version} if version else {}},
+    }) for index, version in enumerate(versions)), encoding='utf-8')
+    args = argparse.Namespace(batch=str(batch), workdir=tmp_path / 'work', backend='record',
+                              backend_dir=None, concurrency=2)
+
+    assert cct_runner.run_batch(args) == 0
+    lines = capsys.readouterr().out.splitlines()
+    states = [json.loads(line[len('STATUS: '):]) for line in lines if line.startswith('STATUS: ')]
+    assert sorted(status['job'] for status in states if status['state'] == 'finished') == ['job0', 'job1', 'job2']
+    assert lines[-1] == f"FINISHED: {json.dumps({'jobs': 3, 'failed': 0})}"
+
+    # The job without a version runs on the default version, in a session of its own.
+    assert sorted(backend.version for backend in opened) == sorted(['2024.2', DEFAULT_CIRCUIT_VERSION])
+    by_version = {backend.version: backend for backend in opened}
+    assert by_version['2024.2'].calls == 2 * by_version[DEFAULT_CIRCUIT_VERSION].calls > 0
+    assert all(backend.closed == 1 for backend in opened)
+    assert all((tmp_path / f'out{index}.csv').exists() for index in range(len(versions)))
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from downsample import level_of_detail, lttb, min_max, visible_slice
+
+
+def _trace(n=10007, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.0, 5000.0, n)
+    y = np.sin(x / 300.0) + 0.1 * rng.normal(size=n)
+    return x, y
+
+
+def test_visible_slice_includes_one_sample_beyond_each_edge():
+    x = np.arange(10.0)
+    assert visible_slice(x, 2.5, 6.5) == slice(2, 8)
+    assert visible_slice(x, 3.0, 6.0) == slice(2, 8)
+    assert visible_slice(x, -5.0, 50.0) == slice(0, 10)
+
+
+@pytest.mark.parametrize('buckets', [7, 100, 1000])
+def test_min_max_keeps_every_bucket_extreme(buckets):
+    x, y = _trace()
+    keep_x, keep_y = min_max(x, y, buckets)
+    assert keep_x.size <= 2 * buckets + 2
+    assert np.all(np.diff(keep_x) > 0)
+    assert keep_x[0] == x[0] and keep_x[-1] == x[-1]
+    size = -(-x.size // buckets)
+    for start in range(0, x.size, size):
+        bucket = slice(start, start + size)
+        inside = (keep_x >= x[bucket][0]) & (keep_x <= x[bucket][-1])
+        assert keep_y[inside].min() == y[bucket].min()
+        assert keep_y[inside].max() == y[bucket].max()
+
+
+def test_min_max_leaves_short_traces_alone():
+    x, y = _trace(n=50)
+    keep_x, keep_y = min_max(x, y, 25)
+    assert keep_x is x and keep_y is y
+
+
+@pytest.mark.parametrize('points', [3, 10, 500])
+def test_lttb_returns_the_requested_points(points):
+    x, y = _trace()
+    keep_x, keep_y = lttb(x, y, points)
+    assert keep_x.size == keep_y.size == points
+    assert keep_x[0] == x[0] and keep_x[-1] == x[-1]
+    assert np.all(np.diff(keep_x) > 0)
+    picks = np.searchsorted(x, keep_x)
+    np.testing.assert_array_equal(y[picks], keep_y)
+
+
+def test_lttb_keeps_an_isolated_spike():
+    x = np.arange(2000.0)
+    y = np.zeros_like(x)
+    y[1234] = 1.0
+    keep_x, keep_y = lttb(x, y, 40)
+    assert 1234.0 in keep_x and keep_y.max() == 1.0
+
+
+def test_level_of_detail_limits_to_the_visible_range():
+    x, y = _trace()
+    keep_x, _ = level_of_detail(x, y, 1000.0, 2000.0, pixels=50)
+    assert keep_x.size == 100
+    assert keep_x[0] < 1000.0 <= keep_x[1] and keep_x[-2] <= 2000.0 < keep_x[-1]
+    keep_x, keep_y = level_of_detail(x, y, 1000.0, 2000.0, pixels=50, method='minmax')
+    window = (x >= 1000.0) & (x <= 2000.0)
+    assert keep_y.max() >= y[window].max() and keep_y.min() <= y[window].min()
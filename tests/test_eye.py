@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from eye import eye_width, interference_cursors, peak_distortion, statistical_eye
+
+UI = 100.0
+BINS = 1024
+
+
+def _cursors(seed, count=10, phases=8):
+    rng = np.random.default_rng(seed)
+    main = rng.uniform(0.6, 1.0, size=phases)
+    interference = rng.normal(scale=0.08, size=(count, phases))
+    return main, interference
+
+
+def _brute_force(main, interference, ber):
+    """Eye height per phase from every 0/1 pattern of the interfering cursors."""
+    patterns = np.array(list(itertools.product((0.0, 1.0), repeat=interference.shape[0])))
+    sums = np.sort(patterns @ interference, axis=0)
+    probability = np.arange(1, sums.shape[0] + 1) / sums.shape[0]
+    low = sums[np.argmax(probability > ber), np.arange(sums.shape[1])]
+    high = sums[np.argmax(1.0 - probability <= ber), np.arange(sums.shape[1])]
+    return main + low - high
+
+
+def _step(cursors):
+    positive = max(np.clip(amps, 0, None).sum(axis=0).max() for _, amps in cursors)
+    negative = max(np.clip(-amps, 0, None).sum(axis=0).max() for _, amps in cursors)
+    return (positive + negative) / (0.9 * BINS)
+
+
+@pytest.mark.parametrize('ber', [0.2, 0.05, 1e-2])
+def test_statistical_eye_matches_enumeration(ber):
+    cursors = [_cursors(seed) for seed in range(3)]
+    result = statistical_eye(cursors, UI, ber_levels=[ber], bins=BINS)
+    step = _step(cursors)
+    assert result["eye_height"].shape == (3, 1)
+    for victim, (main, interference) in enumerate(cursors):
+        exact = _brute_force(main, interference, ber)
+        # Conservative by at most the amplitude rounding plus a couple of grid steps.
+        residual = np.abs(interference - np.rint(interference / step) * step).sum(axis=0).max()
+        height = result["eye_height"][victim, 0]
+        assert height <= max(exact.max(), 0.0) + 2 * step
+        assert height >= exact.max() - residual - 2 * step
+
+
+def test_statistical_eye_at_tiny_ber_is_peak_distortion():
+    main, interference = _cursors(7)
+    result = statistical_eye([(main, interference)], UI, ber_levels=[1e-12], bins=BINS)
+    victim = np.concatenate([interference[:4], main[None], interference[4:]])
+    worst = peak_distortion(victim, 4, np.zeros((0,) + victim.shape), UI)
+    assert result["eye_height"][0, 0] == pytest.approx(worst["eye_height"], abs=4 * _step([(main, interference)]))
+
+
+def test_statistical_eye_contours_are_probabilities():
+    main, interference = _cursors(3, count=6, phases=4)
+    result = statistical_eye([(main, interference)], UI, ber_levels=[1e-3], bins=256, contours=True)
+    ber = result["ber"]
+    assert ber.shape == (1, 4, result["voltage"].size)
+    assert np.all((ber >= 0.0) & (ber <= 1.0))
+
+
+def test_interference_cursors_split_main_and_aggressors():
+    victim = np.arange(12.0).reshape(4, 3)
+    others = np.ones((2, 4, 3))
+    main, interference = interference_cursors(victim, 1, others)
+    np.testing.assert_array_equal(main, victim[1])
+    assert interference.shape == (3 + 8, 3)
+
+
+def test_eye_width_counts_the_open_region_around_the_best_phase():
+    height = np.array([-1.0, 0.2, 0.5, 0.3, -0.1, 0.9, -0.2, 0.1])
+    assert eye_width(height, UI) == pytest.approx(UI / 8)
+    assert eye_width(np.array([0.1, 0.4, 0.2, -0.1]), UI) == pytest.approx(3 * UI / 4)
+    assert eye_width(np.full(4, -1.0), UI) == 0.0
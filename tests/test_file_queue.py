@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from file_queue import FileQueue, LeaseKeeper
+
+
+def test_concurrent_workers_claim_each_item_once(tmp_path):
+    queue = FileQueue(tmp_path / 'queue')
+    for number in range(40):
+        queue.put(f'job{number:02d}', {'number': number})
+    queue.seal()
+    workers = 8
+    barrier = threading.Barrier(workers)
+    claimed = [[] for _ in range(workers)]
+
+    def work(position):
+        barrier.wait()
+        while True:
+            claim = queue.claim(f'worker{position}')
+            if claim is None:
+                return
+            claimed[position].append(claim.item_id)
+            queue.complete(claim, {'number': claim.payload['number']})
+
+    threads = [threading.Thread(target=work, args=(position,)) for position in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts = Counter(item for items in claimed for item in items)
+    assert sorted(counts) == [f'job{number:02d}' for number in range(40)]
+    assert set(counts.values()) == {1}
+    assert queue.counts() == {'pending': 0, 'claimed': 0, 'done': 40, 'failed': 0}
+    assert queue.drained
+
+
+def test_expired_lease_is_reclaimed_and_renew_fails(tmp_path):
+    queue = FileQueue(tmp_path / 'queue')
+    queue.put('job', {'value': 1})
+    first = queue.claim('slow')
+    assert queue.state('job') == 'claimed'
+    assert queue.claim('other') is None
+    assert queue.reclaim_expired(lease_seconds=60.0) == []
+
+    old = time.time() - 120.0
+    os.utime(first.path, (old, old))
+    assert queue.reclaim_expired(lease_seconds=60.0) == ['job']
+    assert not queue.renew(first)
+    second = queue.claim('fast')
+    assert second.item_id == 'job' and second.payload == {'value': 1}
+    queue.complete(second, {'ok': True})
+    assert queue.record('done', 'job') == {'ok': True, 'worker': 'fast'}
+
+
+def test_expired_claim_of_a_finished_item_is_dropped(tmp_path):
+    queue = FileQueue(tmp_path / 'queue')
+    queue.put('job', {})
+    claim = queue.claim('worker')
+    queue._write_json(queue._path('done', 'job'), {'ok': True})
+    os.utime(claim.path, (0, 0))
+    assert queue.reclaim_expired(lease_seconds=1.0) == []
+    assert queue.counts() == {'pending': 0, 'claimed': 0, 'done': 1, 'failed': 0}
+
+
+def test_put_skips_known_items_and_retries_failed_ones(tmp_path):
+    queue = FileQueue(tmp_path / 'queue')
+    assert queue.put('job', {'attempt': 1})
+    assert not queue.put('job', {'attempt': 2})
+    claim = queue.claim('worker')
+    assert not queue.put('job', {'attempt': 2})
+    queue.fail(claim, 'boom')
+    assert queue.state('job') == 'failed'
+    assert queue.record('failed', 'job') == {'worker': 'worker', 'error': 'boom'}
+    assert queue.put('job', {'attempt': 2})
+    assert queue.claim('worker').payload == {'attempt': 2}
+    with pytest.raises(ValueError):
+        queue.put('bad@id', {})
+
+
+def test_drained_needs_seal(tmp_path):
+    queue = FileQueue(tmp_path / 'queue')
+    assert not queue.drained
+    queue.put('job', {})
+    queue.seal()
+    assert not queue.drained
+    claim = queue.claim('worker')
+    assert not queue.drained
+    queue.complete(claim, {})
+    assert queue.drained
+
+
+def test_lease_keeper_holds_the_claim_and_notices_loss(tmp_path):
+    queue = FileQueue(tmp_path / 'queue')
+    queue.put('job', {})
+    claim = queue.claim('worker')
+    with LeaseKeeper(queue, claim, lease_seconds=0.3) as keeper:
+        time.sleep(0.5)
+        assert queue.reclaim_expired(lease_seconds=0.3) == []
+        claim.path.unlink()
+        time.sleep(0.3)
+    assert keeper.lost
@@ -0,0 +1,56 @@
+import random
+
+from net_index import NetIndex, SelectedNets
+
+
+def _components(seed=1, count=12, nets=60):
+    rng = random.Random(seed)
+    names = [f"N{index}" for index in range(nets)] + ["GND"] * 5
+    return {
+        f"U{component}": [(f"P{pin}", rng.choice(names)) for pin in range(rng.randint(1, 80))]
+        for component in range(count)
+    }
+
+
+def test_net_index_counts_pins_both_ways():
+    components = {"U1": [("1", "A"), ("2", "A"), ("3", "GND")], "U2": [("1", "A"), ("2", "B")]}
+    index = NetIndex(components)
+    assert index.nets("U1") == {"A", "GND"}
+    assert index.nets("U9") == set()
+    assert index.has_net("U2", "B") and not index.has_net("U1", "B")
+    assert index.pin_count("U1", "A") == 2 and index.pin_count("U1", "B") == 0
+    assert index.net_components["A"] == {"U1": 2, "U2": 1}
+
+
+def test_selected_nets_match_a_full_rescan():
+    components = _components()
+    selected = SelectedNets(NetIndex(components))
+    rng = random.Random(2)
+    for _ in range(300):
+        controllers = rng.sample(sorted(components), rng.randint(0, 3))
+        drams = rng.sample(sorted(components), rng.randint(0, 4))
+        selected.select("controller", controllers)
+        selected.select("dram", drams)
+
+        controller_nets = {net for component in controllers for _, net in components[component]}
+        dram_nets = {net for component in drams for _, net in components[component]}
+        common = controller_nets & dram_nets
+        counts = {
+            net: sum(1 for component in controllers + drams for _, pin_net in components[component] if pin_net == net)
+            for net in common
+        }
+        assert selected.common == common
+        assert {net: selected.pin_counts[net] for net in common} == counts
+        assert all(count > 0 for count in selected.pin_counts.values())
+
+
+def test_clearing_the_selection_empties_everything():
+    components = _components(seed=3)
+    selected = SelectedNets(NetIndex(components))
+    selected.select("controller", ["U0", "U1"])
+    selected.select("dram", ["U2", "U3", "U4"])
+    selected.select("controller", [])
+    assert selected.common == set()
+    selected.select("dram", [])
+    assert not selected.pin_counts
+    assert selected.selected == {"controller": set(), "dram": set()}
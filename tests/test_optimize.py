@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from bounds import SourceGroup
+from optimize import (
+    ChannelGroup,
+    OptimizeProblem,
+    _to_unit,
+    pareto_flags,
+    pulse_phasor,
+    pulse_responses,
+    refine_search,
+    victim_metrics,
+)
+from sparams import load_admittance
+
+VALUES = {"res_tx": 40.0, "cap_tx": 1e-12, "res_rx": 60.0, "cap_rx": 1.5e-12}
+VHIGH, T_RISE, UI, TSTOP = 0.8, 30e-12, 133e-12, 2e-9
+
+
+def _line(frequency, zc=45.0, delay=300e-12, z0=50.0):
+    """Slightly mismatched lossless line, as S-parameters against ``z0``."""
+    gl = 2j * np.pi * frequency * delay
+    a = np.cosh(gl)
+    b = zc * np.sinh(gl)
+    c = np.sinh(gl) / zc
+    den = 2 * a + b / z0 + c * z0
+    s = np.empty((frequency.size, 2, 2), dtype=complex)
+    s[:, 0, 0] = s[:, 1, 1] = (b / z0 - c * z0) / den
+    s[:, 0, 1] = s[:, 1, 0] = 2 / den
+    return s
+
+
+def _problem(frequency):
+    group = ChannelGroup(
+        f=frequency,
+        s=_line(frequency),
+        z0=np.full((frequency.size, 2), 50.0),
+        tx_ports=np.array([0]),
+        rx_ports=np.array([1]),
+        sources=[SourceGroup((0,), (1.0,))],
+        tx_columns=[0],
+        observe=[(0, (1,), (1.0,))],
+    )
+    return OptimizeProblem(
+        frequency=frequency, groups=[group], rx_labels=["rx"], tx_labels=["tx"], expected_tx=[0],
+        vhigh=VHIGH, t_rise=T_RISE, ui=UI, tstop=TSTOP, base_values=dict(VALUES), signature="line",
+    )
+
+
+def _direct_waveform(time, points=20001, fmax=5e10):
+    """RX voltage from a nodal solve per frequency and a dense inverse Fourier integral."""
+    frequency = np.linspace(0.0, fmax, points)
+    s = _line(frequency)
+    zh = np.sqrt(50.0)
+    eye = np.eye(2)
+    load = np.stack([
+        np.full(frequency.size, 1.0 / VALUES["res_tx"]),
+        load_admittance(frequency, VALUES["res_rx"], VALUES["cap_rx"], 'shunt'),
+    ], axis=1)
+    system = (eye - s) / zh + load[:, :, None] * zh * (eye + s)
+    drive = np.broadcast_to([[1.0 / VALUES["res_tx"]], [0.0]], (frequency.size, 2, 1))
+    waves = np.linalg.solve(system, drive)[:, :, 0]
+    rx = zh * (waves[:, 1] + np.einsum('fj,fj->f', s[:, 1], waves))
+    spectrum = rx * pulse_phasor(frequency, VHIGH, T_RISE, UI)
+    kernel = np.exp(2j * np.pi * np.outer(time, frequency))
+    return 2.0 * np.trapezoid((kernel * spectrum).real, frequency, axis=1)
+
+
+def test_pulse_responses_match_direct_solve():
+    frequency = np.linspace(0.0, 5e10, 2001)
+    time_ps, voltage, observed = pulse_responses(_problem(frequency), VALUES)
+    assert observed.tolist() == [[True]]
+    assert time_ps[0] == 0.0 and time_ps[-1] == pytest.approx(TSTOP * 1e12)
+    check = np.arange(0, time_ps.size, 7)
+    expected = _direct_waveform(time_ps[check] * 1e-12)
+    # Tolerance: 0.1 mV on a ~0.47 V pulse.
+    np.testing.assert_allclose(voltage[0, 0, check], expected, atol=1e-4)
+    assert np.abs(expected).max() > 0.3
+
+
+def test_victim_metrics_integrate_the_pulse_response():
+    from cct import get_sig_isi
+
+    frequency = np.linspace(0.0, 5e10, 2001)
+    problem = _problem(frequency)
+    time_ps, voltage, observed = pulse_responses(problem, VALUES)
+    metrics = victim_metrics(problem, time_ps, voltage, observed)
+    (victim,) = metrics["victims"]
+    sig, isi = get_sig_isi(time_ps, _direct_waveform(time_ps * 1e-12), UI * 1e12)
+    # Stated tolerance for the metrics against the same integrals of the direct waveform: 0.005 V*ps.
+    assert abs(victim["sig"] - sig) < 0.005
+    assert abs(victim["isi"] - isi) < 0.005
+    assert victim["xtalk"] == 0.0
+    assert metrics["worst_pseudo_eye"] == victim["pseudo_eye"] == victim["sig"] - victim["isi"]
+    assert metrics["worst_pseudo_eye_victim"] == "rx"
+
+
+def test_refine_search_finds_the_optimum_without_repeats():
+    space = {"res_rx": (20.0, 200.0), "cap_rx": (0.1e-12, 3e-12)}
+    optimum = {"res_rx": 48.0, "cap_rx": 0.7e-12}
+    seen = []
+
+    def evaluate_batch(batch):
+        results = []
+        for values in batch:
+            seen.append(tuple(round(values[name], 15) for name in space))
+            distance = sum(np.log(values[name] / optimum[name]) ** 2 for name in space)
+            results.append({"values": values, "worst_pseudo_eye": -distance})
+        return results
+
+    results = refine_search(evaluate_batch, space, levels=3, rounds=4, keep=2)
+    assert len(seen) == len(set(seen)) == len(results)
+    best = max(results, key=lambda item: item["worst_pseudo_eye"])
+    for name, (low, high) in space.items():
+        # Four halvings of the initial 0.5 spacing leave 1/32 of the log range per axis.
+        assert abs(_to_unit(best["values"][name], low, high) - _to_unit(optimum[name], low, high)) <= 1 / 32
+
+
+def test_pareto_flags():
+    results = [
+        {"worst_pseudo_eye": 10.0, "worst_power_ratio": 2.0},
+        {"worst_pseudo_eye": 8.0, "worst_power_ratio": 3.0},
+        {"worst_pseudo_eye": 7.0, "worst_power_ratio": 1.0},
+        {"worst_pseudo_eye": 10.0, "worst_power_ratio": 2.0},
+        {"worst_pseudo_eye": float('nan'), "worst_power_ratio": 5.0},
+        {"worst_pseudo_eye": 9.0, "worst_power_ratio": float('inf')},
+        {"worst_pseudo_eye": 8.0, "worst_power_ratio": 2.5},
+    ]
+    assert pareto_flags(results) == [True, False, False, True, False, True, False]
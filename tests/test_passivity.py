@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from passivity import (
+    causality_ratios,
+    check_network,
+    clip_singular_values,
+    singular_value_peaks,
+    write_passive_network,
+)
+from sparams import CompactNetwork
+
+MARGIN = 1e-4
+
+
+def _mixed_gain(reciprocal_network):
+    """Reciprocal 4-port whose odd frequency points are active (largest singular value 1.2)."""
+    network = reciprocal_network(4, points=10, seed=5, gain=0.7)
+    network.s[1::2] *= 1.2 / 0.7
+    return network
+
+
+def test_singular_value_peaks(reciprocal_network):
+    network = _mixed_gain(reciprocal_network)
+    np.testing.assert_allclose(singular_value_peaks(network, chunk_points=3), np.tile([0.7, 1.2], 5))
+    compact = CompactNetwork.from_network(network)
+    np.testing.assert_allclose(singular_value_peaks(compact), np.tile([0.7, 1.2], 5), rtol=1e-6)
+
+
+def test_clip_keeps_singular_vectors(reciprocal_network):
+    s = reciprocal_network(3, points=4, seed=2, gain=1.5).s
+    clipped = clip_singular_values(s, 0.9)
+    u, sigma, vh = np.linalg.svd(s)
+    np.testing.assert_allclose(np.linalg.svd(clipped, compute_uv=False), np.minimum(sigma, 0.9), atol=1e-12)
+    np.testing.assert_allclose(clipped, (u * np.minimum(sigma, 0.9)[:, None, :]) @ vh)
+
+
+def test_enforcement_bounds_violations_and_keeps_passive_points(tmp_path, reciprocal_network):
+    rf = pytest.importorskip('skrf')
+    network = _mixed_gain(reciprocal_network)
+    path, clipped = write_passive_network(network, tmp_path / 'passive.s4p', margin=MARGIN)
+    assert clipped == 5
+    written = rf.Network(str(path))
+    peaks = np.linalg.svd(written.s, compute_uv=False)[:, 0]
+    assert peaks.max() <= 1.0 - MARGIN + 1e-8
+    np.testing.assert_allclose(peaks[1::2], 1.0 - MARGIN, atol=1e-8)
+    np.testing.assert_allclose(written.s[0::2], network.s[0::2], atol=1e-9)
+    np.testing.assert_allclose(written.s, np.swapaxes(written.s, 1, 2), atol=1e-9)
+
+
+def _line(delay):
+    frequency = np.linspace(0.0, 4e10, 801)
+    s = np.zeros((frequency.size, 2, 2), dtype=complex)
+    s[:, 0, 1] = s[:, 1, 0] = 0.9 * np.exp(-2j * np.pi * frequency * delay)
+    return SimpleNamespace(f=frequency, s=s, z0=np.full((frequency.size, 2), 50.0), nports=2)
+
+
+def test_causality_ratio_of_delayed_and_time_reversed_impulses():
+    causal = causality_ratios(_line(300e-12))
+    assert causal[0, 1] < 0.01 and causal[1, 0] < 0.01
+    assert causal[0, 0] == 0.0
+    anticausal = causality_ratios(_line(-300e-12))
+    assert anticausal[0, 1] > 0.9
+
+    report = check_network(_line(-300e-12))
+    assert report["causality_violations"] == 2
+    assert report["worst_causality_entry"] in ([1, 2], [2, 1])
+    assert report["passivity_violations"] == 0
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from prescreen import (
+    Endpoint,
+    endpoint_reference_impedance,
+    endpoint_reflection,
+    endpoint_transfer,
+    tdr_profiles,
+)
+
+
+def test_single_ended_transfer_is_direct_indexing(reciprocal_network):
+    network = reciprocal_network(6, points=11)
+    rows = [Endpoint.single('a', 4), Endpoint.single('b', 0)]
+    cols = [Endpoint.single('c', 2), Endpoint.single('d', 5), Endpoint.single('e', 4)]
+    index = np.arange(1, 11, 2)
+    transfer = endpoint_transfer(network, rows, cols, index, chunk_points=2)
+    np.testing.assert_allclose(transfer, network.s[index][:, [4, 0]][:, :, [2, 5, 4]])
+
+
+def test_differential_transfer_uses_mode_weights(reciprocal_network):
+    network = reciprocal_network(6, points=5)
+    s = network.s
+    rows = [Endpoint.differential('rx', 3, 4), Endpoint.single('se', 5)]
+    cols = [Endpoint.differential('tx', 0, 1)]
+    transfer = endpoint_transfer(network, rows, cols, np.arange(5))
+    np.testing.assert_allclose(transfer[:, 0, 0], (s[:, 3, 0] - s[:, 3, 1] - s[:, 4, 0] + s[:, 4, 1]) / 2)
+    np.testing.assert_allclose(transfer[:, 1, 0], (s[:, 5, 0] - s[:, 5, 1]) / np.sqrt(2))
+
+    endpoints = [Endpoint.differential('tx', 0, 1), Endpoint.single('se', 5)]
+    reflection = endpoint_reflection(network, endpoints)
+    np.testing.assert_allclose(reflection[:, 0], (s[:, 0, 0] - s[:, 0, 1] - s[:, 1, 0] + s[:, 1, 1]) / 2)
+    np.testing.assert_allclose(reflection[:, 1], s[:, 5, 5])
+    np.testing.assert_allclose(endpoint_reference_impedance(network, endpoints), [100.0, 50.0])
+
+
+def test_tdr_shows_a_load_step_after_the_round_trip():
+    frequency = np.linspace(0.0, 4e10, 801)
+    delay = 200e-12
+    load = (75.0 - 50.0) / (75.0 + 50.0)
+    gamma = np.stack([
+        load * np.exp(-4j * np.pi * frequency * delay),
+        -load * np.exp(-4j * np.pi * frequency * delay),
+    ], axis=1)
+    time, impedance = tdr_profiles(frequency, gamma, [50.0, 50.0], rise_time=30e-12)
+    before = time < 2 * delay - 50e-12
+    after = (time > 2 * delay + 50e-12) & (time < 4 * delay)
+    np.testing.assert_allclose(impedance[before], 50.0, atol=0.5)
+    np.testing.assert_allclose(impedance[after, 0], 75.0, rtol=0.01)
+    np.testing.assert_allclose(impedance[after, 1], 50.0 * 50.0 / 75.0, rtol=0.01)
+    crossing = time[np.argmax(impedance[:, 0] > 62.5)]
+    assert crossing == pytest.approx(2 * delay, abs=10e-12)
+
+
+def test_tdr_needs_two_points():
+    with pytest.raises(ValueError):
+        tdr_profiles([1e9], np.zeros((1, 1)), [50.0], rise_time=30e-12)
@@ -0,0 +1,114 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import progress
+from cct_fakes import FakeBackend, make_cct, write_design
+from progress import PHASES, RunProgress, parse_event, print_event
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(progress, 'time', SimpleNamespace(perf_counter=clock))
+    return clock
+
+
+def test_events_and_moving_average_eta(clock):
+    events = []
+    tracker = RunProgress(5, events.append, window=2)
+    clock.now = 10.0
+    tracker.begin()
+    tracker.add(0, 'prune', 0.5)
+    tracker.start(0, 'DQ0')
+    tracker.add(0, 'analyze', 0.25)
+    tracker.add(0, 'analyze', 0.25)
+    for index, now in enumerate([11.0, 14.0, 15.0, 21.0, 22.0]):
+        if index:
+            tracker.start(index, f'TX{index}')
+        clock.now = now
+        tracker.finish(index, f'TX{index}' if index else 'DQ0')
+    tracker.end()
+
+    assert [event['event'] for event in events] == (
+        ['run_start', 'tx_start', 'tx_end'] + ['tx_start', 'tx_end'] * 4 + ['run_end'])
+    ends = [event for event in events if event['event'] == 'tx_end']
+    # Gaps 1, 3, 1, 6, 1 averaged over the last two, times the TXs left.
+    assert [event['eta'] for event in ends] == [4.0, 6.0, 4.0, 3.5, 0.0]
+    assert [event['done'] for event in ends] == [1, 2, 3, 4, 5]
+    assert [event['elapsed'] for event in ends] == [1.0, 4.0, 5.0, 11.0, 12.0]
+    assert ends[0]['tx'] == 'DQ0'
+    assert ends[0]['phases'] == {phase: {'prune': 0.5, 'analyze': 0.5}.get(phase, 0.0) for phase in PHASES}
+    assert all(not any(event['phases'].values()) for event in ends[1:])
+    assert events[-1] == {'event': 'run_end', 'done': 5, 'total': 5, 'elapsed': 12.0,
+                          'phases': {phase: {'prune': 0.5, 'analyze': 0.5}.get(phase, 0.0) for phase in PHASES}}
+
+
+def test_phases_accumulate_across_threads(clock):
+    events = []
+    tracker = RunProgress(4, events.append)
+    tracker.begin()
+    barrier = threading.Barrier(len(PHASES))
+
+    def time_phase(phase):
+        barrier.wait()
+        for _ in range(200):
+            for index in range(4):
+                tracker.add(index, phase, 0.125)
+
+    threads = [threading.Thread(target=time_phase, args=(phase,)) for phase in PHASES]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for index in range(4):
+        tracker.start(index, f'TX{index}')
+        clock.now += 2.0
+        tracker.finish(index, f'TX{index}')
+    tracker.end()
+
+    for event in events:
+        if event['event'] == 'tx_end':
+            assert event['phases'] == {phase: 25.0 for phase in PHASES}
+    assert events[-1]['phases'] == {phase: 100.0 for phase in PHASES}
+    assert events[-1]['elapsed'] == 8.0
+
+
+def test_event_lines_round_trip(capsys):
+    print_event({'event': 'tx_end', 'done': 1, 'phases': {'analyze': 0.5}})
+    line = capsys.readouterr().out.rstrip('\n')
+    assert parse_event(line) == {'event': 'tx_end', 'done': 1, 'phases': {'analyze': 0.5}}
+    assert parse_event('MESSAGE: hello') is None
+    assert parse_event('EVENT: not json') is None
+    assert parse_event('EVENT: [1, 2]') is None
+
+
+def test_cct_run_reports_every_tx(tmp_path):
+    events = []
+    cct = make_cct(*write_design(tmp_path / 'data'), tmp_path / 'work', FakeBackend())
+    cct.progress = events.append
+    cct.run()
+
+    total = len(cct.txs)
+    assert events[0] == {'event': 'run_start', 'total': total}
+    assert events[-1]['event'] == 'run_end' and events[-1]['done'] == total
+    starts = [event['index'] for event in events if event['event'] == 'tx_start']
+    ends = [event for event in events if event['event'] == 'tx_end']
+    assert sorted(starts) == sorted(event['index'] for event in ends) == list(range(total))
+    for event in ends:
+        position = events.index(event)
+        assert any(item['event'] == 'tx_start' and item['index'] == event['index'] for item in events[:position])
+    assert [event['done'] for event in ends] == list(range(1, total + 1))
+    assert ends[-1]['eta'] == 0.0
+    assert all(set(event['phases']) == set(PHASES) for event in ends)
+    for phase in PHASES:
+        assert events[-1]['phases'][phase] == pytest.approx(sum(event['phases'][phase] for event in ends), abs=1e-3)
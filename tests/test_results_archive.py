@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from results_archive import ResultsArchive, metric_columns, metrics_array, write_archive
+
+# Header of the text-only result CSV that predates the archive.
+LEGACY_HEADER = 'tx_name, rx_name, sig(V*ps), isi(V*ps), xtalk(V*ps), pseudo_eye(V*ps), power_ratio'
+
+ROWS = [
+    {"tx_name": "DQ0", "rx_name": "DQ0", "sig": 101.23456, "isi": 4.5, "xtalk": 2.25, "pseudo_eye": 94.48456,
+     "power_ratio": 14.99771, "eye_height": 0.61234, "eye_width": 98.5, "stat_eye_height@1e-12": 0.55},
+    {"tx_name": "CLK", "rx_name": "CLK", "sig": 88.0, "isi": 6.125, "xtalk": 3.0, "pseudo_eye": 78.875,
+     "power_ratio": 9.65306, "eye_height": 0.5, "eye_width": 90.0},
+]
+
+
+def _write(tmp_path):
+    columns = metric_columns([1e-12])
+    waveforms = {
+        ("DQ0", "DQ0"): (np.linspace(0.0, 1000.0, 11), np.sin(np.linspace(0.0, 3.0, 11))),
+        ("DQ0", "CLK"): ([0.0, 1.0, 2.0], [0.0, -0.25, 0.125]),
+        ("CLK", "CLK"): ([], []),
+    }
+    path = write_archive(
+        tmp_path / 'result.npz',
+        metrics_array(ROWS, columns),
+        columns,
+        {"ui": "133ps", "ber_levels": [1e-12]},
+        [{"tx": "DQ0", "kept_ports": 4}],
+        waveforms,
+    )
+    return path, columns, waveforms
+
+
+def test_archive_round_trip(tmp_path):
+    path, columns, waveforms = _write(tmp_path)
+    assert not list(tmp_path.glob('*.tmp*'))
+    with ResultsArchive(path) as archive:
+        assert archive.columns == columns
+        assert archive.settings == {"ui": "133ps", "ber_levels": [1e-12]}
+        assert archive.prune_stats == [{"tx": "DQ0", "kept_ports": 4}]
+        metrics = archive.metrics
+        assert list(metrics["tx_name"]) == ["DQ0", "CLK"]
+        assert metrics["sig"][0] == 101.23456
+        assert metrics["stat_eye_height@1e-12"][0] == 0.55
+        assert np.isnan(metrics["stat_eye_height@1e-12"][1])
+
+        assert archive.waveform_keys() == list(waveforms)
+        assert archive.sources("DQ0") == [("DQ0", np.abs(waveforms[("DQ0", "DQ0")][1]).max()), ("CLK", 0.25)]
+        assert archive.sources("CLK") == [("CLK", 0.0)]
+        assert archive.sources("DQ9") == []
+        for (rx_name, tx_name), (time, voltage) in waveforms.items():
+            read_time, read_voltage = archive.waveform(rx_name, tx_name)
+            np.testing.assert_array_equal(read_time, time)
+            np.testing.assert_array_equal(read_voltage, voltage)
+        with pytest.raises(KeyError):
+            archive.waveform("CLK", "DQ0")
+
+
+def test_csv_export_keeps_the_legacy_columns(tmp_path):
+    path, _, _ = _write(tmp_path)
+    with ResultsArchive(path) as archive:
+        lines = archive.export_csv(tmp_path / 'result.csv').read_text().splitlines()
+    assert lines[0].startswith(LEGACY_HEADER + ', ')
+    legacy = len(LEGACY_HEADER.split(', '))
+    for line, row in zip(lines[1:], ROWS):
+        expected = (f"{row['tx_name']}, {row['rx_name']}, {row['sig']:.3f}, {row['isi']:.3f}, "
+                    f"{row['xtalk']:.3f}, {row['pseudo_eye']:.3f}, {row['power_ratio']:.3f}")
+        assert ', '.join(line.split(', ')[:legacy]) == expected
+    assert len(lines) == 1 + len(ROWS)
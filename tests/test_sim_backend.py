@@ -0,0 +1,116 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from cct_fakes import FakeBackend, make_cct, write_design
+from sim_backend import RecordingBackend, ReplayBackend, SharedBackend, file_digest, netlist_key
+
+# Prune and decimate so the netlists point at derived networks.
+TRIMMED = {'threshold_db': -30, 'decimate_tol': 1e-3}
+
+
+def test_netlist_key_ignores_file_locations(tmp_path):
+    for name in ('a', 'b'):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'block.inc').write_text('R1 net_1 0 50\n', encoding='utf-8')
+        (tmp_path / name / 'pcb.s2p').write_text('# Hz S RI R 50\n0 0 0 1 0 1 0 0 0\n', encoding='ascii')
+    first = f'.include "{tmp_path / "a" / "block.inc"}"\nS1 net_1 0 "{tmp_path / "a" / "pcb.s2p"}"\n'
+    second = first.replace(str(tmp_path / 'a'), str(tmp_path / 'b'))
+    assert netlist_key(first, '1ps', '1ns') == netlist_key(second, '1ps', '1ns')
+    assert netlist_key(first, '1ps', '1ns') != netlist_key(first, '1ps', '2ns')
+
+
+def test_netlist_key_follows_referenced_network_content(tmp_path):
+    network = tmp_path / 'pcb.s2p'
+    network.write_text('# Hz S RI R 50\n0 0 0 1 0 1 0 0 0\n', encoding='ascii')
+    netlist = f'.model "Channel" S TSTONEFILE="{network}"\n'
+    before = netlist_key(netlist, '1ps', '1ns')
+    network.write_text('# Hz S RI R 50\n0 0 0 0.3 0 0.3 0 0 0\n', encoding='ascii')
+    assert netlist_key(netlist, '1ps', '1ns') != before
+
+
+def test_netlist_key_follows_included_content(tmp_path):
+    include = tmp_path / 'block.inc'
+    include.write_text('R1 net_1 0 50\n', encoding='utf-8')
+    netlist = f'.include "{include}"\n'
+    before = netlist_key(netlist, '1ps', '1ns')
+    include.write_text('R1 net_1 0 60\n', encoding='utf-8')
+    assert netlist_key(netlist, '1ps', '1ns') != before
+
+
+def test_file_digest_survives_copy_and_touch(tmp_path):
+    source = tmp_path / 'a.s2p'
+    source.write_bytes(b'# Hz S RI R 50\n0 1 0 0 0 0 0 1 0\n')
+    copy = tmp_path / 'b.s2p'
+    shutil.copy(source, copy)
+    os.utime(copy, (1, 1))
+    assert file_digest(copy) == file_digest(source)
+    copy.write_bytes(b'# Hz S RI R 50\n0 1 0 0 0 0 0 0.5 0\n')
+    assert file_digest(copy) != file_digest(source)
+
+
+def test_replay_serves_recorded_waveforms_and_rejects_unknown_netlists(tmp_path):
+    fake = FakeBackend()
+    recorder = RecordingBackend(fake, tmp_path / 'rec')
+    recorder.prepare('1ps', '1ns')
+    recorded = recorder.run('V1 net_1 0 1\nR2 net_1 net_2 50\n')
+
+    replay = ReplayBackend(tmp_path / 'rec')
+    replay.prepare('1ps', '1ns')
+    replayed = replay.run('V1 net_1 0 1\nR2 net_1 net_2 50\n')
+    assert sorted(replayed) == sorted(recorded) == [1, 2]
+    for number in recorded:
+        np.testing.assert_allclose(replayed[number], recorded[number])
+    with pytest.raises(KeyError):
+        replay.run('V1 net_1 0 2\n')
+    replay.prepare('1ps', '2ns')
+    with pytest.raises(KeyError):
+        replay.run('V1 net_1 0 1\nR2 net_1 net_2 50\n')
+
+
+def test_replay_requires_a_recording(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ReplayBackend(tmp_path / 'missing')
+
+
+def test_shared_backend_requires_prepare():
+    with pytest.raises(RuntimeError):
+        SharedBackend(FakeBackend()).run('V1 net_1 0 1\n')
+
+
+def test_cct_replays_after_moving_the_data(tmp_path):
+    snp, ports = write_design(tmp_path / 'original' / 'data')
+    fake = FakeBackend()
+    recorded = make_cct(
+        snp, ports, tmp_path / 'original' / 'work', RecordingBackend(fake, tmp_path / 'original' / 'rec'), **TRIMMED
+    )
+    recorded.run()
+    expected = recorded.calculate()
+    assert fake.calls == len(recorded.txs)
+    assert list((tmp_path / 'original' / 'work').rglob('*.s*p')), "pruned or decimated networks were expected"
+
+    shutil.copytree(tmp_path / 'original' / 'data', tmp_path / 'moved' / 'data')
+    shutil.copytree(tmp_path / 'original' / 'rec', tmp_path / 'moved' / 'rec')
+    os.utime(tmp_path / 'moved' / 'data' / 'pcb.s10p')
+    moved = tmp_path / 'moved' / 'data'
+    replayed = make_cct(
+        moved / 'pcb.s10p', moved / 'ports.json', tmp_path / 'moved' / 'work', ReplayBackend(tmp_path / 'moved' / 'rec'), **TRIMMED
+    )
+    replayed.run()
+    result = replayed.calculate()
+    for field in ('sig', 'isi', 'xtalk'):
+        np.testing.assert_allclose(result[field], expected[field])
+
+
+def test_replay_rejects_a_different_board_under_the_same_name(tmp_path):
+    snp, ports = write_design(tmp_path / 'first')
+    recorded = make_cct(snp, ports, tmp_path / 'first_work', RecordingBackend(FakeBackend(), tmp_path / 'rec'))
+    recorded.run()
+
+    snp, ports = write_design(tmp_path / 'second', scale=0.3)
+    assert snp.name == 'pcb.s10p'
+    replayed = make_cct(snp, ports, tmp_path / 'second_work', ReplayBackend(tmp_path / 'rec'))
+    with pytest.raises(KeyError):
+        replayed.run()
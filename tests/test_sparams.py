@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+
+from sparams import (
+    CompactNetwork,
+    apply_terminations,
+    decimate_frequencies,
+    load_admittance,
+    load_trim_report,
+    renormalize,
+    s_block,
+    write_reduced_touchstone,
+    write_touchstone,
+)
+
+
+def test_compact_network_expands_to_the_full_matrix(reciprocal_network):
+    network = reciprocal_network(6)
+    s = network.s
+    compact = CompactNetwork.from_network(network)
+    assert compact.packed.shape == (7, 6 * 7 // 2)
+    rows, cols = [4, 0, 5], [1, 1, 3, 2]
+    np.testing.assert_allclose(compact.s_block(rows, cols), s[:, rows][:, :, cols], atol=1e-6)
+    np.testing.assert_allclose(compact.s_trace(5, 2), compact.s_trace(2, 5))
+    np.testing.assert_allclose(s_block(compact, rows, cols, [0, 3]), s[[0, 3]][:, rows][:, :, cols], atol=1e-6)
+
+
+def test_compact_network_rejects_non_reciprocal_or_frequency_dependent_reference(reciprocal_network):
+    network = reciprocal_network(3)
+    network.s[:, 0, 1] += 0.1
+    assert CompactNetwork.from_network(network) is None
+    varying = reciprocal_network(3)
+    varying.z0[3:] = 75.0
+    assert CompactNetwork.from_network(varying) is None
+
+
+def test_compact_network_keeps_per_port_references(reciprocal_network):
+    network = reciprocal_network(3)
+    network.z0[:, 1] = 75.0
+    np.testing.assert_allclose(CompactNetwork.from_network(network).z0, [50.0, 75.0, 50.0])
+
+
+@pytest.mark.parametrize('nports', [1, 2, 3, 5])
+def test_touchstone_round_trip(tmp_path, reciprocal_network, nports):
+    rf = pytest.importorskip('skrf')
+    s = reciprocal_network(nports).s
+    frequency = np.linspace(1e8, 1e10, s.shape[0])
+    path = write_touchstone(tmp_path / f"net.s{nports}p", frequency, s, 50.0)
+    network = rf.Network(str(path))
+    np.testing.assert_allclose(network.f, frequency)
+    np.testing.assert_allclose(network.s, s, atol=1e-8)
+    np.testing.assert_allclose(network.z0, 50.0)
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+@pytest.mark.parametrize('nports, lines, first_pairs', [(1, 1, 1), (2, 1, 4), (3, 3, 3), (5, 10, 4)])
+def test_touchstone_lines_per_frequency_point(tmp_path, reciprocal_network, nports, lines, first_pairs):
+    path = write_touchstone(tmp_path / f"net.s{nports}p", np.linspace(1e8, 1e10, 7), reciprocal_network(nports).s, 50.0)
+    data = [line for line in path.read_text(encoding='ascii').splitlines() if line[0] not in '!#']
+    assert len(data) == 7 * lines
+    assert len(data[0].split()) == 1 + 2 * first_pairs
+
+
+def test_mixed_real_references_are_renormalised(tmp_path, reciprocal_network):
+    rf = pytest.importorskip('skrf')
+    s = reciprocal_network(3).s
+    frequency = np.linspace(1e8, 1e10, s.shape[0])
+    z0 = np.array([50.0, 30.0, 75.0])
+    expected = rf.Network(frequency=rf.Frequency.from_f(frequency, unit='hz'), s=s, z0=z0)
+    expected.renormalize(50.0)
+    np.testing.assert_allclose(renormalize(s, z0, 50.0), expected.s, atol=1e-12)
+
+    network = rf.Network(str(write_touchstone(tmp_path / 'mixed.s3p', frequency, s, z0)))
+    np.testing.assert_allclose(network.s, expected.s, atol=1e-8)
+    np.testing.assert_allclose(network.z0, 50.0)
+
+
+def test_mixed_complex_references_raise(tmp_path, reciprocal_network):
+    with pytest.raises(ValueError):
+        write_touchstone(tmp_path / 'bad.s2p', [1e9], reciprocal_network(2, points=1).s, [50.0, 50.0 + 5.0j])
+
+
+def _line(frequency, delay=200e-12):
+    phase = np.exp(-2j * np.pi * frequency * delay)
+    loss = np.exp(-frequency / 4e10)
+    s = np.zeros((frequency.size, 2, 2), dtype=complex)
+    s[:, 0, 1] = s[:, 1, 0] = 0.9 * loss * phase
+    s[:, 0, 0] = s[:, 1, 1] = 0.05 * (frequency / frequency.max()) * phase
+    return s
+
+
+def _interpolate(frequency, s, keep, data_type):
+    flat = s.reshape(frequency.size, -1)
+    if data_type == 'MA':
+        magnitude = np.abs(flat)
+        angle = np.unwrap(np.angle(flat), axis=0)
+        mag = np.stack([np.interp(frequency, frequency[keep], column[keep]) for column in magnitude.T], axis=1)
+        ang = np.stack([np.interp(frequency, frequency[keep], column[keep]) for column in angle.T], axis=1)
+        return mag * np.exp(1j * ang)
+    real = np.stack([np.interp(frequency, frequency[keep], column[keep]) for column in flat.real.T], axis=1)
+    imag = np.stack([np.interp(frequency, frequency[keep], column[keep]) for column in flat.imag.T], axis=1)
+    return real + 1j * imag
+
+
+@pytest.mark.parametrize('data_type', ['MA', 'RI'])
+@pytest.mark.parametrize('tol', [1e-2, 1e-3])
+def test_decimation_error_stays_within_tolerance(data_type, tol):
+    frequency = np.linspace(0.0, 2e10, 801)
+    s = _line(frequency)
+    keep, worst = decimate_frequencies(frequency, s, tol, data_type)
+    assert keep[0] == 0 and keep[-1] == frequency.size - 1
+    assert np.all(np.diff(keep) > 0)
+    assert keep.size < frequency.size
+    error = np.max(np.abs(_interpolate(frequency, s, keep, data_type) - s.reshape(frequency.size, -1)))
+    assert error <= tol
+    assert worst == pytest.approx(error, rel=1e-6, abs=1e-12)
+
+
+def test_decimation_keeps_every_point_of_a_rough_trace():
+    frequency = np.linspace(0.0, 1e10, 50)
+    s = np.where(np.arange(50) % 2, 0.5, -0.5).astype(complex).reshape(50, 1, 1)
+    keep, worst = decimate_frequencies(frequency, s, 1e-3, 'RI')
+    assert keep.size == 50 and worst == 0.0
+
+
+def test_reduced_touchstone_report(tmp_path):
+    frequency = np.linspace(0.0, 2e10, 401)
+    path = tmp_path / 'reduced.s2p'
+    report = write_reduced_touchstone(path, frequency, _line(frequency), 50.0, decimate_tol=1e-3, data_type='MA')
+    assert path.exists()
+    assert load_trim_report(path) == report
+    assert 0 < report["removed_frequency_points"] < 401
+    assert report["max_interpolation_error"] <= 1e-3
+
+
+def _z_fold(frequency, s, z0, terminations):
+    """Reference folding: terminate in Z parameters, then convert back to S."""
+    root = np.sqrt(z0)
+    eye = np.eye(s.shape[1])
+    z = root[:, None] * np.linalg.solve(eye - s, eye + s) * root[None, :]
+    folded = [index for index, _, _, _ in terminations]
+    kept = [index for index in range(s.shape[1]) if index not in folded]
+    load = np.stack([
+        1.0 / load_admittance(frequency, resistance, capacitance, topology)
+        for _, topology, resistance, capacitance in terminations
+    ], axis=1)
+    z_tt = z[:, folded][:, :, folded] + load[:, :, None] * np.eye(len(folded))
+    reduced = z[:, kept][:, :, kept] - z[:, kept][:, :, folded] @ np.linalg.solve(z_tt, z[:, folded][:, :, kept])
+    normalized = reduced / np.sqrt(np.outer(z0[kept], z0[kept]))
+    eye = np.eye(len(kept))
+    return np.swapaxes(np.linalg.solve(np.swapaxes(normalized + eye, 1, 2), np.swapaxes(normalized - eye, 1, 2)), 1, 2)
+
+
+@pytest.mark.parametrize('z0', [np.full(5, 50.0), np.array([50.0, 40.0, 50.0, 60.0, 45.0])])
+def test_terminations_match_full_solve(reciprocal_network, z0):
+    frequency = np.linspace(1e8, 2e10, 9)
+    s = reciprocal_network(5, points=9, seed=3, gain=0.8).s
+    terminations = [(3, 'shunt', 40.0, 1e-12), (1, 'series', 30.0, 2e-12)]
+    reduced, kept_z0 = apply_terminations(frequency, s, z0, terminations)
+    assert reduced.shape == (9, 3, 3)
+    np.testing.assert_allclose(kept_z0, z0[[0, 2, 4]])
+    np.testing.assert_allclose(reduced, _z_fold(frequency, s, z0, terminations), atol=1e-12)
+
+
+def test_no_terminations_returns_network_unchanged(reciprocal_network):
+    s = reciprocal_network(3).s
+    reduced, z0 = apply_terminations(np.arange(7.0), s, 50.0, [])
+    assert reduced is s
+    np.testing.assert_allclose(z0, np.full(3, 50.0))
+
+
+def test_unknown_termination_topology_is_rejected(reciprocal_network):
+    with pytest.raises(ValueError):
+        apply_terminations(np.arange(1.0, 8.0), reciprocal_network(3).s, 50.0, [(0, 'parallel', 50.0, 1e-12)])
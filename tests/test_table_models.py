@@ -0,0 +1,175 @@
+import math
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtCore = pytest.importorskip('PySide6.QtCore')
+
+from table_models import FETCH_BATCH, ColumnTableModel, TableFilterProxy, columns_from_text  # noqa: E402
+
+HEADERS = ['tx_name', 'rx_name', 'pseudo_eye(V*ps)', 'eye_height(V)']
+ROWS = [
+    ('DQ0', '6_U2_DQ0', 12.5, 0.31),
+    ('DQ1', '7_U2_DQ1', -3.0, float('nan')),
+    ('DQ10', '8_U2_DQ10', 40.0, 0.12),
+    ('CLK', 'CLK', 0.0, 0.45),
+    ('DQ2', '9_U2_DQ2', float('nan'), 0.2),
+]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _model(rows=ROWS, key_column=1):
+    model = ColumnTableModel()
+    model.set_columns(HEADERS, [list(column) for column in zip(*rows)], key_column=key_column)
+    return model
+
+
+def _proxy(model):
+    proxy = TableFilterProxy()
+    proxy.setSourceModel(model)
+    return proxy
+
+
+def _visible(proxy, column=1):
+    return [proxy.data(proxy.index(row, column), QtCore.Qt.UserRole) for row in range(proxy.rowCount())]
+
+
+def test_parse_filter_strips_units_and_rejects_unknown_columns():
+    proxy = _proxy(_model())
+    assert proxy.parse_filter('Pseudo_Eye < 0 and rx_name ~ DQ') == [(2, '<', '0', 0.0), (1, '~', 'DQ', None)]
+    assert proxy.parse_filter('eye_height(V) >= "0.2"') == [(3, '>=', '0.2', 0.2)]
+    assert proxy.parse_filter(' clk ') == [(None, '~', 'clk', None)]
+    assert proxy.parse_filter('') == []
+    with pytest.raises(ValueError, match="'margin'"):
+        proxy.set_filter_expression('margin > 3')
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('pseudo_eye < 0', ['7_U2_DQ1']),
+    ('pseudo_eye >= 12.5', ['6_U2_DQ0', '8_U2_DQ10']),
+    ('pseudo_eye != 0', ['6_U2_DQ0', '7_U2_DQ1', '8_U2_DQ10', '9_U2_DQ2']),
+    ('pseudo_eye == 0', ['CLK']),
+    ('rx_name ~ dq1', ['7_U2_DQ1', '8_U2_DQ10']),
+    ('tx_name == dq0', ['6_U2_DQ0']),
+    # Text comparison: 'DQ10' sorts before 'DQ2', unlike the numbers 10 and 2.
+    ('tx_name < dq2', ['6_U2_DQ0', '7_U2_DQ1', '8_U2_DQ10', 'CLK']),
+    ('eye_height > 0.15 and rx_name ~ U2', ['6_U2_DQ0', '9_U2_DQ2']),
+    ('u2_dq1', ['7_U2_DQ1', '8_U2_DQ10']),
+    ('', ['6_U2_DQ0', '7_U2_DQ1', '8_U2_DQ10', 'CLK', '9_U2_DQ2']),
+])
+def test_filter_expressions(expression, expected):
+    proxy = _proxy(_model())
+    proxy.set_filter_expression(expression)
+    assert _visible(proxy) == expected
+
+
+def test_matches_compares_numbers_and_text():
+    matches = TableFilterProxy._matches
+    assert matches(10.0, '>', '9', 9.0)
+    # Numeric text compares as a number: as text '10' < '9'.
+    assert matches('10', '>', '9', 9.0)
+    assert matches('10', '<', 'abc', None)
+    assert matches('DQ10', '<', 'dq9', None)
+    assert matches(float('nan'), '!=', '1', 1.0)
+    assert not any(matches(float('nan'), op, '1', 1.0) for op in ('<', '<=', '>', '>=', '=='))
+    assert matches(None, '~', 'non', None)
+
+
+@pytest.mark.parametrize('column, expected', [
+    (2, ['7_U2_DQ1', 'CLK', '6_U2_DQ0', '8_U2_DQ10', '9_U2_DQ2']),
+    (3, ['8_U2_DQ10', '9_U2_DQ2', '6_U2_DQ0', 'CLK', '7_U2_DQ1']),
+    (0, ['CLK', '6_U2_DQ0', '7_U2_DQ1', '8_U2_DQ10', '9_U2_DQ2']),
+])
+def test_sort_puts_nan_last(column, expected):
+    proxy = _proxy(_model())
+    proxy.sort(column, QtCore.Qt.AscendingOrder)
+    assert _visible(proxy) == expected
+
+
+def test_less_than_orders_nan_after_numbers():
+    model = _model()
+    proxy = _proxy(model)
+    nan, low, high = (model.index(row, 2) for row in (4, 1, 2))
+    assert proxy.lessThan(low, high) and not proxy.lessThan(high, low)
+    assert proxy.lessThan(high, nan) and not proxy.lessThan(nan, high)
+    assert not proxy.lessThan(nan, nan)
+
+
+def test_rows_are_fetched_in_batches():
+    count = 2 * FETCH_BATCH + 7
+    model = _model([(f'TX{row}', f'RX{row}', float(row), 0.1) for row in range(count)])
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    assert model.rowCount() == FETCH_BATCH and model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 2 * FETCH_BATCH
+    model.fetchMore()
+    assert model.rowCount() == count and not model.canFetchMore()
+    model.fetchMore()
+    assert inserted == [(FETCH_BATCH, 2 * FETCH_BATCH - 1), (2 * FETCH_BATCH, count - 1)]
+
+    # Filtering and sorting load the whole table first.
+    for apply in (lambda proxy: proxy.set_filter_expression('pseudo_eye >= 0'), lambda proxy: proxy.sort(2)):
+        model = _model([(f'TX{row}', f'RX{row}', float(row), 0.1) for row in range(count)])
+        proxy = _proxy(model)
+        apply(proxy)
+        assert model.rowCount() == proxy.rowCount() == count
+
+
+def test_upsert_replaces_or_appends_by_key():
+    model = _model()
+    changed, inserted = [], []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row(), last.column())))
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+    assert model.upsert(['DQ1', '7_U2_DQ1', 5.0, 0.3]) == 1
+    assert changed == [(1, 1, len(HEADERS) - 1)] and not inserted
+    assert model.raw(1, 2) == 5.0 and model.rowCount() == len(ROWS)
+
+    assert model.upsert(['DQ3', '10_U2_DQ3', 7.0, 0.25]) == len(ROWS)
+    assert inserted == [(len(ROWS), len(ROWS))]
+    assert model.rowCount() == len(ROWS) + 1 and model.text(len(ROWS), 1) == '10_U2_DQ3'
+    assert model.upsert(['DQ3', '10_U2_DQ3', 8.0, 0.25]) == len(ROWS)
+    assert model.raw(len(ROWS), 2) == 8.0 and model.rowCount() == len(ROWS) + 1
+
+
+def test_upsert_past_the_loaded_window():
+    count = FETCH_BATCH + 20
+    model = _model([(f'TX{row}', f'RX{row}', float(row), 0.1) for row in range(count)])
+    changed, inserted = [], []
+    model.dataChanged.connect(lambda first, last: changed.append(first.row()))
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+    # Rows past the window change silently; views see them once fetched.
+    assert model.upsert(['TX', f'RX{count - 1}', -1.0, 0.5]) == count - 1
+    assert model.upsert(['TX', 'RX_new', -2.0, 0.5]) == count
+    assert model.upsert(['TX', 'RX_new', -3.0, 0.5]) == count
+    assert not changed and not inserted
+    assert model.rowCount() == FETCH_BATCH and model.canFetchMore()
+
+    model.fetch_all()
+    assert inserted == [(FETCH_BATCH, count)]
+    assert model.rowCount() == count + 1
+    assert model.raw(count - 1, 2) == -1.0 and model.raw(count, 2) == -3.0
+
+    assert model.upsert(['TX', 'RX3', 3.5, 0.5]) == 3
+    assert changed == [3]
+
+
+def test_columns_from_text_keeps_csv_precision():
+    rows = [['DQ0', ' 1.250', '3', '1e-12'], ['DQ1', '-0.5', '4', '2e-12'], ['DQ2', 'nan', '', '3e-12']]
+    columns, formats = columns_from_text(rows, 5)
+    assert columns[0] == ['DQ0', 'DQ1', 'DQ2'] and formats[0] is None
+    assert columns[1][:2] == [1.25, -0.5] and math.isnan(columns[1][2]) and formats[1] == '.3f'
+    assert columns[2] == ['3', '4', ''] and formats[2] is None
+    assert columns[3] == [1e-12, 2e-12, 3e-12] and formats[3] == '.6f'
+    assert columns[4] == ['', '', ''] and formats[4] is None
+
+    model = ColumnTableModel()
+    model.set_columns(['tx_name', 'value'], columns[:2], formats[:2])
+    assert [model.text(row, 1) for row in range(3)] == ['1.250', '-0.500', 'nan']
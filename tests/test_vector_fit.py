@@ -0,0 +1,179 @@
+import numpy as np
+
+import vector_fit
+from vector_fit import (
+    PASSIVITY_MARGIN,
+    PoleResidueModel,
+    enforce_passivity,
+    fit_network,
+    load_macromodel_report,
+    subcircuit_lines,
+    write_macromodel,
+)
+
+POLES = np.array([-1e9 + 5e9j, -2e9 + 2e10j, -5e8])
+RESIDUES = np.array([1e8 + 2e8j, 3e8 - 1e8j, 2e8])
+
+
+def _rational(frequency):
+    s = 2j * np.pi * frequency
+    response = np.zeros((frequency.size, 2, 2), dtype=complex)
+    for pole, residue in zip(POLES, RESIDUES):
+        response[:, 0, 1] += residue / (s - pole)
+        if pole.imag:
+            response[:, 0, 1] += np.conj(residue) / (s - np.conj(pole))
+    response[:, 1, 0] = response[:, 0, 1]
+    response[:, 0, 0] = 0.1
+    response[:, 1, 1] = 0.05
+    return 0.1 * response
+
+
+def _tline(frequency, zc=45.0, tau=300e-12, alpha=0.02, z0=50.0):
+    omega = 2 * np.pi * np.maximum(frequency, 1e6)
+    gl = alpha * np.sqrt(frequency / 1e9) + 1j * omega * tau
+    a = np.cosh(gl)
+    b = zc * np.sinh(gl)
+    c = np.sinh(gl) / zc
+    den = 2 * a + b / z0 + c * z0
+    s = np.empty((frequency.size, 2, 2), dtype=complex)
+    s[:, 0, 0] = s[:, 1, 1] = (b / z0 - c * z0) / den
+    s[:, 0, 1] = s[:, 1, 0] = 2 / den
+    return s
+
+
+def _subcircuit_s(lines, z0, frequency):
+    """S-parameters of a subcircuit of R, C, V, E, F and G elements by AC nodal analysis.
+
+    Every pin is terminated in ``z0``; pin k is driven through its termination in turn.
+    """
+    elements = [line.split() for line in lines[1:-1]]
+    pins = lines[0].split()[2:]
+    nodes = {'0': -1}
+    for element in elements:
+        controls = element[1:5] if element[0][0] in 'EG' else element[1:3]
+        for node in controls:
+            nodes.setdefault(node, len(nodes) - 1)
+    sources = {element[0]: position for position, element in enumerate(e for e in elements if e[0][0] in 'VE')}
+    size = len(nodes) - 1 + len(sources)
+    result = np.empty((len(frequency), len(pins), len(pins)), dtype=complex)
+    for point, f in enumerate(frequency):
+        matrix = np.zeros((size, size), dtype=complex)
+
+        def conductance(a, b, value):
+            for row, sign_row in ((nodes[a], 1), (nodes[b], -1)):
+                for col, sign_col in ((nodes[a], 1), (nodes[b], -1)):
+                    if row >= 0 and col >= 0:
+                        matrix[row, col] += sign_row * sign_col * value
+
+        def into(node, column, value):
+            if nodes[node] >= 0:
+                matrix[nodes[node], column] += value
+
+        for element in elements:
+            kind = element[0][0]
+            if kind == 'R':
+                conductance(element[1], element[2], 1.0 / float(element[3]))
+            elif kind == 'C':
+                conductance(element[1], element[2], 2j * np.pi * f * float(element[3]))
+            elif kind == 'G':
+                for node, sign in ((element[1], 1.0), (element[2], -1.0)):
+                    if nodes[node] >= 0:
+                        for control, polarity in ((element[3], 1.0), (element[4], -1.0)):
+                            if nodes[control] >= 0:
+                                matrix[nodes[node], nodes[control]] += sign * polarity * float(element[5])
+            elif kind in 'VE':
+                branch = len(nodes) - 1 + sources[element[0]]
+                for node, sign in ((element[1], 1.0), (element[2], -1.0)):
+                    into(node, branch, sign)
+                    if nodes[node] >= 0:
+                        matrix[branch, nodes[node]] += sign
+                if kind == 'E':
+                    for control, polarity in ((element[3], 1.0), (element[4], -1.0)):
+                        if nodes[control] >= 0:
+                            matrix[branch, nodes[control]] -= polarity * float(element[5])
+            elif kind == 'F':
+                branch = len(nodes) - 1 + sources[element[3]]
+                into(element[1], branch, float(element[4]))
+                into(element[2], branch, -float(element[4]))
+        for pin in pins:
+            conductance(pin, '0', 1.0 / z0)
+        for k, pin in enumerate(pins):
+            excitation = np.zeros(size, dtype=complex)
+            excitation[nodes[pin]] = 1.0 / z0
+            voltage = np.linalg.solve(matrix, excitation)[[nodes[name] for name in pins]]
+            # Driven by 1 V behind z0: a_k = 1/(2 sqrt(z0)) and b_j = (V_j - z0 I_j)/(2 sqrt(z0)).
+            current = (np.eye(len(pins))[k] - voltage) / z0
+            result[point, :, k] = voltage - z0 * current
+    return result
+
+
+def _peak_gain(model, top):
+    grid = np.linspace(0.0, top, 200001)
+    return np.linalg.svd(model.evaluate(grid), compute_uv=False).max()
+
+
+def test_fit_recovers_known_rational_function():
+    frequency = np.linspace(0.0, 1e10, 201)
+    model = fit_network(frequency, _rational(frequency), 50.0, pole_count=6)
+    assert model.stats["pole_count"] == 6
+    assert model.rms_error < 1e-10
+    for pole in POLES:
+        assert np.min(np.abs(model.poles - pole)) < 1e-6 * abs(pole)
+    np.testing.assert_allclose(model.d, [[0.01, 0.0], [0.0, 0.005]], atol=1e-10)
+    assert model.passive and model.passivity_iterations == 0
+
+
+def test_fit_of_passive_line_is_passive_everywhere():
+    frequency = np.linspace(0.0, 2e10, 401)
+    s = _tline(frequency)
+    model = fit_network(frequency, s, 50.0, pole_count=30)
+    assert model.passive
+    assert model.rms_error < 5e-3
+    assert _peak_gain(model, 3e12) <= 1.0 - 0.5 * PASSIVITY_MARGIN
+
+
+def test_enforce_passivity_clips_d():
+    frequency = np.linspace(0.0, 1e10, 101)
+    s = _rational(frequency)
+    model = fit_network(frequency, s, 50.0, pole_count=6)
+    model.d = np.array([[1.2, 0.0], [0.0, 0.05]])
+    worst = enforce_passivity(model, frequency, s)
+    assert model.passive
+    assert worst <= 1.0 - PASSIVITY_MARGIN
+    assert np.abs(np.linalg.eigvalsh(model.d)).max() <= 1.0 - PASSIVITY_MARGIN
+
+
+def test_subcircuit_realises_the_model():
+    frequency = np.linspace(0.0, 2e10, 401)
+    model = fit_network(frequency, _tline(frequency), 50.0, pole_count=12)
+    check = np.array([0.0, 1.3e9, 7.7e9, 1.9e10, 5e10])
+    lines = subcircuit_lines(model, 'LINE')
+    assert lines[0] == '.subckt LINE p1 p2' and lines[-1] == '.ends LINE'
+    np.testing.assert_allclose(_subcircuit_s(lines, 50.0, check), model.evaluate(check), atol=1e-8)
+
+
+def test_write_macromodel_writes_subcircuit_and_report(tmp_path):
+    frequency = np.linspace(0.0, 1e10, 201)
+    path = tmp_path / 'line.sp'
+    report = write_macromodel(path, frequency, _rational(frequency), 50.0, 'LINE', pole_count=6)
+    assert report["passive"] and report["subcircuit"] == 'LINE'
+    assert load_macromodel_report(path) == report
+    assert path.read_text(encoding='ascii').startswith('.subckt LINE')
+
+
+def test_write_macromodel_refuses_non_passive_model(tmp_path, monkeypatch):
+    frequency = np.linspace(0.0, 1e10, 11)
+    s = _rational(frequency)
+
+    def non_passive(frequency, s, z0, **_):
+        model = PoleResidueModel(poles=POLES, residues=np.zeros((3, 2, 2), complex), d=np.eye(2), z0=np.full(2, 50.0))
+        model.passive = False
+        model.stats = {"passive": False, "peak_gain": 1.3}
+        return model
+
+    monkeypatch.setattr(vector_fit, 'fit_network', non_passive)
+    path = tmp_path / 'line.sp'
+    report = write_macromodel(path, frequency, s, 50.0, 'LINE')
+    assert report == {"passive": False, "peak_gain": 1.3, "subcircuit": 'LINE'}
+    assert load_macromodel_report(path) == report
+    assert not path.exists()